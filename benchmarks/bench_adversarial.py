@@ -0,0 +1,73 @@
+"""Measure parse time on hostile inputs at growing sizes.
+
+Run from the repository root::
+
+    python benchmarks/bench_adversarial.py --lines 50000 --steps 3
+
+Every case is a small script built around one pathological construct:
+signatures with tens of thousands of parameters, unclosed brackets,
+thousands of continuation lines, deeply nested defaults, very long
+comments.  Each case is parsed at ``--lines``, twice and four times that
+size, with the default :class:`~src.parser.ParseLimits` and without
+limits.  The time per MB should stay about the same as the size grows;
+a ratio well above 1 in the last column points at quadratic behavior.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src import parser  # noqa: E402
+
+CASES: Dict[str, Callable[[int], str]] = {
+    "many_params": lambda n: "func f(" + ", ".join(f"a{i}: int = {i}" for i in range(n))
+    + ") -> int:\n\tpass\n",
+    "nested_params": lambda n: "func f(" + "(x), " * n + ")\n",
+    "unclosed_multiline": lambda n: "func f(\n" + "a, # c\n" * n,
+    "huge_signal": lambda n: "signal s(" + "a, " * n + ")\n",
+    "huge_enum": lambda n: "enum E {" + ", ".join(f"V{i} = {i}" for i in range(n)) + "}\n",
+    "stray_parens": lambda n: "func f(" + ")    " * n + "\n",
+    "long_comment": lambda n: "# " + "x" * (n * 10) + "\n",
+    "escaped_quotes": lambda n: "var s = " + '"a\\"b" + ' * n + "1\n",
+    "nested_default": lambda n: "func f(a = " + "[" * n + "]" * n + "):\n",
+    "open_literal": lambda n: "var x = [\n" + "1,\n" * n,
+    "continuations": lambda n: "func f(a, \\\n" + "b \\\n" * n + "):\n",
+}
+
+
+def seconds(source: bytes, limits: parser.ParseLimits) -> float:
+    start = time.perf_counter()
+    parser._parse("adversarial.gd", source, limits)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--lines", type=int, default=50000, help="repetitions at the smallest size")
+    ap.add_argument("--steps", type=int, default=3, help="number of sizes, doubling each time")
+    args = ap.parse_args()
+
+    unlimited = parser.ParseLimits(0, 0, 0)
+    print(f"{'case':<20}{'MB':>7}{'limited s':>11}{'unlimited s':>13}{'s/MB ratio':>12}")
+    for name, make in CASES.items():
+        first = None
+        for step in range(args.steps):
+            source = make(args.lines << step).encode("utf-8")
+            mb = len(source) / 2**20
+            limited = seconds(source, parser.DEFAULT_LIMITS)
+            free = seconds(source, unlimited)
+            per_mb = free / mb
+            if first is None:
+                first = per_mb
+            ratio = per_mb / first if first else 0.0
+            print(f"{name:<20}{mb:>7.2f}{limited:>11.3f}{free:>13.3f}{ratio:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Measure incremental rebuilds of a large project and check the no-op path.
+
+Run from the repository root::
+
+    python benchmarks/bench_incremental.py --files 6000 --budget 2.0
+
+A synthetic project is documented once, then rebuilt three times: without
+any change (the tree is walked and every script hashed), after editing one
+script (walk) and after editing one script with the change passed in, as
+``--staged`` and ``gd2doc serve`` do.  The no-op build must neither rewrite
+the manifest nor take longer than ``--budget`` seconds; the exit status is
+1 otherwise.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.corpus import CorpusShape, write_corpus  # noqa: E402
+from src.api import BuildOptions, build  # noqa: E402
+from src.changes import Changes  # noqa: E402
+from src.manifest import MANIFEST_NAME  # noqa: E402
+from src.sinks import DirectorySink  # noqa: E402
+
+
+def timed_build(source: Path, docs: Path, options: BuildOptions, changes=None) -> float:
+    start = time.perf_counter()
+    with DirectorySink(docs, options.project_root) as sink:
+        build(source, options, sink, changes=changes)
+    return time.perf_counter() - start
+
+
+def main_() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=6000)
+    parser.add_argument("--functions", type=int, default=10)
+    parser.add_argument("--budget", type=float, default=2.0,
+                        help="Seconds a no-op build may take.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        source, docs = root / "src", root / "docs"
+        paths = write_corpus(source, CorpusShape(files=args.files, functions=args.functions))
+        options = BuildOptions(recursive=True, project_root=root)
+
+        full = timed_build(source, docs, options)
+        manifest = docs / MANIFEST_NAME
+        before = manifest.stat().st_mtime_ns
+        noop = timed_build(source, docs, options)
+        rewritten = manifest.stat().st_mtime_ns != before
+
+        edited = paths[len(paths) // 2]
+        edited.write_text(edited.read_text(encoding="utf-8") + "func added():\n\tpass\n", encoding="utf-8")
+        walk = timed_build(source, docs, options)
+        edited.write_text(edited.read_text(encoding="utf-8") + "func more():\n\tpass\n", encoding="utf-8")
+        key = edited.relative_to(source).as_posix()
+        known = timed_build(source, docs, options, Changes(modified=[key]))
+
+    print(f"{'build':<24}{'seconds':>9}")
+    for name, seconds in (
+        ("full", full),
+        ("no-op", noop),
+        ("one file, walk", walk),
+        ("one file, known change", known),
+    ):
+        print(f"{name:<24}{seconds:>9.3f}")
+
+    failed = False
+    if rewritten:
+        print("FAIL: the no-op build rewrote the manifest")
+        failed = True
+    if noop > args.budget:
+        print(f"FAIL: the no-op build took {noop:.3f}s, budget {args.budget:.3f}s")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_())
@@ -0,0 +1,67 @@
+"""Benchmark how ``gd2doc --jobs`` scales with the number of workers.
+
+Run from the repository root::
+
+    python benchmarks/bench_jobs.py --files 3000 --max-jobs 8
+
+A synthetic project is written to a temporary directory and documented once
+per worker count with a fresh output directory, so every run parses and
+renders all files.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from click.testing import CliRunner  # noqa: E402
+
+from benchmarks.corpus import CorpusShape, write_corpus  # noqa: E402
+from src.cli import main  # noqa: E402
+
+
+def run(source: Path, workdir: Path, jobs: int) -> float:
+    output = workdir / f"docs_{jobs}"
+    start = time.perf_counter()
+    result = CliRunner().invoke(
+        main,
+        [str(source), "-o", str(output), "-r", "-j", str(jobs), "--project-root", str(workdir)],
+    )
+    elapsed = time.perf_counter() - start
+    if result.exit_code != 0:
+        raise RuntimeError(result.output) from result.exception
+    return elapsed
+
+
+def main_() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=3000)
+    parser.add_argument("--max-jobs", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+        source = tmp_path / "src"
+        write_corpus(source, CorpusShape(files=args.files))
+
+        print(f"{'jobs':>4}  {'seconds':>8}  {'files/s':>8}  {'speedup':>7}")
+        baseline = None
+        jobs = 1
+        while jobs <= args.max_jobs:
+            elapsed = run(source, tmp_path, jobs)
+            baseline = baseline or elapsed
+            print(
+                f"{jobs:>4}  {elapsed:>8.2f}  {args.files / elapsed:>8.0f}"
+                f"  {baseline / elapsed:>6.2f}x"
+            )
+            jobs *= 2
+
+
+if __name__ == "__main__":
+    main_()
@@ -0,0 +1,93 @@
+"""Measure time and peak memory of parsing one very large generated script.
+
+Run from the repository root::
+
+    python benchmarks/bench_large.py --size 100
+
+The script mimics a machine generated data table: a documented ``enum``, a
+``const`` dictionary literal of about ``--size`` MB spread over many lines
+and a few functions with long bodies.  It is parsed from the file (memory
+mapped above :data:`~src.parser.MMAP_THRESHOLD`) and, for comparison, from
+its content read into memory first.  Peak memory is measured with
+:mod:`tracemalloc` in a second run; it does not count the pages of a memory
+map, which the system can drop and reread at any time.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src import parser  # noqa: E402
+
+
+def write_table(path: Path, megabytes: int) -> None:
+    """Write a data table script of about ``megabytes`` MB to ``path``."""
+
+    row = '\t"item_{0:08d}": {{"weight": {0}, "label": "Item {0}"}},\n'
+    rows = megabytes * 2**20 // len(row.format(0))
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("## Generated item table.\nextends Resource\n\n")
+        f.write("## Item kinds.\nenum Kind {\n")
+        f.writelines(f"\tKIND_{i},\n" for i in range(200))
+        f.write("}\n\n## All items by id.\nconst ITEMS = {\n")
+        for start in range(0, rows, 10000):
+            f.writelines(row.format(i) for i in range(start, min(start + 10000, rows)))
+        f.write("}\n")
+        for i in range(20):
+            f.write(f"\n## Lookup {i}.\nfunc lookup_{i}(id: String) -> Dictionary:\n")
+            f.writelines(f"\tvar v{j} = ITEMS.get(id)\n" for j in range(2000))
+            f.write("\treturn {}\n")
+
+
+def measure(parse: Callable[[], parser.ParsedScript]) -> tuple:
+    """Return the result, the seconds and the peak traced bytes of
+    ``parse()``.  Tracing slows down allocations, so it is timed without."""
+
+    start = time.perf_counter()
+    result = parse()
+    elapsed = time.perf_counter() - start
+    del result
+    tracemalloc.start()
+    try:
+        result = parse()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--size", type=int, default=100, help="size of the table in MB")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "items.gd"
+        write_table(path, args.size)
+        size = path.stat().st_size
+        mapped, mapped_time, mapped_peak = measure(lambda: parser.parse_gdscript(str(path)))
+        read, read_time, read_peak = measure(
+            lambda: parser.parse_gdscript(str(path), path.read_bytes())
+        )
+    assert mapped == read
+
+    print(f"file: {size / 2**20:.1f} MB, {len(mapped.enums[0].items)} enum items, "
+          f"{len(mapped.functions)} functions")
+    print(f"{'input':<10}{'seconds':>9}{'MB/s':>8}{'peak MB':>9}")
+    for name, elapsed, peak in (
+        ("mmap", mapped_time, mapped_peak),
+        ("bytes", read_time, read_peak),
+    ):
+        print(f"{name:<10}{elapsed:>9.2f}{size / 2**20 / elapsed:>8.0f}{peak / 2**20:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
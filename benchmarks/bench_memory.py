@@ -0,0 +1,63 @@
+"""Compare the memory held by parsed results in both representations.
+
+Run from the repository root::
+
+    python benchmarks/bench_memory.py --files 2000
+
+Every script of a synthetic project is parsed and kept in memory, once as
+slotted :class:`~src.parser.ParsedScript` objects and once converted to the
+nested dictionaries ``parse_gdscript`` used to return (``to_dict()``).
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+from typing import Callable, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.corpus import CorpusShape, write_corpus  # noqa: E402
+from src import parser  # noqa: E402
+
+
+def retained(load: Callable[[], List[object]]) -> int:
+    """Return the bytes still allocated by the result of ``load()``."""
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = load()
+        gc.collect()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return size
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--files", type=int, default=2000)
+    ap.add_argument("--functions", type=int, default=20)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [str(p) for p in write_corpus(
+            Path(tmp), CorpusShape(files=args.files, functions=args.functions)
+        )]
+        objects = retained(lambda: [parser.parse_gdscript(p) for p in paths])
+        dicts = retained(lambda: [parser.parse_gdscript(p).to_dict() for p in paths])
+
+    print(f"{'representation':<16}{'MB':>8}{'bytes/file':>12}")
+    for name, size in (("ParsedScript", objects), ("dict", dicts)):
+        print(f"{name:<16}{size / 2**20:>8.1f}{size / args.files:>12.0f}")
+    print(f"saving: {(1 - objects / dicts) * 100:.0f}%")
+
+
+if __name__ == "__main__":
+    main()
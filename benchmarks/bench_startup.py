@@ -0,0 +1,87 @@
+"""Measure how long ``gd2doc`` takes to start and to finish a no-op build.
+
+Run from the repository root::
+
+    python benchmarks/bench_startup.py --runs 10
+
+Reports the median ``-X importtime`` total for ``src.cli``, the slowest
+modules it pulls in, and the wall time of a ``gd2doc`` run on a small
+synthetic project whose documentation is already up to date (the typical
+pre-commit hook run).
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from benchmarks.corpus import CorpusShape, write_corpus  # noqa: E402
+
+
+def import_times(module: str = "src.cli") -> Dict[str, Tuple[int, int]]:
+    """Return ``{module: (self_us, cumulative_us)}`` from ``-X importtime``."""
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times: Dict[str, Tuple[int, int]] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(own), int(cumulative))
+    return times
+
+
+def noop_run(source: Path, output: Path) -> float:
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, str(ROOT / "gd2doc"), str(source), "-o", str(output), "-r",
+         "--project-root", str(output.parent)],
+        check=True,
+        capture_output=True,
+    )
+    return time.perf_counter() - start
+
+
+def main_() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--files", type=int, default=50)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    totals: List[int] = []
+    last: Dict[str, Tuple[int, int]] = {}
+    for _ in range(args.runs):
+        last = import_times()
+        totals.append(last["src.cli"][1])
+    print(f"import src.cli: {statistics.median(totals) / 1000:.1f} ms (median of {args.runs})")
+    print("slowest modules (self time, last run):")
+    for name, (own, _cumulative) in sorted(last.items(), key=lambda i: -i[1][0])[: args.top]:
+        print(f"  {own / 1000:>7.1f} ms  {name}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / "src"
+        output = Path(tmp) / "docs"
+        write_corpus(source, CorpusShape(files=args.files))
+        noop_run(source, output)
+        walls = [noop_run(source, output) for _ in range(args.runs)]
+    print(f"no-op build of {args.files} files: {statistics.median(walls) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main_()
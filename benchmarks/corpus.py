@@ -0,0 +1,115 @@
+"""Deterministic generator for synthetic GDScript projects.
+
+The same :class:`CorpusShape` always produces byte-identical files, so
+benchmark numbers from different runs and machines stay comparable.
+"""
+
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List
+
+TYPES = ["int", "float", "String", "bool", "Vector2", "Array", "Dictionary", "Node"]
+WORDS = [
+    "player", "enemy", "speed", "health", "state", "target", "timer", "path",
+    "score", "level", "item", "weapon", "damage", "input", "camera", "signal",
+]
+
+
+@dataclass
+class CorpusShape:
+    """Size and shape of a synthetic project.
+
+    ``comment_density`` is the probability (0-1) that a declaration gets a
+    doc comment and that a body line is followed by a comment line.
+    ``nesting_depth`` is the number of directory levels below the root and
+    ``files_per_dir`` how many scripts each leaf directory holds.
+    """
+
+    files: int = 1000
+    functions: int = 10
+    comment_density: float = 0.5
+    nesting_depth: int = 2
+    files_per_dir: int = 25
+    body_lines: int = 6
+    seed: int = 0
+
+
+def _name(rng: random.Random) -> str:
+    return "_".join(rng.sample(WORDS, 2))
+
+
+def _comment(rng: random.Random, shape: CorpusShape, indent: str = "") -> List[str]:
+    if rng.random() < shape.comment_density:
+        return [f"{indent}# {' '.join(rng.sample(WORDS, 5)).capitalize()}."]
+    return []
+
+
+def generate_script(index: int, shape: CorpusShape) -> str:
+    """Return the source of synthetic script number ``index``."""
+
+    rng = random.Random(f"{shape.seed}:{index}")
+    lines = [
+        f"# Synthetic script {index}.",
+        "# Generated by benchmarks/corpus.py.",
+        "extends Node",
+        f"class_name Synthetic{index}",
+        "",
+    ]
+
+    for i in range(rng.randint(1, 3)):
+        lines += _comment(rng, shape)
+        lines += [f"signal {_name(rng)}_{i}(value, origin)", ""]
+
+    lines += _comment(rng, shape)
+    members = ", ".join(f"{w.upper()}_{i}" for i, w in enumerate(rng.sample(WORDS, 4)))
+    lines += [f"enum State {{ {members} }}", ""]
+
+    for i in range(rng.randint(1, 4)):
+        lines += _comment(rng, shape)
+        lines += [f"const {_name(rng).upper()}_{i} = {rng.randint(0, 1000)}", ""]
+
+    for i in range(rng.randint(2, 6)):
+        lines += _comment(rng, shape)
+        type_ = rng.choice(TYPES)
+        lines += [f"var {_name(rng)}_{i}: {type_}", ""]
+
+    for i in range(shape.functions):
+        lines += _comment(rng, shape)
+        params = ", ".join(
+            f"{w}: {rng.choice(TYPES)}" for w in rng.sample(WORDS, rng.randint(0, 3))
+        )
+        lines.append(f"func {_name(rng)}_{i}({params}) -> {rng.choice(TYPES)}:")
+        for j in range(shape.body_lines):
+            lines.append(f"    var local_{j} = {rng.randint(0, 99)}")
+            lines += _comment(rng, shape, "    ")
+        lines += ["    return null", ""]
+
+    if rng.random() < shape.comment_density:
+        lines.append("# TODO: synthetic todo")
+    return "\n".join(lines) + "\n"
+
+
+def script_path(root: Path, index: int, shape: CorpusShape) -> Path:
+    """Return the location of script ``index`` below ``root``."""
+
+    directory = root
+    bucket = index // max(shape.files_per_dir, 1)
+    for level in range(shape.nesting_depth):
+        directory = directory / f"dir_{level}_{bucket % 8}"
+        bucket //= 8
+    return directory / f"script_{index:05d}.gd"
+
+
+def write_corpus(root: Path, shape: CorpusShape) -> List[Path]:
+    """Write the project described by ``shape`` below ``root``."""
+
+    paths = []
+    for index in range(shape.files):
+        path = script_path(root, index, shape)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(generate_script(index, shape), encoding="utf-8")
+        paths.append(path)
+    return paths
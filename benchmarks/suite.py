@@ -0,0 +1,178 @@
+"""Benchmark suite for the parser and generator.
+
+Run from the repository root::
+
+    python benchmarks/suite.py --files 2000 --save-baseline
+    # ... change code ...
+    python benchmarks/suite.py --files 2000 --compare
+
+A synthetic project (see :mod:`benchmarks.corpus`) is written to a temporary
+directory and every stage is timed on it.  Each stage reports throughput and
+the peak memory allocated while it runs (measured with ``tracemalloc`` in a
+separate, untimed pass).  ``--save-baseline`` stores the results as JSON and
+``--compare`` prints the change against that baseline.  The
+``render_jinja`` and ``render_native`` stages render the pages in memory
+with the two renderers (see ``--renderer``).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.corpus import CorpusShape, write_corpus  # noqa: E402
+from src import generator, parser  # noqa: E402
+from src.native import NativeRenderer  # noqa: E402
+
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+
+
+def _measure(func: Callable[[], object], repeat: int) -> Dict[str, float]:
+    seconds = min(_timed(func) for _ in range(repeat))
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": seconds, "peak_mb": peak / 2**20}
+
+
+def _timed(func: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def run_suite(shape: CorpusShape, workdir: Path, repeat: int) -> Dict[str, Dict[str, float]]:
+    """Run every benchmark on a corpus written to ``workdir``."""
+
+    source = workdir / "src"
+    output = workdir / "docs"
+    files = write_corpus(source, shape)
+    size = sum(p.stat().st_size for p in files)
+    parsed = [parser.parse_gdscript(str(p)) for p in files]
+    targets = [str((output / p.relative_to(source)).with_suffix(".md")) for p in files]
+    renderer = generator.get_renderer()
+    native = NativeRenderer()
+
+    def parse() -> None:
+        for path in files:
+            parser.parse_gdscript(str(path))
+
+    def render() -> None:
+        for data, target in zip(parsed, targets):
+            generator.generate_markdown(data, target, renderer=renderer)
+
+    def render_jinja() -> None:
+        for data in parsed:
+            renderer.render(data)
+
+    def render_native() -> None:
+        for data in parsed:
+            native.render(data)
+
+    def indexes() -> None:
+        generator.generate_indexes(files, source, output)
+
+    def mkdocs() -> None:
+        generator.generate_mkdocs_yml(workdir, output)
+
+    stages = [
+        ("parse_gdscript", parse, size),
+        ("generate_markdown", render, None),
+        ("render_jinja", render_jinja, None),
+        ("render_native", render_native, None),
+        ("generate_indexes", indexes, None),
+        ("generate_mkdocs_yml", mkdocs, None),
+    ]
+    results: Dict[str, Dict[str, float]] = {}
+    for name, func, nbytes in stages:
+        result = _measure(func, repeat)
+        result["files_per_s"] = len(files) / result["seconds"]
+        if nbytes is not None:
+            result["mb_per_s"] = nbytes / 2**20 / result["seconds"]
+        results[name] = result
+    return results
+
+
+def _format(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], threshold: float) -> List[str]:
+    lines = [f"{'stage':<22}{'seconds':>10}{'files/s':>10}{'MB/s':>8}{'peak MB':>9}{'vs base':>10}"]
+    for name, r in results.items():
+        change = ""
+        base = baseline.get(name)
+        if base:
+            ratio = r["seconds"] / base["seconds"]
+            change = f"{(ratio - 1) * 100:+.1f}%"
+            if ratio > 1 + threshold:
+                change += " REGRESSION"
+        mbps = f"{r['mb_per_s']:.1f}" if "mb_per_s" in r else "-"
+        lines.append(
+            f"{name:<22}{r['seconds']:>10.3f}{r['files_per_s']:>10.0f}{mbps:>8}"
+            f"{r['peak_mb']:>9.2f}  {change}"
+        )
+    return lines
+
+
+def main() -> int:
+    shape_defaults = CorpusShape()
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--files", type=int, default=shape_defaults.files)
+    ap.add_argument("--functions", type=int, default=shape_defaults.functions)
+    ap.add_argument("--comment-density", type=float, default=shape_defaults.comment_density)
+    ap.add_argument("--nesting-depth", type=int, default=shape_defaults.nesting_depth)
+    ap.add_argument("--files-per-dir", type=int, default=shape_defaults.files_per_dir)
+    ap.add_argument("--seed", type=int, default=shape_defaults.seed)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    ap.add_argument("--save-baseline", action="store_true")
+    ap.add_argument("--compare", action="store_true")
+    ap.add_argument("--threshold", type=float, default=0.10,
+                    help="Relative slowdown reported as a regression.")
+    args = ap.parse_args()
+
+    shape = CorpusShape(
+        files=args.files,
+        functions=args.functions,
+        comment_density=args.comment_density,
+        nesting_depth=args.nesting_depth,
+        files_per_dir=args.files_per_dir,
+        seed=args.seed,
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        results = run_suite(shape, Path(tmp), args.repeat)
+
+    baseline: Dict[str, Dict[str, float]] = {}
+    if args.compare:
+        stored = json.loads(args.baseline.read_text(encoding="utf-8"))
+        if stored["shape"] != asdict(shape):
+            print("warning: baseline was recorded with a different corpus shape")
+        baseline = stored["results"]
+
+    print("\n".join(_format(results, baseline, args.threshold)))
+
+    if args.save_baseline:
+        args.baseline.write_text(
+            json.dumps({"shape": asdict(shape), "results": results}, indent=2),
+            encoding="utf-8",
+        )
+        print(f"Baseline written to {args.baseline}")
+
+    regressions = [
+        n for n, r in results.items()
+        if n in baseline and r["seconds"] > baseline[n]["seconds"] * (1 + args.threshold)
+    ]
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,630 @@
+"""Library interface for generating documentation without the command line."""
+
+from __future__ import annotations
+
+import os
+import posixpath
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import (
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    TextIO,
+    Tuple,
+    Union,
+)
+
+from . import generator, parser
+from .changes import Changes
+from .discovery import discover, is_discoverable
+from .export import export
+from .fileio import DEFAULT_IO_WORKERS, IOPool
+from .deps import DependencyGraph, Reason, explain, res_prefix
+from .manifest import BuildManifest, ManifestEntry
+from .native import NativeRenderer
+from .parse_cache import DEFAULT_MAX_BYTES, ParseCache
+from .pipeline import (
+    ParseJob,
+    RenderJob,
+    Timed,
+    ordered_map,
+    parse_script,
+    read_script,
+    render_script,
+    worker_pool,
+)
+from .profiling import Profiler
+from .sinks import MKDOCS_YML, DictSink, DirectorySink, Sink
+from .symbols import DEFAULT_SPLIT_THRESHOLD, SymbolIndex, page_for
+
+PathLike = Union[str, "os.PathLike[str]"]
+
+
+@dataclass
+class BuildOptions:
+    """Settings of a build; the defaults match the command line.
+
+    ``output_dir`` and ``project_root`` only determine the ``docs_dir`` and
+    ``site_name`` written to ``mkdocs.yml`` (a relative ``output_dir`` is
+    relative to ``project_root``, which defaults to the working directory);
+    where files end up is up to the sink.  With ``cache_dir`` set, parse
+    results and compiled templates are cached there.  ``io_workers`` threads
+    read scripts ahead of parsing (1 reads them one at a time).
+    ``renderer_name`` is one of :data:`~src.generator.RENDERERS`.
+    ``limits`` bound the size of and the time spent on a single script.
+    Pages of scripts with more than ``split_threshold`` members are split
+    into an overview and subpages (0 never splits).
+    """
+
+    recursive: bool = False
+    exclude: Sequence[str] = ()
+    use_gitignore: bool = True
+    jobs: int = 1
+    cache_dir: Optional[Path] = None
+    cache_size: int = DEFAULT_MAX_BYTES
+    output_dir: Path = Path("docs")
+    project_root: Optional[Path] = None
+    io_workers: int = DEFAULT_IO_WORKERS
+    renderer_name: str = "jinja"
+    limits: parser.ParseLimits = parser.DEFAULT_LIMITS
+    split_threshold: int = DEFAULT_SPLIT_THRESHOLD
+
+    def parse_cache(self) -> Optional[ParseCache]:
+        if self.cache_dir is None or not self.cache_size:
+            return None
+        return ParseCache(Path(self.cache_dir) / "parse", max_bytes=self.cache_size)
+
+    def renderer(self) -> generator.Renderer:
+        if self.renderer_name == "native":
+            return NativeRenderer()
+        if self.cache_dir is None:
+            return generator.get_renderer()
+        return generator.get_renderer(
+            bytecode_cache_dir=str(Path(self.cache_dir) / "templates")
+        )
+
+    def fingerprint(self, renderer: Optional[generator.Renderer] = None) -> str:
+        """Identify the pages these options produce, for the build manifest."""
+
+        renderer = renderer or self.renderer()
+        return f"{renderer.fingerprint}:split={self.split_threshold}"
+
+    @property
+    def workers(self) -> int:
+        return self.jobs or os.cpu_count() or 1
+
+
+@dataclass
+class BuildResult:
+    """Outcome of :func:`build`.
+
+    ``files`` holds every produced file (see :mod:`src.sinks` for the path
+    convention) when the build ran without a sink and is empty otherwise.
+    ``generated`` and ``removed`` list the pages rendered and deleted by
+    this build, ``reasons`` explains for every generated page why it was
+    rendered and ``summary`` is the sink's summary line.  ``scripts`` is
+    the number of scripts the documentation covers; without scripts and
+    pages to remove nothing is written.
+    """
+
+    files: Dict[str, str] = field(default_factory=dict)
+    generated: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    summary: str = ""
+    reasons: Dict[str, str] = field(default_factory=dict)
+    scripts: int = 0
+
+    @property
+    def pages(self) -> Dict[str, str]:
+        """Script pages by path."""
+
+        return {
+            path: content
+            for path, content in self.files.items()
+            if path != MKDOCS_YML and path.rsplit("/", 1)[-1] != "index.md"
+        }
+
+    @property
+    def indexes(self) -> Dict[str, str]:
+        """Directory index pages by path."""
+
+        return {
+            path: content
+            for path, content in self.files.items()
+            if path.rsplit("/", 1)[-1] == "index.md"
+        }
+
+    @property
+    def mkdocs_yml(self) -> Optional[str]:
+        return self.files.get(MKDOCS_YML)
+
+
+@dataclass(frozen=True)
+class _Move:
+    """Output event: the page at ``source`` moves to the yielded path."""
+
+    source: str
+
+
+class _Build:
+    """State of one build; :meth:`outputs` produces the files."""
+
+    def __init__(
+        self,
+        source: Path,
+        options: BuildOptions,
+        output_dir: Optional[Path],
+        echo: Callable[[str], None],
+        profiler: Optional[Profiler] = None,
+        changes: Optional[Changes] = None,
+        manifest: Optional[BuildManifest] = None,
+        why: bool = False,
+    ) -> None:
+        self.source = source
+        self.base = source if source.is_dir() else source.parent
+        self.options = options
+        self.output_dir = output_dir
+        self.echo = echo
+        self.profiler = profiler
+        self.changes = changes
+        self.manifest = manifest
+        self.generated: List[str] = []
+        self.removed: List[str] = []
+        self.renamed: Set[str] = set()
+        self.skipped = 0
+        self.scripts = 0
+        self.why = why
+        # scripts changed since the last build and what happened to them
+        self.roots: Dict[str, str] = {}
+        # why each generated page was rendered
+        self.reasons: Dict[str, str] = {}
+        # scripts whose page was split differently than before
+        self.relayout: Set[str] = set()
+
+    def _remove(self, key: str, entry: ManifestEntry) -> Iterator[Tuple[str, None]]:
+        """Yield the removal of the page of ``key`` and its subpages."""
+
+        for page in [page_for(key), *entry.pages]:
+            self.removed.append(page)
+            self.echo(f"Removed {page}")
+            yield page, None
+
+    def _files(self) -> Iterator[Path]:
+        files = discover(
+            self.source,
+            self.options.recursive,
+            exclude=self.options.exclude,
+            use_gitignore=self.options.use_gitignore,
+        )
+        if self.profiler is not None:
+            return self.profiler.iterate("discover", files)
+        return files
+
+    def _apply_changes(
+        self, manifest: BuildManifest, changes: Changes, seen: List[str]
+    ) -> Generator[Tuple[str, Union[None, str, _Move]], None, List[str]]:
+        """Fill ``seen`` for an incremental build of ``changes`` only.
+
+        Yields the moves and removals.  Renamed pages are moved and their
+        manifest entries carried over, so unmodified renamed scripts are not
+        parsed again; a script renamed to a path that is not documented
+        (excluded or ignored) counts as deleted.  Returns the keys of the
+        files that have to be checked.
+        """
+
+        options = self.options
+
+        def wanted(key: str) -> bool:
+            return (self.base / key).is_file() and is_discoverable(
+                self.base,
+                key,
+                options.recursive,
+                options.exclude,
+                use_gitignore=options.use_gitignore,
+            )
+
+        check: List[str] = []
+        for old, new in changes.renamed:
+            entry = manifest.remove(old)
+            if not wanted(new):
+                if entry is not None:
+                    self.roots[old] = "was deleted"
+                    yield from self._remove(old, entry)
+                continue
+            if entry is None:
+                check.append(new)
+                continue
+            # the page shows the script's name and path, so it is rendered
+            # again in place; the content hash and parse result are reused
+            entry.data.script.name = Path(new).stem
+            entry.data.script.path = str(self.base / new)
+            manifest.add(new, entry)
+            self.renamed.add(new)
+            self.roots[old] = f"was renamed to {new}"
+            self.roots[new] = f"was renamed from {old}"
+            self.echo(f"Moved {page_for(old)} -> {page_for(new)}")
+            yield page_for(new), _Move(page_for(old))
+
+        for key in changes.deleted:
+            entry = manifest.remove(key)
+            if entry is None:
+                continue
+            self.roots[key] = "was deleted"
+            yield from self._remove(key, entry)
+
+        check.extend(key for key in changes.created + changes.modified if wanted(key))
+        seen.extend(sorted(set(manifest.entries).union(check)))
+        return check
+
+    def outputs(self) -> Iterator[Tuple[str, Union[None, str, _Move]]]:
+        """Yield ``(path, content)`` for every file to write, ``(path, None)``
+        for every page to delete and ``(path, _Move(old))`` for every page to
+        move."""
+
+        options = self.options
+        output_dir = self.output_dir
+        prof = self.profiler
+        parse_cache = options.parse_cache()
+        renderer = options.renderer()
+        manifest = self.manifest
+        if manifest is None and output_dir is not None:
+            start = time.perf_counter()
+            manifest = BuildManifest.load(
+                output_dir,
+                fingerprint=options.fingerprint(renderer),
+                source=str(self.base.resolve()),
+            )
+            if prof is not None:
+                prof.add("manifest", start, time.perf_counter() - start)
+
+        seen: List[str] = []
+        pending: List[Tuple[str, str]] = []
+        parsed: Dict[str, Tuple[str, parser.ParsedScript]] = {}
+
+        changes = self.changes if manifest else None
+        if changes is None and manifest and not self.source.is_dir():
+            # the manifest covers the whole directory; a single script only
+            # updates its own page and leaves the others alone
+            key = self.source.name
+            changes = Changes(modified=[key]) if key in manifest else Changes(created=[key])
+        if changes is not None:
+            # only the listed files are looked at, the tree is not walked
+            check = yield from self._apply_changes(manifest, changes, seen)
+            candidates: Iterable[Path] = [self.base / key for key in check]
+        else:
+            candidates = self._files()
+
+        def load(gd_file: Path) -> Tuple[str, Optional[bytes], str, bool, float, float]:
+            # runs on an I/O thread: reads the script and the page it had
+            start = time.perf_counter()
+            key = gd_file.relative_to(self.base).as_posix()
+            content, source_hash = read_script(gd_file)
+            current = manifest is not None and manifest.is_current(
+                key, source_hash, output_dir / page_for(key)
+            )
+            return key, content, source_hash, current, start, time.perf_counter() - start
+
+        def stale_files() -> Iterator[ParseJob]:
+            # runs lazily while the pool already works on earlier files; the
+            # I/O threads read ahead of it
+            for key, content, source_hash, current, start, duration in io.map(
+                load, candidates
+            ):
+                if changes is None:
+                    seen.append(key)
+                if prof is not None:
+                    prof.add("read", start, duration)
+                    if content is None:  # large file, mapped by the parser
+                        prof.count("bytes_read", (self.base / key).stat().st_size)
+                    else:
+                        prof.count("bytes_read", len(content))
+                if current:
+                    continue
+                pending.append((key, source_hash))
+                yield self.base / key, source_hash, parse_cache, content, options.limits
+
+        parse = parse_script if prof is None else Timed(parse_script)
+        render = render_script if prof is None else Timed(render_script)
+        # chunks in the pool at a time; bounds the scripts read ahead
+        depth = 2 * options.workers
+        with worker_pool(options.workers) as pool, IOPool(options.io_workers) as io:
+            for index, data in enumerate(ordered_map(pool, parse, stale_files(), depth)):
+                key, source_hash = pending[index]
+                if prof is not None:
+                    data, start, duration, pid = data
+                    prof.add("parse", start, duration, pid, file=key)
+                    prof.count("files_parsed")
+                for warning in data.warnings:
+                    self.echo(f"Warning: {key}: {warning}")
+                parsed[key] = (source_hash, data)
+                entry = manifest.get(key) if manifest is not None else None
+                if entry is None:
+                    self.roots.setdefault(key, "is new")
+                elif entry.source_hash != source_hash:
+                    self.roots[key] = "changed"
+
+            if manifest is not None:
+                current = set(seen)
+                for key in manifest:
+                    if key not in current:
+                        self.roots[key] = "was deleted"
+                        yield from self._remove(key, manifest.remove(key))
+
+            # Pages show parts of other scripts.  The pages depending on a
+            # changed script in the previous or the current dependency graph
+            # are rendered again if their resolved links changed.
+            start = time.perf_counter() if prof is not None else 0.0
+            # unchanged scripts come from the manifest without their model
+            symbols = SymbolIndex(options.split_threshold)
+            for key in seen:
+                if key in parsed:
+                    symbols.add(key, parsed[key][1])
+                else:
+                    symbols.insert(key, manifest.entries[key].symbols)
+            graph = DependencyGraph.build(symbols, res_prefix(self.base))
+            dependents: Dict[str, Reason] = {}
+            if manifest is not None:
+                dependents = DependencyGraph(manifest.graph).affected(self.roots)
+                manifest.graph = graph.edges
+            dependents.update(graph.affected(self.roots))
+            if prof is not None:
+                prof.add("symbols", start, time.perf_counter() - start)
+
+            renders: List[Tuple[str, str, parser.ParsedScript, str]] = []
+
+            def render_jobs() -> Iterator[RenderJob]:
+                for key in seen:
+                    if key in parsed:
+                        source_hash, data = parsed[key]
+                    else:
+                        entry = manifest.entries[key]
+                        if key not in self.renamed and key not in dependents:
+                            self.skipped += 1
+                            continue
+                        source_hash, data = entry.source_hash, entry.data
+                    start = time.perf_counter() if prof is not None else 0.0
+                    links = symbols.page_links(key, data)
+                    signature = links.signature()
+                    if prof is not None:
+                        prof.add("links", start, time.perf_counter() - start)
+                    if key in self.roots:
+                        reason = explain(key, {}, self.roots)
+                    elif key in parsed:
+                        reason = "its page was missing or edited"
+                    elif manifest.entries[key].links == signature:
+                        self.skipped += 1
+                        continue
+                    else:
+                        reason = explain(key, dependents, self.roots)
+                    self.reasons[page_for(key)] = reason
+                    renders.append((key, source_hash, data, signature))
+                    yield data, renderer, links
+
+            for index, pages in enumerate(ordered_map(pool, render, render_jobs(), depth)):
+                key, source_hash, data, signature = renders[index]
+                if prof is not None:
+                    pages, start, duration, pid = pages
+                    prof.add("render", start, duration, pid, file=key)
+                    prof.count("pages_rendered", len(pages))
+                page = page_for(key)
+                subpages = symbols.subpages(key)
+                if manifest is not None:
+                    entry = manifest.get(key)
+                    old = entry.pages if entry is not None else []
+                    if old != subpages:
+                        self.relayout.add(key)
+                        # a numbered subpage may leave its name to a script's page
+                        for stale in sorted(set(old).difference(subpages, symbols.pages)):
+                            self.removed.append(stale)
+                            self.echo(f"Removed {stale}")
+                            yield stale, None
+                    markdown = "".join(content for _, content in pages)
+                    manifest.update(key, source_hash, markdown, data, signature, subpages)
+                reason = self.reasons[page]
+                directory = posixpath.dirname(page)
+                for name, markdown in pages:
+                    path = posixpath.join(directory, name) if name else page
+                    self.generated.append(path)
+                    self.echo(f"Generated {path}: {reason}" if self.why else f"Generated {path}")
+                    yield path, markdown
+
+        self.scripts = len(seen)
+        if not seen and not self.removed:
+            return  # nothing to document and nothing to clean up
+
+        start = time.perf_counter()
+        tree = generator.build_tree(
+            (Path(key) for key in seen),
+            {
+                key: [(part.title, part.url) for part in parts]
+                for key, parts in symbols.parts.items()
+            },
+        )
+        # with a known change set only the directories whose listing can
+        # have changed are rendered, and the nav only if pages came or went
+        structural = changes is None or bool(
+            changes.created or changes.deleted or changes.renamed or self.relayout
+        )
+        affected = None if changes is None else _affected_dirs(changes, self.relayout)
+        indexes = [
+            ((node.path / "index.md").as_posix(), generator.render_index(node))
+            for node in tree.walk()
+            if affected is None or node.path.as_posix() in affected
+        ]
+        if prof is not None:
+            prof.add("indexes", start, time.perf_counter() - start)
+        yield from indexes
+
+        if manifest is not None and self.manifest is None:
+            start = time.perf_counter()
+            manifest.save(output_dir)
+            if prof is not None:
+                prof.add("manifest", start, time.perf_counter() - start)
+
+        if structural:
+            start = time.perf_counter()
+            project_root = Path(options.project_root or Path.cwd())
+            nav = generator.render_mkdocs_yml(
+                project_root, project_root / options.output_dir, tree
+            )
+            if prof is not None:
+                prof.add("nav", start, time.perf_counter() - start)
+            yield MKDOCS_YML, nav
+        if parse_cache is not None and parsed:
+            parse_cache.prune()
+
+
+def _affected_dirs(changes: Changes, relayout: Iterable[str] = ()) -> Set[str]:
+    """Directories (``"."`` for the root) whose index may list different
+    entries after ``changes``: the parents of created, deleted and renamed
+    files and all their ancestors, since directories may appear or vanish,
+    and those of the ``relayout`` scripts whose subpages changed."""
+
+    paths = changes.created + changes.deleted + list(relayout)
+    for old, new in changes.renamed:
+        paths.extend((old, new))
+    affected = {"."}
+    for path in paths:
+        parent = posixpath.dirname(path)
+        while parent:
+            affected.add(parent)
+            parent = posixpath.dirname(parent)
+    return affected
+
+
+def _ignore(message: str) -> None:
+    pass
+
+
+def iter_build(
+    source: PathLike,
+    options: Optional[BuildOptions] = None,
+    echo: Callable[[str], None] = _ignore,
+) -> Iterator[Tuple[str, str]]:
+    """Yield ``(path, content)`` for every file of the documentation of
+    ``source`` (a directory or a single ``.gd`` file) as soon as it is
+    rendered.  Nothing is written to disk except the caches."""
+
+    run = _Build(Path(source), options or BuildOptions(), None, echo)
+    for path, content in run.outputs():
+        if isinstance(content, str):
+            yield path, content
+
+
+def build(
+    source: PathLike,
+    options: Optional[BuildOptions] = None,
+    sink: Optional[Sink] = None,
+    echo: Callable[[str], None] = _ignore,
+    profiler: Optional[Profiler] = None,
+    changes: Optional[Changes] = None,
+    manifest: Optional[BuildManifest] = None,
+    why: bool = False,
+) -> BuildResult:
+    """Generate the documentation of ``source`` (a directory or a single
+    ``.gd`` file) into ``sink``.
+
+    Without a sink the files are kept in memory and returned in
+    :attr:`BuildResult.files`.  With a :class:`~src.sinks.DirectorySink`
+    the build is incremental: only changed scripts (and pages linking to
+    them) are rendered and pages of deleted scripts are removed.  ``echo``
+    receives a progress line for every generated or removed page.  The sink
+    is not closed.  A ``profiler`` records the time spent in every stage.
+
+    ``changes`` (e.g. from :func:`src.git.changed_files`) limits an
+    incremental build to the listed files: the tree is not walked, unchanged
+    scripts are not read, renamed pages are moved and only the index pages
+    of affected directories are updated.  Without a previous build in the
+    sink it is ignored and everything is built.
+
+    A long running caller may keep the ``manifest`` of a directory sink in
+    memory (see :mod:`src.server`): it is then used and updated instead of
+    being loaded from and saved to the output directory.
+
+    Besides changed scripts, the pages depending on them (see
+    :mod:`src.deps`) are rendered again.  With ``why`` every "Generated"
+    line passed to ``echo`` says why the page was rendered.
+    """
+
+    options = options or BuildOptions()
+    memory = sink is None
+    sink = sink if sink is not None else DictSink()
+    output_dir = sink.output_dir if isinstance(sink, DirectorySink) else None
+
+    run = _Build(
+        Path(source), options, output_dir, echo, profiler, changes, manifest, why
+    )
+    for path, content in run.outputs():
+        start = time.perf_counter() if profiler is not None else 0.0
+        if content is None:
+            sink.remove(path)
+        elif isinstance(content, _Move):
+            sink.move(content.source, path)
+        else:
+            sink.write(path, content)
+        if profiler is not None:
+            profiler.add("write", start, time.perf_counter() - start)
+    start = time.perf_counter() if profiler is not None else 0.0
+    sink.flush()
+    if profiler is not None:
+        profiler.add("write", start, time.perf_counter() - start)
+    sink.skip(run.skipped)
+    if profiler is not None:
+        profiler.count("files_written", sink.written)
+        profiler.count("files_unchanged", sink.skipped)
+        profiler.count("files_deleted", sink.deleted)
+
+    return BuildResult(
+        files=dict(sink.files) if memory else {},
+        generated=run.generated,
+        removed=run.removed,
+        summary=sink.summary(),
+        reasons=run.reasons,
+        scripts=run.scripts,
+    )
+
+
+def export_model(
+    source: PathLike,
+    options: Optional[BuildOptions] = None,
+    records: Optional[TextIO] = None,
+    index: Optional[TextIO] = None,
+    profiler: Optional[Profiler] = None,
+) -> int:
+    """Parse ``source`` and stream the model to ``records`` and ``index``
+    (see :func:`src.export.export`).  Returns the number of scripts."""
+
+    run = _Build(Path(source), options or BuildOptions(), None, _ignore, profiler)
+    parse_cache = run.options.parse_cache()
+    keys: List[str] = []
+
+    def read(gd_file: Path) -> Tuple[Path, Optional[bytes], str]:
+        return (gd_file, *read_script(gd_file))
+
+    def jobs() -> Iterator[ParseJob]:
+        for gd_file, content, source_hash in io.map(read, run._files()):
+            keys.append(gd_file.relative_to(run.base).as_posix())
+            yield gd_file, source_hash, parse_cache, content, run.options.limits
+
+    def scripts() -> Iterator[Tuple[str, parser.ParsedScript]]:
+        parse = parse_script if profiler is None else Timed(parse_script)
+        for i, data in enumerate(ordered_map(pool, parse, jobs(), 2 * run.options.workers)):
+            if profiler is not None:
+                data, start, duration, pid = data
+                profiler.add("parse", start, duration, pid, file=keys[i])
+                profiler.count("files_parsed")
+            yield keys[i], data
+
+    with worker_pool(run.options.workers) as pool, IOPool(run.options.io_workers) as io:
+        count = export(scripts(), records=records, index=index)
+    if parse_cache is not None:
+        parse_cache.prune()
+    return count
@@ -0,0 +1,49 @@
+"""Changed source files, as passed from change detection to a build."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+
+@dataclass
+class Changes:
+    """Relative ``.gd`` paths (POSIX style) that changed since the last build.
+
+    Produced by polling (:class:`~src.watch.Watcher`), by git
+    (:func:`~src.git.changed_files`) and by ``gd2doc serve`` requests, and
+    consumed by :func:`~src.api.build`.
+
+    Polling shows a rename as a deletion of the old and a creation of the new
+    path; sources that detect renames (git) list them in ``renamed`` as
+    ``(old, new)`` pairs instead.  A renamed file whose content changed is
+    listed in ``modified`` under its new path as well.
+    """
+
+    created: List[str] = field(default_factory=list)
+    modified: List[str] = field(default_factory=list)
+    deleted: List[str] = field(default_factory=list)
+    renamed: List[Tuple[str, str]] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.created or self.modified or self.deleted or self.renamed)
+
+    def merge(self, other: "Changes") -> None:
+        """Fold ``other`` (a later poll) into these changes."""
+
+        for key in other.created:
+            if key in self.deleted:
+                self.deleted.remove(key)
+                self.modified.append(key)
+            else:
+                self.created.append(key)
+        for key in other.modified:
+            if key not in self.created and key not in self.modified:
+                self.modified.append(key)
+        for key in other.deleted:
+            if key in self.created:
+                self.created.remove(key)
+                continue
+            if key in self.modified:
+                self.modified.remove(key)
+            self.deleted.append(key)
@@ -3,28 +3,187 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Callable, Optional, Sequence, TextIO, Tuple, TypeVar
+import os
 import shutil
+import signal
+import sys
 
 import click
 
-from . import parser, generator
+from . import parser
+from .api import BuildOptions, build, export_model
+from .constants import DEFAULT_SOCKET
+from .fileio import DEFAULT_IO_WORKERS
+from .generator import RENDERERS
+from .parse_cache import DEFAULT_MAX_BYTES
+from .profiling import Profiler
+from .sinks import DirectorySink
+from .symbols import DEFAULT_SPLIT_THRESHOLD
 
 
-def _collect_gd_files(root: Path, recursive: bool) -> List[Path]:
-    """Return a list of ``.gd`` files found under ``root``."""
-    if root.is_file() and root.suffix == ".gd":
-        return [root]
+F = TypeVar("F", bound=Callable[..., Any])
 
-    if not root.is_dir():
-        return []
 
-    pattern = "**/*.gd" if recursive else "*.gd"
-    return [p for p in root.glob(pattern)]
+def _report(profiler: Optional[Profiler], output: Optional[Path], fmt: str) -> None:
+    """Print the ``--profile`` table and write ``--profile-output``."""
+
+    if profiler is None:
+        return
+    click.echo(profiler.table(), err=True)
+    if output is not None:
+        profiler.write(str(output), fmt)
+
+
+# options of every command that builds documentation
+_BUILD_OPTIONS = [
+    click.option(
+        "--recursive/--no-recursive",
+        "-r",
+        default=False,
+        help="Search SOURCE recursively for .gd files.",
+    ),
+    click.option(
+        "--project-root",
+        type=click.Path(file_okay=False, path_type=Path),
+        default=None,
+        help="Root directory for mkdocs.yml. Defaults to parent of OUTPUT_DIR.",
+    ),
+    click.option(
+        "--jobs",
+        "-j",
+        type=click.IntRange(min=0),
+        default=1,
+        show_default=True,
+        help="Number of worker processes for parsing and rendering (0 = all CPUs).",
+    ),
+    click.option(
+        "--io-workers",
+        type=click.IntRange(min=1),
+        default=DEFAULT_IO_WORKERS,
+        show_default=True,
+        help="Number of threads reading scripts and writing pages at the same "
+        "time (1 = one file at a time). Higher values help on network file "
+        "systems.",
+    ),
+    click.option(
+        "--cache-dir",
+        type=click.Path(file_okay=False, path_type=Path),
+        default=None,
+        envvar="GD2DOC_CACHE_DIR",
+        help="Cache parse results and compiled templates in this directory, so "
+        "later runs skip unchanged work. Nothing is cached without it.",
+    ),
+    click.option(
+        "--cache-size",
+        type=click.IntRange(min=0),
+        default=DEFAULT_MAX_BYTES // (1024 * 1024),
+        show_default=True,
+        metavar="MB",
+        help="Maximum size of the parse cache; least recently used entries are "
+        "evicted (0 disables the cache).",
+    ),
+    click.option(
+        "--exclude",
+        "-x",
+        multiple=True,
+        metavar="GLOB",
+        help="Skip files and directories matching GLOB (.gitignore syntax, relative "
+        "to SOURCE). Can be given multiple times.",
+    ),
+    click.option(
+        "--gitignore/--no-gitignore",
+        default=True,
+        help="Skip paths ignored by .gitignore files.",
+    ),
+    click.option(
+        "--renderer",
+        "renderer_name",
+        type=click.Choice(RENDERERS),
+        default="jinja",
+        show_default=True,
+        help="Render pages with the Jinja2 template or with the built-in native "
+        "renderer, which is faster and produces the same pages.",
+    ),
+    click.option(
+        "--max-file-size",
+        type=click.IntRange(min=0),
+        default=parser.DEFAULT_LIMITS.max_file_size // (1024 * 1024),
+        show_default=True,
+        metavar="MB",
+        help="Parse only the beginning of larger scripts (0 = no limit).",
+    ),
+    click.option(
+        "--max-line-length",
+        type=click.IntRange(min=0),
+        default=parser.DEFAULT_LIMITS.max_line_length,
+        show_default=True,
+        metavar="BYTES",
+        help="Cut longer lines and declarations (0 = no limit).",
+    ),
+    click.option(
+        "--split-threshold",
+        type=click.IntRange(min=0),
+        default=DEFAULT_SPLIT_THRESHOLD,
+        show_default=True,
+        metavar="MEMBERS",
+        help="Split the page of a script with more members into an overview and "
+        "subpages per member kind, large kinds into alphabetical ranges (0 = never).",
+    ),
+    click.option(
+        "--parse-timeout",
+        type=click.FloatRange(min=0),
+        default=parser.DEFAULT_LIMITS.time_budget,
+        show_default=True,
+        metavar="SECONDS",
+        help="Stop parsing a script after this time and document what was "
+        "found so far (0 = no limit).",
+    ),
+]
+
+
+def _limits(max_file_size: int, max_line_length: int, parse_timeout: float) -> parser.ParseLimits:
+    return parser.ParseLimits(max_file_size * 1024 * 1024, max_line_length, parse_timeout)
+
+
+def _build_options(func: F) -> F:
+    for option in reversed(_BUILD_OPTIONS):
+        func = option(func)
+    return func
+
+
+class _Command(click.Command):
+    """The documentation command, which also runs ``gd2doc serve`` and
+    ``gd2doc client``.
+
+    The subcommands are recognised by the first argument before anything is
+    parsed, so ``gd2doc SOURCE`` keeps working (a source directory named
+    like a subcommand has to be written as ``./serve``).  The client is
+    imported on its own; it does not need the rest of gd2doc.
+    """
+
+    def main(
+        self,
+        args: Optional[Sequence[str]] = None,
+        prog_name: Optional[str] = None,
+        **extra: Any,
+    ) -> Any:
+        args = list(sys.argv[1:] if args is None else args)
+        if args and args[0] == "client":
+            from . import client
+
+            status = client.main(args[1:])
+            if extra.get("standalone_mode", True):
+                sys.exit(status)
+            return status
+        if args and args[0] == "serve":
+            name = f"{prog_name or os.path.basename(sys.argv[0])} serve"
+            return serve.main(args[1:], name, **extra)
+        return super().main(args, prog_name, **extra)
 
 
 @click.command()
-@click.argument("source", type=click.Path(exists=True, path_type=Path))
+@click.argument("source", type=click.Path(exists=True, file_okay=False, path_type=Path))
 @click.option(
     "--output-dir",
     "-o",
@@ -32,54 +191,267 @@ def _collect_gd_files(root: Path, recursive: bool) -> List[Path]:
     required=True,
     help="Directory to write the generated Markdown files to.",
 )
+@_build_options
 @click.option(
-    "--recursive/--no-recursive",
-    "-r",
-    default=False,
-    help="Search SOURCE recursively for .gd files.",
+    "--socket",
+    "socket_path",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=DEFAULT_SOCKET,
+    show_default=True,
+    envvar="GD2DOC_SOCKET",
+    help="Unix socket to listen on.",
+)
+def serve(
+    source: Path,
+    output_dir: Path,
+    recursive: bool,
+    project_root: Optional[Path],
+    jobs: int,
+    io_workers: int,
+    cache_dir: Optional[Path],
+    cache_size: int,
+    exclude: Tuple[str, ...],
+    gitignore: bool,
+    renderer_name: str,
+    max_file_size: int,
+    max_line_length: int,
+    parse_timeout: float,
+    split_threshold: int,
+    socket_path: Path,
+) -> None:
+    """Keep the documentation of ``SOURCE`` up to date for ``gd2doc client``.
+
+    The server builds once, then waits for requests on ``--socket`` and
+    updates the pages of the files named in each request, keeping templates
+    and parsed scripts in memory between requests.  Stop it with Ctrl+C or
+    ``gd2doc client --stop``.
+    """
+
+    from . import server
+
+    root_dir = project_root or Path.cwd()
+    output_dir.mkdir(parents=True, exist_ok=True)
+    options = BuildOptions(
+        recursive=recursive,
+        exclude=exclude,
+        use_gitignore=gitignore,
+        jobs=jobs,
+        io_workers=io_workers,
+        cache_dir=cache_dir,
+        cache_size=cache_size * 1024 * 1024,
+        output_dir=output_dir.resolve(),
+        project_root=root_dir,
+        renderer_name=renderer_name,
+        limits=_limits(max_file_size, max_line_length, parse_timeout),
+        split_threshold=split_threshold,
+    )
+    builds = server.BuildServer(source, output_dir, options, echo=click.echo)
+    # a plain ``kill`` stops the server like Ctrl+C, saving the manifest
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        server.serve(
+            str(socket_path),
+            builds,
+            ready=lambda: click.echo(f"Listening on {socket_path} (Ctrl+C to stop)"),
+        )
+    except RuntimeError as exc:
+        raise click.ClickException(str(exc)) from exc
+    except KeyboardInterrupt:
+        pass
+
+
+@click.command(cls=_Command)
+@click.argument("source", type=click.Path(exists=True, path_type=Path))
+@click.option(
+    "--output-dir",
+    "-o",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=None,
+    help="Directory to write the generated Markdown files to. Required unless "
+    "--export or --export-index is given.",
 )
 @click.option(
     "--clean/--no-clean",
     default=False,
     help="Delete OUTPUT_DIR before generating new documentation.",
 )
+@_build_options
 @click.option(
-    "--project-root",
-    type=click.Path(file_okay=False, path_type=Path),
+    "--watch/--no-watch",
+    default=False,
+    help="Keep running and regenerate pages when .gd files change.",
+)
+@click.option(
+    "--poll-interval",
+    type=click.FloatRange(min=0.05),
+    default=1.0,
+    show_default=True,
+    help="Seconds between checks for changes in --watch mode.",
+)
+@click.option(
+    "--export",
+    "export_file",
+    type=click.File("w", encoding="utf-8", atomic=True),
+    default=None,
+    metavar="FILE",
+    help="Write the parsed data as JSON Lines (one record per script) to FILE "
+    "('-' for stdout) instead of generating Markdown.",
+)
+@click.option(
+    "--export-index",
+    "export_index",
+    type=click.File("w", encoding="utf-8", atomic=True),
+    default=None,
+    metavar="FILE",
+    help="Write a JSON index of all scripts and their members to FILE ('-' for "
+    "stdout) instead of generating Markdown.",
+)
+@click.option(
+    "--changed-since",
+    metavar="REV",
     default=None,
-    help="Root directory for mkdocs.yml. Defaults to parent of OUTPUT_DIR.",
+    help="Only update the pages of .gd files changed since git revision REV "
+    "(including uncommitted and untracked files).",
+)
+@click.option(
+    "--staged",
+    is_flag=True,
+    default=False,
+    help="Only update the pages of .gd files with staged changes (for "
+    "pre-commit hooks).",
+)
+@click.option(
+    "--why",
+    is_flag=True,
+    default=False,
+    help="Explain why each page is rendered: its script changed or it depends "
+    "on a changed script (base class, type, preload).",
+)
+@click.option(
+    "--profile/--no-profile",
+    default=False,
+    help="Print the time spent per stage, counters and the slowest files.",
+)
+@click.option(
+    "--profile-output",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    metavar="FILE",
+    help="Also write the profile to FILE (implies --profile).",
+)
+@click.option(
+    "--profile-format",
+    type=click.Choice(["json", "chrome"]),
+    default="json",
+    show_default=True,
+    help="Format of --profile-output: a JSON summary or a Chrome trace "
+    "(chrome://tracing, Perfetto).",
 )
 def main(
     source: Path,
-    output_dir: Path,
+    output_dir: Optional[Path],
     recursive: bool,
     clean: bool,
     project_root: Optional[Path],
+    jobs: int,
+    io_workers: int,
+    cache_dir: Optional[Path],
+    cache_size: int,
+    watch: bool,
+    poll_interval: float,
+    exclude: Tuple[str, ...],
+    gitignore: bool,
+    renderer_name: str,
+    max_file_size: int,
+    max_line_length: int,
+    parse_timeout: float,
+    split_threshold: int,
+    export_file: Optional[TextIO],
+    export_index: Optional[TextIO],
+    changed_since: Optional[str],
+    staged: bool,
+    why: bool,
+    profile: bool,
+    profile_output: Optional[Path],
+    profile_format: str,
 ) -> None:
-    """Generate documentation for all ``.gd`` files under ``SOURCE``."""
+    """Generate documentation for all ``.gd`` files under ``SOURCE``.
 
-    gd_files = _collect_gd_files(source, recursive)
-    if not gd_files:
-        click.echo("No .gd files found.")
+    Hidden directories (``.godot``, ``.import``, ``.git``, ...), directories
+    containing a ``.gdignore`` file and paths ignored by ``.gitignore`` are
+    skipped.
+    """
+
+    exporting = export_file is not None or export_index is not None
+    if output_dir is None and not exporting:
+        raise click.UsageError("Missing option '--output-dir' / '-o'.")
+    if changed_since is not None and staged:
+        raise click.UsageError("--changed-since and --staged cannot be combined.")
+
+    root_dir = project_root or Path.cwd()
+    options = BuildOptions(
+        recursive=recursive,
+        exclude=exclude,
+        use_gitignore=gitignore,
+        jobs=jobs,
+        io_workers=io_workers,
+        cache_dir=cache_dir,
+        cache_size=cache_size * 1024 * 1024,
+        output_dir=output_dir.resolve() if output_dir else Path("docs"),
+        project_root=root_dir,
+        renderer_name=renderer_name,
+        limits=_limits(max_file_size, max_line_length, parse_timeout),
+        split_threshold=split_threshold,
+    )
+
+    profiler = Profiler() if profile or profile_output else None
+
+    if exporting:
+        count = export_model(
+            source, options, records=export_file, index=export_index, profiler=profiler
+        )
+        click.echo(f"Exported {count} scripts", err=True)
+        _report(profiler, profile_output, profile_format)
         return
 
     if clean and output_dir.exists():
         shutil.rmtree(output_dir)
 
-    output_dir.mkdir(parents=True, exist_ok=True)
+    changes = None
+    if changed_since is not None or staged:
+        from .git import GitError, changed_files
+
+        base = source if source.is_dir() else source.parent
+        try:
+            changes = changed_files(base, since=changed_since, staged=staged)
+        except GitError as exc:
+            raise click.ClickException(str(exc)) from exc
 
-    base = source if source.is_dir() else source.parent
-    for gd_file in gd_files:
-        data = parser.parse_gdscript(str(gd_file))
-        rel = gd_file.relative_to(base)
-        target = (output_dir / rel).with_suffix(".md")
-        generator.generate_markdown(data, str(target))
-        click.echo(f"Generated {target.relative_to(output_dir)}")
+    with DirectorySink(output_dir, root_dir, io_workers=io_workers) as sink:
+        result = build(
+            source,
+            options,
+            sink,
+            echo=click.echo,
+            profiler=profiler,
+            changes=changes,
+            why=why,
+        )
+    if result.scripts or result.removed:
+        click.echo(f"Files: {result.summary}")
+    else:
+        click.echo("No .gd files found.")
+    _report(profiler, profile_output, profile_format)
 
-    generator.generate_indexes(gd_files, base, output_dir)
+    if watch:
+        from .watch import Watcher
 
-    root_dir = project_root or Path.cwd()
-    generator.generate_mkdocs_yml(root_dir, output_dir)
+        watcher = Watcher(source, output_dir, options, echo=click.echo, why=why)
+        click.echo(f"Watching {source} for changes (Ctrl+C to stop)")
+        try:
+            watcher.run(interval=poll_interval)
+        except KeyboardInterrupt:
+            pass
 
 
 if __name__ == "__main__":  # pragma: no cover - manual invocation
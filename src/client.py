@@ -0,0 +1,94 @@
+"""Thin client for ``gd2doc serve``.
+
+Only the standard library's socket and JSON modules are loaded, so a
+request costs little more than starting the interpreter.  See
+:mod:`src.server` for the protocol.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import sys
+from typing import Any, Dict, Optional, Sequence
+
+from .constants import DEFAULT_SOCKET
+
+
+class ClientError(RuntimeError):
+    """The server could not be reached or answered with an error."""
+
+
+def request(
+    socket_path: str, message: Dict[str, Any], timeout: Optional[float] = None
+) -> Dict[str, Any]:
+    """Send ``message`` to the server at ``socket_path`` and return its reply."""
+
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    conn.settimeout(timeout)
+    try:
+        try:
+            conn.connect(socket_path)
+        except OSError as exc:
+            reason = exc.strerror or exc
+            raise ClientError(f"No gd2doc server at {socket_path}: {reason}") from exc
+        conn.sendall(json.dumps(message).encode("utf-8") + b"\n")
+        with conn.makefile("rb") as stream:
+            line = stream.readline()
+    finally:
+        conn.close()
+    if not line:
+        raise ClientError("The server closed the connection without a reply")
+    reply = json.loads(line)
+    if not reply.get("ok"):
+        raise ClientError(reply.get("error", "unknown error"))
+    return reply
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run ``gd2doc client`` with ``argv`` and return the exit status."""
+
+    import argparse
+
+    ap = argparse.ArgumentParser(
+        prog="gd2doc client",
+        description="Ask a running `gd2doc serve` to update the pages of the "
+        "given .gd files (all files if none are given) and print what changed.",
+    )
+    ap.add_argument("paths", nargs="*", metavar="PATH")
+    ap.add_argument(
+        "--socket",
+        default=os.environ.get("GD2DOC_SOCKET") or DEFAULT_SOCKET,
+        help="socket of the server (default: $GD2DOC_SOCKET or %(default)s)",
+    )
+    command = ap.add_mutually_exclusive_group()
+    command.add_argument(
+        "--status", action="store_const", const="status", dest="command",
+        help="print the state of the server",
+    )
+    command.add_argument(
+        "--stop", action="store_const", const="stop", dest="command", help="stop the server"
+    )
+    args = ap.parse_args(argv)
+
+    message: Dict[str, Any] = {"command": args.command or "build"}
+    if args.paths:
+        # the server does not know the client's working directory
+        message["paths"] = [os.path.abspath(path) for path in args.paths]
+    try:
+        reply = request(args.socket, message)
+    except ClientError as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+
+    if message["command"] == "status":
+        for key in ("source", "output_dir", "scripts", "builds"):
+            print(f"{key}: {reply[key]}")
+    elif message["command"] == "build":
+        for page in reply["removed"]:
+            print(f"Removed {page}")
+        for page in reply["generated"]:
+            print(f"Generated {page}")
+        print(f"Files: {reply['summary']}")
+    return 0
@@ -0,0 +1,9 @@
+"""Constants shared by the command line, the server and the thin client.
+
+This module imports nothing, so :mod:`src.cli` and :mod:`src.client` can
+use these values without loading the modules that define the features.
+"""
+
+#: Socket used by ``gd2doc serve`` and ``gd2doc client`` unless ``--socket``
+#: or ``GD2DOC_SOCKET`` name another one.
+DEFAULT_SOCKET = ".gd2doc.sock"
@@ -0,0 +1,173 @@
+"""Dependency graph between scripts, used to find the pages a change affects.
+
+A page shows more than its own script: the members inherited from every
+ancestor, links to the scripts named in types (including anchors of their
+enums and constants) and the subclasses of its class.  The graph records
+these dependencies, resolved to script keys (POSIX paths relative to the
+source directory), from the references of every script kept in the
+symbol index (see :attr:`~src.symbols.ScriptSymbols.references`).  Edges
+point from a script to the scripts its page depends on and carry one of
+the kinds below; a split page also depends on the scripts whose pages its
+subpages could be named like.  Changes propagate along ``extends`` edges,
+since a page lists the members of all its ancestors; the other kinds only
+affect the pages directly referring to the changed script.
+"""
+
+from __future__ import annotations
+
+import posixpath
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+from .symbols import SymbolIndex, split_owner
+
+EXTENDS = "extends"
+#: The page of a base class lists the scripts extending it.
+SUBCLASS = "subclass"
+TYPE = "type"
+PRELOAD = "preload"
+LOAD = "load"
+#: A subpage of a split page is numbered while a script has its name.
+PAGE = "page"
+
+# where the dependency comes from, for --why
+_PHRASES = {
+    EXTENDS: "extends",
+    SUBCLASS: "lists subclass",
+    TYPE: "refers to",
+    PRELOAD: "preloads",
+    LOAD: "loads",
+    PAGE: "shares a page name with",
+}
+
+#: ``reasons`` of :meth:`DependencyGraph.affected`: the kind of dependency
+#: and the script depended on.
+Reason = Tuple[str, str]
+
+
+def res_prefix(base: Path) -> str:
+    """Return the path of ``base`` below the Godot project (the directory
+    with ``project.godot``) that ``res://`` paths are relative to.  Empty if
+    ``base`` is the project directory or no project file is found."""
+
+    base = base.resolve()
+    for parent in (base, *base.parents):
+        if (parent / "project.godot").is_file():
+            return base.relative_to(parent).as_posix().strip(".")
+    return ""
+
+
+def resolve_path(target: str, key: str, prefix: str = "") -> Optional[str]:
+    """Return the key of the script at ``target`` as written in ``key``:
+    a ``res://`` path or a path relative to the directory of ``key``."""
+
+    if target.startswith("res://"):
+        path = posixpath.normpath(target[len("res://"):].lstrip("/"))
+        if prefix:
+            if not path.startswith(prefix + "/"):
+                return None
+            path = path[len(prefix) + 1:]
+        return path
+    if "://" in target:  # uid:// and other schemes
+        return None
+    return posixpath.normpath(posixpath.join(posixpath.dirname(key), target))
+
+
+def _is_path(kind: str, target: str) -> bool:
+    return kind in (PRELOAD, LOAD) or "/" in target or target.endswith(".gd")
+
+
+class DependencyGraph:
+    """Dependencies between the pages of a project.
+
+    ``edges`` maps every script key to ``{dependency key: kind}``; it is
+    plain JSON compatible data and kept in the build manifest between
+    runs.
+    """
+
+    def __init__(self, edges: Optional[Dict[str, Dict[str, str]]] = None) -> None:
+        self.edges: Dict[str, Dict[str, str]] = edges if edges is not None else {}
+        self._dependents: Optional[Dict[str, Dict[str, str]]] = None
+
+    @classmethod
+    def build(cls, symbols: SymbolIndex, prefix: str = "") -> "DependencyGraph":
+        """Resolve the references of every script in ``symbols`` against the
+        index and ``res://`` paths below ``prefix``."""
+
+        graph = cls()
+        edges = graph.edges
+        known = symbols.scripts
+        for key, script in known.items():
+            deps = edges.setdefault(key, {})
+            for kind, name in script.references:
+                if _is_path(kind, name):
+                    target = resolve_path(name, key, prefix)
+                else:  # ``Class`` or ``Class.Enum``
+                    target = symbols.class_key(name.partition(".")[0])
+                if target is None or target == key or target not in known:
+                    continue
+                if deps.get(target) != EXTENDS:
+                    deps[target] = kind
+                if kind == EXTENDS and script.extends == name:
+                    edges.setdefault(target, {}).setdefault(key, SUBCLASS)
+            owner = symbols.pages.get(split_owner(script.page))
+            if owner in symbols.parts:
+                edges.setdefault(owner, {}).setdefault(key, PAGE)
+        return graph
+
+    @property
+    def dependents(self) -> Dict[str, Dict[str, str]]:
+        """The reversed edges: ``{key: {dependent key: kind}}``."""
+
+        if self._dependents is None:
+            reverse: Dict[str, Dict[str, str]] = {}
+            for key, deps in self.edges.items():
+                for dep, kind in deps.items():
+                    reverse.setdefault(dep, {})[key] = kind
+            self._dependents = reverse
+        return self._dependents
+
+    def affected(self, changed: Iterable[str]) -> Dict[str, Reason]:
+        """Return the pages depending on the ``changed`` scripts, each with
+        the dependency that brought it in.
+
+        Scripts inheriting from an affected script through any number of
+        ``extends`` edges are affected as well.
+        """
+
+        changed = set(changed)
+        dependents = self.dependents
+        reasons: Dict[str, Reason] = {}
+        inheriting = set()
+        queue = deque((key, True) for key in sorted(changed))
+        while queue:
+            key, direct = queue.popleft()
+            for dependent, kind in sorted(dependents.get(key, {}).items()):
+                if dependent in changed:
+                    continue
+                if kind == EXTENDS:
+                    # may already be listed for a reference, but its own
+                    # subclasses still have to be followed
+                    if dependent not in inheriting:
+                        inheriting.add(dependent)
+                        reasons[dependent] = (kind, key)
+                        queue.append((dependent, False))
+                elif direct and dependent not in reasons:
+                    reasons[dependent] = (kind, key)
+        return reasons
+
+
+def explain(key: str, reasons: Mapping[str, Reason], roots: Mapping[str, str]) -> str:
+    """Describe why the page of ``key`` is rendered, following ``reasons``
+    (from :meth:`DependencyGraph.affected`) back to one of ``roots``, which
+    maps changed keys to what happened to them (e.g. ``"changed"``)."""
+
+    parts: List[str] = []
+    while key in reasons and key not in roots:
+        kind, key = reasons[key]
+        parts.append(f"{_PHRASES.get(kind, kind)} {key}")
+    parts.append(roots.get(key, "changed"))
+    if len(parts) == 1:
+        return f"{key} {parts[0]}"
+    return ", which ".join(parts)
@@ -0,0 +1,264 @@
+"""Streaming discovery of ``.gd`` files with ignore rules."""
+
+from __future__ import annotations
+
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+GDIGNORE = ".gdignore"
+GITIGNORE = ".gitignore"
+
+
+@dataclass
+class IgnoreRule:
+    """A single ``.gitignore`` style pattern.
+
+    ``base`` is the directory (relative to the walk root, POSIX style, ``""``
+    for the root itself) the pattern is relative to.  Rules read from a
+    ``.gitignore`` above the walk root have an empty ``base`` and ``prefix``
+    set to the path of the walk root relative to that ``.gitignore``.
+    """
+
+    regex: "re.Pattern[str]"
+    base: str
+    anchored: bool
+    negated: bool = False
+    dir_only: bool = False
+    prefix: str = ""
+
+    def matches(self, rel: str, name: str, is_dir: bool) -> bool:
+        if self.dir_only and not is_dir:
+            return False
+        if self.prefix:
+            rel = f"{self.prefix}/{rel}"
+        elif self.base:
+            if not rel.startswith(self.base + "/"):
+                return False
+            rel = rel[len(self.base) + 1:]
+        return bool(self.regex.fullmatch(rel if self.anchored else name))
+
+
+def _translate(pattern: str) -> str:
+    """Translate a gitignore glob into a regular expression."""
+
+    out = []
+    i = 0
+    n = len(pattern)
+    while i < n:
+        c = pattern[i]
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("/**", i) and i + 3 == n:
+            out.append("/.*")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif c == "*":
+            out.append("[^/]*")
+            i += 1
+        elif c == "?":
+            out.append("[^/]")
+            i += 1
+        elif c == "[":
+            end = pattern.find("]", i + 1)
+            if end == -1:
+                out.append(re.escape(c))
+                i += 1
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = end + 1
+        elif c == "\\" and i + 1 < n:
+            out.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            out.append(re.escape(c))
+            i += 1
+    return "".join(out)
+
+
+def parse_rule(line: str, base: str = "") -> Optional[IgnoreRule]:
+    """Return the rule for one ``.gitignore`` line or ``None`` for blanks and
+    comments."""
+
+    line = line.rstrip("\n").rstrip()
+    if not line or line.startswith("#"):
+        return None
+    negated = line.startswith("!")
+    if negated:
+        line = line[1:]
+    dir_only = line.endswith("/")
+    line = line.rstrip("/")
+    if not line:
+        return None
+    anchored = "/" in line
+    line = line.lstrip("/")
+    return IgnoreRule(
+        regex=re.compile(_translate(line)),
+        base=base,
+        anchored=anchored,
+        negated=negated,
+        dir_only=dir_only,
+    )
+
+
+def _read_rules(path: Path, base: str) -> List[IgnoreRule]:
+    try:
+        text = path.read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError):
+        return []
+    rules = (parse_rule(line, base) for line in text.splitlines())
+    return [rule for rule in rules if rule is not None]
+
+
+def _ancestor_rules(root: Path) -> List[IgnoreRule]:
+    """Rules from ``.gitignore`` files above ``root`` inside its git repository,
+    outermost first.  Nothing is returned if ``root`` is not in a repository."""
+
+    groups: List[List[IgnoreRule]] = []
+    current = root.resolve()
+    parts: List[str] = []
+    for directory in [current, *current.parents]:
+        if parts:
+            rules = _read_rules(directory / GITIGNORE, "")
+            prefix = "/".join(reversed(parts))
+            for rule in rules:
+                rule.prefix = prefix
+            groups.append(rules)
+        if (directory / ".git").exists():
+            return [rule for group in reversed(groups) for rule in group]
+        parts.append(directory.name)
+    return []
+
+
+def _is_ignored(rules: Sequence[IgnoreRule], rel: str, name: str, is_dir: bool) -> bool:
+    ignored = False
+    for rule in rules:
+        if ignored == rule.negated and rule.matches(rel, name, is_dir):
+            ignored = not rule.negated
+    return ignored
+
+
+def discover(
+    root: Path,
+    recursive: bool = True,
+    exclude: Iterable[str] = (),
+    use_gitignore: bool = True,
+    skip_hidden: bool = True,
+) -> Iterator[Path]:
+    """Yield the ``.gd`` files below ``root`` while walking the tree.
+
+    Directories are pruned as soon as they are reached, so excluded trees are
+    never listed: directories containing a ``.gdignore`` file (Godot's
+    convention for folders the editor should not import), hidden directories
+    such as ``.godot``, ``.import`` or ``.git`` (unless ``skip_hidden`` is
+    false), paths matching a ``.gitignore`` of the repository (when
+    ``use_gitignore`` is true) and paths matching one of the ``exclude``
+    globs.  ``exclude`` globs use ``.gitignore`` syntax relative to
+    ``root``.
+
+    Entries are visited in sorted order so the result is deterministic.
+    Paths are yielded lazily, letting callers start working before the walk
+    finishes.  Symlinked directories are followed, but every directory is
+    walked only once, so a link pointing to one of its parents ends there.
+    """
+
+    if root.is_file():
+        if root.suffix == ".gd":
+            yield root
+        return
+    if not root.is_dir():
+        return
+
+    base_rules: List[IgnoreRule] = []
+    if use_gitignore:
+        base_rules.extend(_ancestor_rules(root))
+    base_rules.extend(filter(None, (parse_rule(p) for p in exclude)))
+
+    st = root.stat()
+    visited: Set[Tuple[int, int]] = {(st.st_dev, st.st_ino)}
+    stack: List[Tuple[Path, str, List[IgnoreRule]]] = [(root, "", base_rules)]
+    while stack:
+        directory, rel_dir, rules = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+
+        names = {e.name for e in entries}
+        if GDIGNORE in names:
+            continue
+        if use_gitignore and GITIGNORE in names:
+            rules = rules + _read_rules(directory / GITIGNORE, rel_dir)
+
+        subdirs = []
+        for entry in entries:
+            name = entry.name
+            rel = f"{rel_dir}/{name}" if rel_dir else name
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                continue
+            if is_dir:
+                if not recursive or (skip_hidden and name.startswith(".")):
+                    continue
+                if _is_ignored(rules, rel, name, True):
+                    continue
+                try:
+                    # DirEntry.stat() has no inode on Windows
+                    st = os.stat(entry.path)
+                except OSError:
+                    continue
+                if (st.st_dev, st.st_ino) in visited:
+                    continue
+                visited.add((st.st_dev, st.st_ino))
+                subdirs.append((Path(entry.path), rel, rules))
+            elif name.endswith(".gd") and not _is_ignored(rules, rel, name, False):
+                yield Path(entry.path)
+
+        # reversed so the stack pops subdirectories in sorted order
+        stack.extend(reversed(subdirs))
+
+
+def is_discoverable(
+    root: Path,
+    rel: str,
+    recursive: bool = True,
+    exclude: Iterable[str] = (),
+    skip_hidden: bool = True,
+    use_gitignore: bool = False,
+) -> bool:
+    """Return whether :func:`discover` would yield ``root / rel``.
+
+    Used for file lists obtained elsewhere, e.g. from git or a client of
+    ``gd2doc serve``.  With ``use_gitignore`` the ``.gitignore`` rules of
+    the repository apply as in :func:`discover`; they are off by default
+    since lists of untracked files from git already respect them.
+    """
+
+    parts = rel.split("/")
+    if not rel.endswith(".gd") or (not recursive and len(parts) > 1):
+        return False
+    rules: List[IgnoreRule] = _ancestor_rules(root) if use_gitignore else []
+    rules.extend(filter(None, (parse_rule(p) for p in exclude)))
+    directory = root
+    for depth, name in enumerate(parts):
+        if (directory / GDIGNORE).exists():
+            return False
+        if use_gitignore:
+            rules.extend(_read_rules(directory / GITIGNORE, "/".join(parts[:depth])))
+        is_dir = depth < len(parts) - 1
+        if is_dir and skip_hidden and name.startswith("."):
+            return False
+        if _is_ignored(rules, "/".join(parts[: depth + 1]), name, is_dir):
+            return False
+        directory = directory / name
+    return True
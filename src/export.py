@@ -0,0 +1,72 @@
+"""Streaming JSON export of the parsed model for other tools."""
+
+from __future__ import annotations
+
+import json
+from dataclasses import asdict
+from typing import Any, Dict, Iterable, Optional, TextIO, Tuple
+
+from .parser import ParsedScript
+from .symbols import ScriptSymbols
+
+#: Version of the export format.  Incremented on incompatible changes;
+#: added fields do not change it.
+SCHEMA_VERSION = 1
+
+
+def _dumps(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def script_record(key: str, parsed: ParsedScript) -> Dict[str, Any]:
+    """Return the JSONL record for script ``key`` (its POSIX path relative to
+    the source directory)."""
+
+    record: Dict[str, Any] = {"schema_version": SCHEMA_VERSION, "path": key}
+    record.update(asdict(parsed))
+    return record
+
+
+def index_entry(key: str, parsed: ParsedScript) -> Dict[str, Any]:
+    """Return the summary of script ``key`` listed in the index file."""
+
+    script = parsed.script
+    return {
+        "path": key,
+        "name": script.name,
+        "class_name": script.class_name,
+        "extends": script.extends,
+        "short_description": script.short_description,
+        "members": ScriptSymbols.from_parsed(key, parsed).members,
+    }
+
+
+def export(
+    scripts: Iterable[Tuple[str, ParsedScript]],
+    records: Optional[TextIO] = None,
+    index: Optional[TextIO] = None,
+) -> int:
+    """Write ``scripts`` as they arrive and return how many were written.
+
+    Every script becomes one line of ``records`` (JSON Lines, see
+    :func:`script_record`).  ``index`` receives a single JSON document
+    ``{"schema_version": ..., "scripts": [...]}`` with one
+    :func:`index_entry` per script; it is written incrementally as well, so
+    neither output is held in memory.
+    """
+
+    count = 0
+    if index is not None:
+        index.write(f'{{"schema_version":{SCHEMA_VERSION},"scripts":[')
+    for key, parsed in scripts:
+        if records is not None:
+            records.write(_dumps(script_record(key, parsed)))
+            records.write("\n")
+        if index is not None:
+            if count:
+                index.write(",")
+            index.write(_dumps(index_entry(key, parsed)))
+        count += 1
+    if index is not None:
+        index.write("]}\n")
+    return count
@@ -0,0 +1,120 @@
+"""Overlapping blocking file I/O with a bounded pool of threads."""
+
+from __future__ import annotations
+
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Generic, Iterable, Iterator, List, Optional, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+#: Default number of I/O threads.  File operations mostly wait for the file
+#: system, so more threads than CPUs pay off on slow (network) storage.
+DEFAULT_IO_WORKERS = 8
+
+
+class Task(Generic[R]):
+    """Result of a call submitted to an :class:`IOPool`."""
+
+    def __init__(self, func: Callable[..., R], args: tuple) -> None:
+        self._func = func
+        self._args = args
+        self._done = threading.Event()
+        self._result: Optional[R] = None
+        self._error: Optional[BaseException] = None
+
+    def run(self) -> None:
+        try:
+            self._result = self._func(*self._args)
+        except BaseException as exc:  # re-raised by result()
+            self._error = exc
+        finally:
+            self._done.set()
+
+    def result(self) -> R:
+        """Wait for the call and return its result or raise its exception."""
+
+        self._done.wait()
+        if self._error is not None:
+            raise self._error
+        return self._result  # type: ignore[return-value]
+
+
+class IOPool:
+    """Run blocking file operations on up to ``workers`` threads.
+
+    Reading and writing many small files is dominated by the latency of
+    each call on network file systems; running several calls at a time
+    hides it.  Threads are started on first use, and with ``workers`` <= 1
+    every call runs in the calling thread.  Plain threads are used rather
+    than :mod:`concurrent.futures`, whose import (it loads :mod:`logging`)
+    would slow down every start of the command line.
+    """
+
+    def __init__(self, workers: int = DEFAULT_IO_WORKERS) -> None:
+        self.workers = max(1, workers)
+        self._queue: Any = None
+        self._threads: List[threading.Thread] = []
+
+    def submit(self, func: Callable[..., R], *args: Any) -> Task[R]:
+        """Call ``func(*args)`` on a pool thread."""
+
+        task = Task(func, args)
+        if self.workers <= 1:
+            task.run()
+            return task
+        if self._queue is None:
+            import queue
+
+            self._queue = queue.SimpleQueue()
+        if len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._work, name="gd2doc-io", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        self._queue.put(task)
+        return task
+
+    def _work(self) -> None:
+        while True:
+            task = self._queue.get()
+            if task is None:
+                return
+            task.run()
+
+    def map(
+        self, func: Callable[[T], R], items: Iterable[T], depth: Optional[int] = None
+    ) -> Iterator[R]:
+        """Yield ``func(item)`` for ``items`` in order.
+
+        At most ``depth`` calls (default: twice the number of threads) run
+        ahead of the consumer, so ``items`` is consumed lazily and memory
+        stays bounded.  An exception is raised when its result is reached.
+        """
+
+        if self.workers <= 1:
+            yield from map(func, items)
+            return
+        depth = depth or 2 * self.workers
+        pending: Deque[Task[R]] = deque()
+        for item in items:
+            pending.append(self.submit(func, item))
+            if len(pending) >= depth:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+    def close(self) -> None:
+        """Finish the submitted calls and stop the threads."""
+
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def __enter__(self) -> "IOPool":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
@@ -1,20 +1,213 @@
-"""Markdown documentation generator using Jinja2 templates."""
+"""Markdown documentation generator using Jinja2 templates.
+
+Jinja2 is imported only when a page is actually rendered, so builds where
+nothing changed (and the index and nav helpers) do not pay for it.  Without
+Jinja2, pages are rendered by :mod:`src.native`.
+"""
 
 from __future__ import annotations
 
+import hashlib
+import importlib.util
 import os
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, Optional, List
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+from .native import NativeRenderer, native_fingerprint
+from .parser import ParsedScript
+from .symbols import NO_LINKS, PageLinks, PagePart
+from .writer import FileWriter
+
+TEMPLATE_NAME = "doc.md.j2"
+
+#: Names accepted by ``--renderer``: the Jinja2 template or :mod:`src.native`.
+RENDERERS = ("jinja", "native")
+
+_JINJA_AVAILABLE: Optional[bool] = None
+
+
+def jinja_available() -> bool:
+    """Return whether Jinja2 is installed, without importing it."""
+
+    global _JINJA_AVAILABLE
+    if _JINJA_AVAILABLE is None:
+        _JINJA_AVAILABLE = importlib.util.find_spec("jinja2") is not None
+    return _JINJA_AVAILABLE
+
+
+def _template_dir(template_dir: Optional[str] = None) -> str:
+    return template_dir or os.path.join(os.path.dirname(__file__), "templates")
+
+
+def template_fingerprint(template_dir: Optional[str] = None) -> str:
+    """Return a digest identifying the template used for rendering.
+
+    Incremental builds compare this value to decide whether previously
+    generated pages can be reused.
+    """
+
+    if not jinja_available():
+        return native_fingerprint()
+    digest = hashlib.sha256()
+    path = Path(_template_dir(template_dir)) / TEMPLATE_NAME
+    try:
+        digest.update(path.read_bytes())
+    except OSError:
+        pass
+    return digest.hexdigest()
+
+
+class MarkdownRenderer:
+    """Render parsed GDScript data with a template that is compiled once.
+
+    Parameters
+    ----------
+    template_dir:
+        Optional directory containing the ``doc.md.j2`` template.  If not
+        supplied the ``templates`` directory next to this file is used.
+    bytecode_cache_dir:
+        Optional directory for Jinja2's on-disk bytecode cache.  When set,
+        later processes load the compiled template from there instead of
+        compiling it again.
+
+    Instances are picklable; unpickling goes through :func:`get_renderer`, so
+    worker processes reuse one compiled template per process.
+    """
+
+    def __init__(
+        self,
+        template_dir: Optional[str] = None,
+        bytecode_cache_dir: Optional[str] = None,
+    ) -> None:
+        self.template_dir = _template_dir(template_dir)
+        self.bytecode_cache_dir = bytecode_cache_dir
+        self._environment = None
+        self._template = None
+
+    def __reduce__(self):
+        return (get_renderer, (self.template_dir, self.bytecode_cache_dir))
+
+    @property
+    def fingerprint(self) -> str:
+        """Digest of the template, see :func:`template_fingerprint`."""
+
+        return template_fingerprint(self.template_dir)
+
+    @property
+    def environment(self):
+        """The Jinja2 environment (``None`` without Jinja2), created on first
+        use."""
+
+        if self._environment is None and jinja_available():
+            from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+            bytecode_cache = None
+            if self.bytecode_cache_dir:
+                os.makedirs(self.bytecode_cache_dir, exist_ok=True)
+                bytecode_cache = FileSystemBytecodeCache(self.bytecode_cache_dir)
+            self._environment = Environment(
+                loader=FileSystemLoader(self.template_dir),
+                autoescape=False,
+                trim_blocks=True,
+                lstrip_blocks=True,
+                bytecode_cache=bytecode_cache,
+                auto_reload=False,
+            )
+        return self._environment
+
+    @property
+    def template(self):
+        """The compiled template, loaded on first use."""
+
+        if self._template is None and self.environment is not None:
+            self._template = self.environment.get_template(TEMPLATE_NAME)
+        return self._template
+
+    def render(
+        self,
+        data: Union[ParsedScript, Dict[str, Any]],
+        links: Optional[PageLinks] = None,
+    ) -> str:
+        """Return the Markdown page for ``data``.
+
+        ``links`` are the cross references resolved by a
+        :class:`~src.symbols.SymbolIndex`; without them type names are
+        rendered as plain text.
+        """
+
+        template = self.template
+        if template is None:  # Jinja2 is not installed
+            return NativeRenderer().render(data, links)
+        links = links or NO_LINKS
+        if isinstance(data, ParsedScript):
+            return template.render(data.context(), links=links)
+        return template.render(**data, links=links)
+
+
+_RENDERERS: Dict[Tuple[str, Optional[str]], MarkdownRenderer] = {}
+
+
+def get_renderer(
+    template_dir: Optional[str] = None, bytecode_cache_dir: Optional[str] = None
+) -> MarkdownRenderer:
+    """Return a shared :class:`MarkdownRenderer` for the given settings."""
+
+    key = (_template_dir(template_dir), bytecode_cache_dir)
+    renderer = _RENDERERS.get(key)
+    if renderer is None:
+        renderer = _RENDERERS[key] = MarkdownRenderer(*key)
+    return renderer
+
+
+#: Either kind of renderer; both have ``render(data, links)`` and ``fingerprint``.
+Renderer = Union[MarkdownRenderer, NativeRenderer]
+
+
+def _part_view(data: ParsedScript, part: PagePart) -> ParsedScript:
+    """Return the members of ``data`` shown on the subpage ``part``."""
+
+    holds = part.holds
+    return ParsedScript(
+        script=data.script,
+        signals=[s for s in data.signals if holds("signal", s.name)],
+        enums=[e for e in data.enums if holds("enum", e.name)],
+        consts=[c for c in data.consts if holds("const", c.name)],
+        variables=[v for v in data.variables if holds("var", v.name)],
+        functions=[f for f in data.functions if holds("func", f.name)],
+    )
 
-try:
-    from jinja2 import Environment, FileSystemLoader
-except ModuleNotFoundError:  # pragma: no cover - optional dependency
-    Environment = None  # type: ignore
-    FileSystemLoader = None  # type: ignore
+
+def render_pages(
+    renderer: Renderer,
+    data: Union[ParsedScript, Dict[str, Any]],
+    links: Optional[PageLinks] = None,
+) -> List[Tuple[str, str]]:
+    """Return ``(name, markdown)`` for the page of ``data`` and its subpages.
+
+    The page itself comes first with an empty name.  If ``links`` split
+    the page (see :func:`~src.symbols.split_page`), every subpage follows
+    with its file name, which is relative to the directory of the page.
+    """
+
+    links = links or NO_LINKS
+    if not links.parts:
+        return [("", renderer.render(data, links))]
+    if not isinstance(data, ParsedScript):
+        data = ParsedScript.from_dict(data)
+    pages = [("", renderer.render(data, links))]
+    for part in links.parts:
+        pages.append((part.url, renderer.render(_part_view(data, part), links.for_part(part))))
+    return pages
 
 
 def generate_markdown(
-    data: Dict[str, Any], output_path: str, template_dir: Optional[str] = None
+    data: Union[ParsedScript, Dict[str, Any]],
+    output_path: str,
+    template_dir: Optional[str] = None,
+    renderer: Optional[Renderer] = None,
+    writer: Optional[FileWriter] = None,
+    links: Optional[PageLinks] = None,
 ) -> str:
     """Generate a Markdown file from parsed GDScript data.
 
@@ -27,36 +220,124 @@ def generate_markdown(
     template_dir:
         Optional directory containing the ``doc.md.j2`` template.  If not
         supplied the ``templates`` directory next to this file is used.
+        Ignored when ``renderer`` is given.
+    renderer:
+        Renderer to use, e.g. a :class:`~src.native.NativeRenderer`.  Defaults to the shared renderer for
+        ``template_dir`` returned by :func:`get_renderer`.
+    writer:
+        :class:`~src.writer.FileWriter` used to write the file.  The file is
+        left untouched if its content did not change.
+    links:
+        Cross references for the page, see :meth:`~src.symbols.SymbolIndex.page_links`.
+        If they split the page, its subpages are written next to ``output_path``.
 
     Returns
     -------
     str
-        The rendered Markdown content.
+        The rendered Markdown content of the page itself.
     """
 
-    if Environment is None:
-        # Minimal fallback when Jinja2 is unavailable
-        script = data.get("script", {})
-        markdown = f"# {script.get('name', '')}\n"
-    else:
-        tdir = template_dir or os.path.join(os.path.dirname(__file__), "templates")
-        env = Environment(
-            loader=FileSystemLoader(tdir),
-            autoescape=False,
-            trim_blocks=True,
-            lstrip_blocks=True,
-        )
-        template = env.get_template("doc.md.j2")
-        markdown = template.render(**data)
+    pages = render_pages(renderer or get_renderer(template_dir), data, links)
+
+    writer = writer or FileWriter()
+    target = Path(output_path)
+    for name, markdown in pages:
+        writer.write(target.with_name(name) if name else target, markdown)
+
+    return pages[0][1]
+
+
+@dataclass
+class DirectoryNode:
+    """A directory of the generated documentation.
+
+    ``path`` is relative to the documentation root, ``children`` maps
+    subdirectory names to their nodes and ``scripts`` holds the names of the
+    Markdown pages generated for scripts in this directory.  ``subpages``
+    maps the pages of split scripts to ``(title, file name)`` of their
+    subpages.
+    """
+
+    path: Path
+    children: Dict[str, "DirectoryNode"] = field(default_factory=dict)
+    scripts: List[str] = field(default_factory=list)
+    subpages: Dict[str, List[Tuple[str, str]]] = field(default_factory=dict)
+
+    @property
+    def name(self) -> str:
+        return self.path.name
 
-    output_file = Path(output_path)
-    output_file.parent.mkdir(parents=True, exist_ok=True)
-    output_file.write_text(markdown, encoding="utf-8")
+    def walk(self) -> Iterator["DirectoryNode"]:
+        """Yield this node and all descendants, parents before children."""
 
-    return markdown
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(node.children[name] for name in sorted(node.children, reverse=True))
 
 
-def generate_indexes(gd_files: List[Path], base: Path, output_dir: Path) -> None:
+def build_tree(
+    rel_files: Iterable[Path],
+    subpages: Optional[Mapping[str, Sequence[Tuple[str, str]]]] = None,
+) -> DirectoryNode:
+    """Group ``rel_files`` (paths of ``.gd`` files relative to the source
+    directory) into a :class:`DirectoryNode` tree in a single pass.
+
+    ``subpages`` maps the POSIX paths of split scripts to ``(title, file
+    name)`` of the subpages of their pages.
+    """
+
+    root = DirectoryNode(Path("."))
+    nodes: Dict[Path, DirectoryNode] = {Path("."): root}
+    for rel in rel_files:
+        parent = rel.parent
+        node = nodes.get(parent)
+        if node is None:
+            # create the missing ancestors, outermost first
+            missing = []
+            while parent not in nodes:
+                missing.append(parent)
+                parent = parent.parent
+            node = nodes[parent]
+            for path in reversed(missing):
+                child = DirectoryNode(path)
+                node.children[path.name] = child
+                nodes[path] = node = child
+        page = rel.with_suffix(".md").name
+        node.scripts.append(page)
+        if subpages:
+            parts = subpages.get(rel.as_posix())
+            if parts:
+                node.subpages[page] = list(parts)
+    return root
+
+
+def render_index(node: DirectoryNode) -> str:
+    """Return the ``index.md`` content for ``node``."""
+
+    title = node.name if node.path != Path(".") else "Index"
+    lines = [f"# {title}"]
+    if node.children:
+        lines.append("## Ordner")
+        for sd in sorted(node.children):
+            lines.append(f"- [{sd}]({sd}/index.md)")
+    if node.scripts:
+        lines.append("## Skripte")
+        for s in sorted(node.scripts):
+            lines.append(f"- [{Path(s).stem}]({s})")
+            for title, sub in node.subpages.get(s, ()):
+                lines.append(f"    - [{title}]({sub})")
+    return "\n".join(lines) + "\n"
+
+
+def generate_indexes(
+    gd_files: List[Path],
+    base: Path,
+    output_dir: Path,
+    tree: Optional[DirectoryNode] = None,
+    writer: Optional[FileWriter] = None,
+) -> DirectoryNode:
     """Generate ``index.md`` files for all directories.
 
     Parameters
@@ -67,35 +348,32 @@ def generate_indexes(gd_files: List[Path], base: Path, output_dir: Path) -> None
         Base directory relative to which ``gd_files`` are located.
     output_dir:
         Root directory for the generated Markdown files.
+    tree:
+        Optional tree previously returned by :func:`build_tree`.  It is
+        built from ``gd_files`` when omitted.
+    writer:
+        :class:`~src.writer.FileWriter` used to write the index pages.
+
+    Returns
+    -------
+    DirectoryNode
+        The directory tree the indexes were generated from.
     """
 
-    rel_files = [p.relative_to(base) for p in gd_files]
-    directories = {Path(".")}
-    for rel in rel_files:
-        directories.update(rel.parents)
+    if tree is None:
+        tree = build_tree(p.relative_to(base) for p in gd_files)
+    write_indexes(tree, output_dir, writer)
+    return tree
 
-    # sort so parents are created before children
-    for directory in sorted(directories, key=lambda d: (len(d.parts), str(d))):
-        subdirs = sorted({d.name for d in directories if d.parent == directory})
-        scripts = sorted(
-            [p.with_suffix(".md").name for p in rel_files if p.parent == directory]
-        )
 
-        title = directory.name if directory != Path(".") else "Index"
-        lines = [f"# {title}"]
-        if subdirs:
-            lines.append("## Ordner")
-            for sd in subdirs:
-                lines.append(f"- [{sd}]({sd}/index.md)")
-        if scripts:
-            lines.append("## Skripte")
-            for s in scripts:
-                lines.append(f"- [{Path(s).stem}]({s})")
+def write_indexes(
+    tree: DirectoryNode, output_dir: Path, writer: Optional[FileWriter] = None
+) -> None:
+    """Write the ``index.md`` of every directory in ``tree`` below ``output_dir``."""
 
-        content = "\n".join(lines) + "\n"
-        out_path = output_dir / directory / "index.md"
-        out_path.parent.mkdir(parents=True, exist_ok=True)
-        out_path.write_text(content, encoding="utf-8")
+    writer = writer or FileWriter()
+    for node in tree.walk():
+        writer.write(output_dir / node.path / "index.md", render_index(node))
 
 
 def _nav_lines(directory: Path, root: Path, indent: int = 0) -> List[str]:
@@ -119,8 +397,39 @@ def _nav_lines(directory: Path, root: Path, indent: int = 0) -> List[str]:
     return lines
 
 
-def generate_mkdocs_yml(project_root: Path, docs_dir: Path) -> None:
-    """Create a ``mkdocs.yml`` next to ``project_root`` using ``docs_dir``."""
+def _tree_nav_lines(node: DirectoryNode, indent: int = 0) -> List[str]:
+    """Return YAML formatted nav lines for ``node`` without touching the disk."""
+
+    lines: List[str] = []
+
+    for name in sorted(node.children):
+        child = node.children[name]
+        lines.append(" " * indent + f"- {name}:")
+        lines.append(" " * (indent + 2) + f"- Overview: {child.path / 'index.md'}")
+        lines.extend(_tree_nav_lines(child, indent + 2))
+
+    for script in sorted(node.scripts):
+        parts = node.subpages.get(script)
+        if not parts:
+            lines.append(" " * indent + f"- {Path(script).stem}: {node.path / script}")
+            continue
+        lines.append(" " * indent + f"- {Path(script).stem}:")
+        lines.append(" " * (indent + 2) + f"- Overview: {node.path / script}")
+        for title, sub in parts:
+            lines.append(" " * (indent + 2) + f"- {title}: {node.path / sub}")
+
+    return lines
+
+
+def render_mkdocs_yml(
+    project_root: Path, docs_dir: Path, tree: Optional[DirectoryNode] = None
+) -> str:
+    """Return the ``mkdocs.yml`` content for ``docs_dir``.
+
+    The nav is built from ``tree`` (as returned by :func:`build_tree` or
+    :func:`generate_indexes`) when given.  Without it ``docs_dir`` is walked
+    and every Markdown file found there is listed.
+    """
 
     try:
         docs_rel = docs_dir.relative_to(project_root)
@@ -128,7 +437,8 @@ def generate_mkdocs_yml(project_root: Path, docs_dir: Path) -> None:
         docs_rel = Path(os.path.relpath(docs_dir, project_root))
 
     lines = [f"site_name: {project_root.name}", "nav:", "  - Home: index.md", "  - Codebase:"]
-    lines.extend(["    " + l for l in _nav_lines(docs_dir, docs_dir)])
+    nav = _nav_lines(docs_dir, docs_dir) if tree is None else _tree_nav_lines(tree)
+    lines.extend(["    " + l for l in nav])
     lines.extend(
         [
             "theme:",
@@ -145,5 +455,49 @@ def generate_mkdocs_yml(project_root: Path, docs_dir: Path) -> None:
         ]
     )
 
-    (project_root / "mkdocs.yml").write_text("\n".join(lines), encoding="utf-8")
+    return "\n".join(lines)
+
+
+def generate_mkdocs_yml(
+    project_root: Path,
+    docs_dir: Path,
+    tree: Optional[DirectoryNode] = None,
+    writer: Optional[FileWriter] = None,
+) -> None:
+    """Create a ``mkdocs.yml`` next to ``project_root`` using ``docs_dir``.
+
+    See :func:`render_mkdocs_yml` for how the nav is built.  The file is
+    written through ``writer`` and left untouched if it did not change.
+    """
+
+    content = render_mkdocs_yml(project_root, docs_dir, tree)
+    (writer or FileWriter()).write(project_root / "mkdocs.yml", content)
+
+
+def remove_page(
+    output_dir: Path, rel: Path, writer: Optional[FileWriter] = None
+) -> None:
+    """Delete the page generated for the script ``rel`` and prune directories
+    that no longer contain anything but their ``index.md``."""
+
+    writer = writer or FileWriter()
+    target = (output_dir / rel).with_suffix(".md")
+    writer.remove(target)
+    prune_directories(output_dir, target.parent, writer)
+
+
+def prune_directories(
+    output_dir: Path, directory: Path, writer: Optional[FileWriter] = None
+) -> None:
+    """Remove ``directory`` and its parents below ``output_dir`` as long as
+    they contain nothing but their ``index.md``."""
+
+    writer = writer or FileWriter()
+    while directory != output_dir and directory.is_dir():
+        remaining = [p for p in directory.iterdir() if p.name != "index.md"]
+        if remaining:
+            break
+        writer.remove(directory / "index.md")
+        directory.rmdir()
+        directory = directory.parent
 
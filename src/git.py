@@ -0,0 +1,91 @@
+"""Changed ``.gd`` files according to the local git repository."""
+
+from __future__ import annotations
+
+import subprocess
+from pathlib import Path
+from typing import List, Optional
+
+from .changes import Changes
+
+
+class GitError(RuntimeError):
+    """Raised when git is missing or a git command fails."""
+
+
+def _git(cwd: Path, *args: str) -> str:
+    try:
+        result = subprocess.run(
+            ["git", *args], cwd=cwd, capture_output=True, text=True, check=False
+        )
+    except OSError as exc:
+        raise GitError(f"git could not be run: {exc}") from exc
+    if result.returncode != 0:
+        raise GitError(result.stderr.strip() or f"git {' '.join(args)} failed")
+    return result.stdout
+
+
+def changed_files(root: Path, since: Optional[str] = None, staged: bool = False) -> Changes:
+    """Return the ``.gd`` files below ``root`` changed according to git.
+
+    With ``staged`` the changes in the index (what the next commit will
+    contain) are listed; otherwise the changes of the working tree since
+    revision ``since`` (default ``HEAD``), including untracked files that
+    are not ignored.  Paths are POSIX style and relative to ``root``.
+    Renames are detected by git; a rename whose content changed is also
+    listed in ``modified``.
+    """
+
+    root = root.resolve()
+    top = Path(_git(root, "rev-parse", "--show-toplevel").strip()).resolve()
+    prefix = root.relative_to(top).as_posix()
+    prefix = "" if prefix == "." else prefix + "/"
+
+    def key(path: str) -> Optional[str]:
+        if not path.endswith(".gd") or not path.startswith(prefix):
+            return None
+        return path[len(prefix):]
+
+    if staged:
+        diff = _git(top, "diff", "--cached", "--name-status", "-z", "-M")
+    else:
+        diff = _git(top, "diff", "--name-status", "-z", "-M", since or "HEAD")
+
+    changes = Changes()
+    fields: List[str] = diff.split("\0")
+    i = 0
+    while i < len(fields) and fields[i]:
+        status = fields[i]
+        kind = status[0]
+        if kind in "RC":
+            old, new = key(fields[i + 1]), key(fields[i + 2])
+            i += 3
+        else:
+            old = new = key(fields[i + 1])
+            i += 2
+
+        if kind == "R" and old and new:
+            changes.renamed.append((old, new))
+            if status != "R100":
+                changes.modified.append(new)
+        elif kind in "RC":
+            if kind == "R" and old:
+                changes.deleted.append(old)
+            if new:
+                changes.created.append(new)
+        elif kind == "D":
+            if old:
+                changes.deleted.append(old)
+        elif kind == "A":
+            if new:
+                changes.created.append(new)
+        elif new:
+            changes.modified.append(new)
+
+    if not staged:
+        untracked = _git(top, "ls-files", "--others", "--exclude-standard", "-z", "--", ".")
+        for path in untracked.split("\0"):
+            new = key(path)
+            if new and new not in changes.created:
+                changes.created.append(new)
+    return changes
@@ -0,0 +1,385 @@
+"""Single pass tokenizer for the parts of GDScript that gd2doc documents."""
+
+from __future__ import annotations
+
+import functools
+import re
+from dataclasses import dataclass
+from itertools import accumulate
+from typing import TYPE_CHECKING, Iterator, List, Optional, Tuple, Union
+
+if TYPE_CHECKING:
+    import mmap
+
+    Buffer = Union[bytes, bytearray, mmap.mmap]
+
+COMMENT = "comment"
+ANNOTATION = "annotation"
+DECLARATION = "declaration"
+OTHER = "other"
+
+#: Keywords that start a documented top level declaration.
+KEYWORDS = frozenset(
+    ["class_name", "extends", "signal", "enum", "const", "var", "func"]
+)
+
+#: Values of ``const`` and ``var`` declarations longer than this many bytes
+#: (typically generated data tables) are cut off and end in :data:`ELLIPSIS`;
+#: the rest of the literal is skipped without being decoded.
+MAX_VALUE_BYTES = 512
+ELLIPSIS = " …"
+
+_OPENING = (b"(", b"[", b"{")
+_CLOSING = (b")", b"]", b"}")
+_LITERALS = frozenset([b"const", b"var"])
+_KEYWORDS = frozenset(k.encode() for k in KEYWORDS)
+
+# the patterns work on bytes, so they can search a memory mapped file
+# strings are matched as a whole so brackets and ``#`` inside them are ignored
+_SPECIAL = re.compile(rb"\"(?:[^\"\\]|\\.)*\"?|'(?:[^'\\]|\\.)*'?|[()\[\]{}#]")
+_KEYWORD = re.compile(rb"(?:static\s+)?([A-Za-z_]\w*)")
+# comment lines at any indentation and unindented code lines; indented code
+# and blank lines in between are skipped without creating tokens for them
+_INTERESTING = re.compile(rb"^(?:[ \t]*#|[^\s#])[^\n]*", re.MULTILINE)
+_ANNOTATION = re.compile(rb"@(\w+)(?:\s*\(([^()]*)\))?\s*")
+# an unindented line starting like this is a new declaration, never part of
+# the one before it, even if that left a bracket open
+_DECLARATION_START = re.compile(
+    rb"(?:(?:func|var|const|signal|enum|class|class_name|extends|static)\b|@)"
+)
+# with the comments documenting it
+_DOCUMENTED_DECLARATION = re.compile(rb"(?:#[^\n]*\n)*" + _DECLARATION_START.pattern)
+# lines that may start one; a literal prefix is found much faster than ``^``
+_CANDIDATE = re.compile(rb"\n[#@cefsv]")
+
+# strings and comments within a line, removed before counting brackets
+_NOISE = re.compile(rb"\"(?:[^\"\\\n]|\\.)*\"?|'(?:[^'\\\n]|\\.)*'?|#[^\n]*")
+_SKIP_CHUNK = 1 << 18
+# brackets of any kind map to ``()``, everything else is deleted
+_BRACKETS = bytes.maketrans(b"[{]}", b"(())")
+_NOT_BRACKETS = bytes(c for c in range(256) if c not in b"()[]{}")
+# every round cancels one level of nesting; deeper nesting is counted instead
+_CANCEL_ROUNDS = 16
+
+# newlines in skipped code are counted in slices of this size, buffers
+# without a ``count`` method (mmap) would otherwise have to be copied whole
+_COUNT_CHUNK = 1 << 20
+
+
+@dataclass
+class Token:
+    """A lexical unit of a GDScript file.
+
+    ``kind`` is one of :data:`COMMENT`, :data:`ANNOTATION`,
+    :data:`DECLARATION` or :data:`OTHER`.  For comments ``value`` holds the
+    text without the leading ``#`` characters, for declarations the complete
+    declaration (joined into a single line if it spans several lines, with
+    comments removed) and ``keyword`` the declaring keyword.  ``truncated``
+    is set if the line or declaration was cut at ``max_line_length`` and
+    ``unclosed`` if a bracket of the declaration was still open at the
+    next declaration.
+    """
+
+    kind: str
+    value: str
+    line: int
+    keyword: Optional[str] = None
+    truncated: bool = False
+    unclosed: bool = False
+
+
+def _scan_code(text: bytes, depth: int) -> Tuple[bytes, int]:
+    """Return ``text`` without a trailing comment and the new bracket depth."""
+
+    if b"#" not in text and b'"' not in text and b"'" not in text:
+        # nothing can hide a bracket: count them at C speed
+        opened = text.count(b"(") + text.count(b"[") + text.count(b"{")
+        closed = text.count(b")") + text.count(b"]") + text.count(b"}")
+        return text, max(depth + opened - closed, 0)
+
+    for m in _SPECIAL.finditer(text):
+        char = m.group()
+        if char == b"#":
+            return text[: m.start()], depth
+        if char in _OPENING:
+            depth += 1
+        elif char in _CLOSING and depth:
+            depth -= 1
+    return text, depth
+
+
+def _join(parts: List[bytes]) -> bytes:
+    """Join the physical lines of a declaration into one logical line."""
+
+    pieces: List[bytes] = []
+    previous = b""
+    for part in parts:
+        if not part:
+            continue
+        if pieces and not (previous.endswith(_OPENING) or part.startswith(_CLOSING)):
+            pieces.append(b" ")
+        pieces.append(part)
+        previous = part
+    return b"".join(pieces)
+
+
+def _truncate(text: bytes, limit: int) -> bytes:
+    """Cut ``text`` to at most ``limit`` bytes at a UTF-8 character boundary."""
+
+    if limit >= len(text):
+        return text
+    while limit and (text[limit] & 0xC0) == 0x80:
+        limit -= 1
+    return text[:limit].rstrip()
+
+
+def _chunked_count(buffer: Buffer, sub: bytes, start: int, end: int) -> int:
+    """``buffer.count(sub, start, end)`` for buffers without that method."""
+
+    total = 0
+    for pos in range(start, end, _COUNT_CHUNK):
+        total += buffer[pos : min(pos + _COUNT_CHUNK, end)].count(sub)
+    return total
+
+
+def _code_only(text: bytes) -> bytes:
+    """Return ``text`` (whole lines) without strings and comments."""
+
+    if b"#" not in text and b"'" not in text and b"\\" not in text:
+        # only plain double quoted strings, common in generated data: every
+        # other piece between quotes is a string unless one spans lines
+        pieces = text.split(b'"')
+        if len(pieces) % 2 and b"\n" not in b"".join(pieces[1::2]):
+            return b"".join(pieces[::2])
+    return _NOISE.sub(b"", text)
+
+
+def _unmatched(code: bytes) -> Tuple[int, int]:
+    """Return the number of unmatched closing and opening brackets of
+    ``code``, which holds no strings or comments."""
+
+    brackets = code.translate(_BRACKETS, _NOT_BRACKETS)
+    for _ in range(_CANCEL_ROUNDS):
+        if b"()" not in brackets:
+            # left are all closing brackets followed by all opening ones
+            closing = len(brackets.rstrip(b"("))
+            return closing, len(brackets) - closing
+        brackets = brackets.replace(b"()", b"")
+    # deeply nested: the lowest running depth gives the unmatched closings
+    lowest = min(accumulate((1 if c == 40 else -1 for c in brackets), initial=0))
+    opening = brackets.count(b"(") - (len(brackets) - brackets.count(b"(")) - lowest
+    return -lowest, opening
+
+
+def _next_declaration(source: Buffer, pos: int, length: int) -> int:
+    """Return where the first unindented declaration after the line
+    starting at ``pos`` begins, including the comments right before it, or
+    ``length`` if there is none."""
+
+    m = _CANDIDATE.search(source, pos, length)
+    while m is not None:
+        start = m.start() + 1
+        if _DOCUMENTED_DECLARATION.match(source, start, length):
+            return start
+        m = _CANDIDATE.search(source, start, length)
+    return length
+
+
+def _skip_nested(
+    source: Buffer, pos: int, depth: int, length: int
+) -> Tuple[int, int, int, int]:
+    """Skip the lines from ``pos`` on in chunks while brackets stay open.
+
+    Strings and comments are removed from a chunk of lines and matching
+    brackets cancelled out at C speed.  A chunk with fewer unmatched closing
+    brackets than are open cannot end the declaration and is skipped.
+    Returns the new position, the new depth, the number of lines skipped and
+    the end of the first chunk that could not be skipped.  Only the first
+    ``length`` bytes of ``source`` are looked at.
+    """
+
+    lines = 0
+    while pos < length:
+        end = source.find(b"\n", pos + _SKIP_CHUNK, length)
+        if end == -1:
+            end = length
+        chunk = _code_only(source[pos:end])
+        closing, opening = _unmatched(chunk)
+        if closing >= depth:
+            return pos, depth, lines, end
+        depth += opening - closing
+        lines += chunk.count(b"\n") + 1
+        pos = end + 1
+    return pos, depth, lines, pos
+
+
+def tokenize(
+    source: Union[str, Buffer],
+    size: Optional[int] = None,
+    max_line_length: Optional[int] = None,
+) -> Iterator[Token]:
+    """Yield tokens for ``source`` in a single pass over the buffer.
+
+    ``source`` is text or UTF-8 encoded bytes, which may be any buffer the
+    :mod:`re` module can search, e.g. a memory mapped file.  Only the spans
+    that become token values are copied out of the buffer and decoded.
+
+    Comments are reported at any indentation.  Annotations and declarations
+    are only recognised at the top level (no indentation); declarations with
+    unbalanced brackets or a trailing backslash continue on the following
+    lines.  Values of ``const`` and ``var`` declarations are kept up to
+    :data:`MAX_VALUE_BYTES`.  Everything else is code gd2doc does not
+    document: consecutive lines of it, including blank lines, are reported
+    as one :data:`OTHER` token.  Those lines are skipped by the regular
+    expression engine without being split, copied or decoded.
+
+    Only the first ``size`` bytes of ``source`` are read if given.  Lines
+    and joined declarations longer than ``max_line_length`` bytes are cut
+    there and their tokens marked ``truncated``; a cut line ends its
+    declaration.  An unindented line starting with a declaration keyword or
+    an annotation also ends it, with the token marked ``unclosed`` if
+    brackets were left open, so a script being edited (``func f(a,``) does
+    not lose the declarations after it.
+    """
+
+    if isinstance(source, str):
+        source = source.encode("utf-8")
+    search = _INTERESTING.search
+    count = getattr(source, "count", None)
+    if count is None:
+        count = functools.partial(_chunked_count, source)
+    length = len(source) if size is None else min(size, len(source))
+    pos = 0
+    lineno = 1
+    while pos < length:
+        m = search(source, pos, length)
+        if m is None:
+            yield Token(OTHER, "", lineno)
+            return
+
+        start = m.start()
+        if start > pos:
+            yield Token(OTHER, "", lineno)
+            lineno += count(b"\n", pos, start)
+
+        pos = m.end() + 1
+        line_start = lineno
+        lineno += 1
+        long_line = max_line_length is not None and m.end() - start > max_line_length
+        if long_line:
+            # the regular expression found the end of the line at C speed;
+            # only the allowed part is copied
+            stripped = source[start : start + max_line_length].strip()
+        else:
+            stripped = m.group().strip()
+
+        if stripped.startswith(b"#"):
+            yield Token(
+                COMMENT,
+                stripped.lstrip(b"#").strip().decode("utf-8", "ignore"),
+                line_start,
+                truncated=long_line,
+            )
+            continue
+
+        rest = stripped
+        while rest.startswith(b"@"):
+            am = _ANNOTATION.match(rest)
+            if am is None:
+                break
+            yield Token(
+                ANNOTATION,
+                am.group(0).strip().decode("utf-8", "ignore"),
+                line_start,
+                am.group(1).decode("utf-8"),
+            )
+            rest = rest[am.end():]
+        if not rest:
+            continue
+
+        km = _KEYWORD.match(rest)
+        keyword = km.group(1) if km else None
+        if keyword not in _KEYWORDS:
+            yield Token(OTHER, rest.decode("utf-8", "ignore"), line_start, truncated=long_line)
+            continue
+
+        literal = keyword in _LITERALS
+        limit = MAX_VALUE_BYTES + km.end() if literal else max_line_length
+        code, depth = _scan_code(rest, 0)
+        if long_line:
+            depth = 0
+        last = code.rstrip()
+        parts = [last]
+        kept = len(last)
+        cut = False
+        unclosed = False
+        skip_until = pos
+        boundary = -1
+        # unindented comments right before a declaration that ends this one
+        doc_start = doc_line = -1
+        while (depth or last.endswith(b"\\")) and pos < length:
+            if last is parts[-1] and last.endswith(b"\\"):
+                parts[-1] = last[:-1].rstrip()
+            if depth:
+                if _DECLARATION_START.match(source, pos, length):
+                    unclosed = True
+                    if doc_start >= 0:
+                        pos, lineno = doc_start, doc_line
+                    break
+                if source[pos : pos + 1] != b"#":
+                    doc_start = -1
+                elif doc_start < 0:
+                    doc_start, doc_line = pos, lineno
+            if (
+                depth
+                and limit is not None
+                and kept > limit
+                and pos >= skip_until
+                and (boundary < 0 or pos < boundary)
+            ):
+                # deep inside a long value: skip whole chunks at C speed, but
+                # not past the next declaration
+                if boundary < 0:
+                    boundary = _next_declaration(source, pos, length)
+                    if boundary < length:
+                        boundary -= 1  # the newline before it
+                pos, depth, lines, skip_until = _skip_nested(source, pos, depth, boundary)
+                lineno += lines
+                cut = True
+                continue
+            end = source.find(b"\n", pos, length)
+            if end == -1:
+                end = length
+            if max_line_length is not None and end - pos > max_line_length:
+                code, _ = _scan_code(source[pos : pos + max_line_length].strip(), depth)
+                depth = 0
+                long_line = True
+            else:
+                code, depth = _scan_code(source[pos:end].strip(), depth)
+            last = code.rstrip()
+            pos = end + 1
+            lineno += 1
+            if limit is None or kept <= limit:
+                parts.append(last)
+                kept += len(last) + 1
+            else:
+                # past the limit the lines are only scanned for brackets
+                cut = True
+
+        value = _join(parts)
+        if limit is not None and (cut or len(value) > limit):
+            value = _truncate(value, limit)
+            if literal:
+                value += ELLIPSIS.encode("utf-8")
+        if km.group(0) != keyword:
+            # ``static func`` is documented like any other function
+            value = value[km.start(1):]
+        yield Token(
+            DECLARATION,
+            value.decode("utf-8", "ignore"),
+            line_start,
+            keyword.decode("utf-8"),
+            # long values of constants and variables are cut by design
+            truncated=long_line or (cut and not literal),
+            unclosed=unclosed,
+        )
@@ -0,0 +1,268 @@
+"""Persistent build manifest used for incremental documentation builds."""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import marshal
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from .parser import PARSER_VERSION, ParsedScript
+from .symbols import ScriptSymbols, page_for
+from .writer import FileWriter
+
+MANIFEST_NAME = ".gd2doc-manifest.json"
+MANIFEST_VERSION = 5
+
+
+def hash_bytes(data: bytes) -> str:
+    """Return the hex digest used for sources and pages."""
+
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_text(text: str) -> str:
+    """Return the digest of ``text`` encoded as UTF-8."""
+
+    return hash_bytes(text.encode("utf-8"))
+
+
+def encode_model(data: ParsedScript) -> str:
+    """Return ``data`` as stored in the manifest: a ``zlib`` compressed
+    :mod:`marshal` dump of :meth:`~src.parser.ParsedScript.to_record`,
+    base64 encoded."""
+
+    payload = zlib.compress(marshal.dumps(data.to_record()), 1)
+    return base64.b64encode(payload).decode("ascii")
+
+
+def decode_model(model: str) -> ParsedScript:
+    """Inverse of :func:`encode_model`."""
+
+    record = marshal.loads(zlib.decompress(base64.b64decode(model)))
+    return ParsedScript.from_record(record)
+
+
+class ManifestEntry:
+    """State recorded for a single processed ``.gd`` file.
+
+    ``symbols`` holds what the script contributes to the symbol index and
+    the dependency graph, so neither needs the parsed model.  The model
+    itself, :attr:`data`, is kept encoded (see :func:`encode_model`) until
+    it is used, i.e. until the page is rendered again.
+    """
+
+    __slots__ = ("source_hash", "page_hash", "symbols", "links", "pages", "_data", "_model")
+
+    def __init__(
+        self,
+        source_hash: str,
+        page_hash: str,
+        symbols: ScriptSymbols,
+        links: str = "",
+        pages: Sequence[str] = (),
+        data: Optional[ParsedScript] = None,
+        model: str = "",
+    ) -> None:
+        self.source_hash = source_hash
+        self.page_hash = page_hash
+        self.symbols = symbols
+        #: :meth:`~src.symbols.PageLinks.signature` of the links the page was
+        #: rendered with.
+        self.links = links
+        #: Subpages of a split page, relative to the output directory.  They
+        #: lie next to the page and ``page_hash`` covers them too.
+        self.pages: List[str] = list(pages)
+        self._data = data
+        self._model = model
+
+    @property
+    def data(self) -> ParsedScript:
+        """The parsed script, decoded on first use."""
+
+        if self._data is None:
+            self._data = decode_model(self._model)
+            # callers may change it (renames do), so it is encoded again
+            self._model = ""
+        return self._data
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "source_hash": self.source_hash,
+            "page_hash": self.page_hash,
+            "links": self.links,
+            "pages": self.pages,
+            "symbols": vars(self.symbols),
+            "model": self._model or encode_model(self.data),
+        }
+
+    @classmethod
+    def from_dict(cls, value: Dict[str, Any]) -> "ManifestEntry":
+        return cls(
+            source_hash=value["source_hash"],
+            page_hash=value["page_hash"],
+            symbols=ScriptSymbols(**value["symbols"]),
+            links=value.get("links", ""),
+            pages=value.get("pages", []),
+            model=value["model"],
+        )
+
+
+class BuildManifest:
+    """Mapping of source paths (relative, POSIX style) to :class:`ManifestEntry`.
+
+    The manifest lives in the output directory and lets a rerun skip every
+    script whose content and generated page are unchanged.  ``fingerprint``
+    identifies the renderer (e.g. the template contents); a manifest written
+    with a different fingerprint, parser version or for a different source
+    directory is discarded so that everything is regenerated.  ``graph``
+    holds the dependency edges of the last build (see
+    :class:`~src.deps.DependencyGraph`).
+
+    ``changed`` tells whether the manifest differs from the file it was
+    loaded from; :meth:`save` does nothing otherwise, so a build that
+    changes nothing does not rewrite it.
+    """
+
+    def __init__(self, fingerprint: str = "", source: str = "") -> None:
+        self.fingerprint = fingerprint
+        self.source = source
+        self.entries: Dict[str, ManifestEntry] = {}
+        self._graph: Dict[str, Dict[str, str]] = {}
+        self.changed = True
+
+    @property
+    def graph(self) -> Dict[str, Dict[str, str]]:
+        return self._graph
+
+    @graph.setter
+    def graph(self, edges: Dict[str, Dict[str, str]]) -> None:
+        if edges != self._graph:
+            self._graph = edges
+            self.changed = True
+
+    @classmethod
+    def load(cls, output_dir: Path, fingerprint: str = "", source: str = "") -> "BuildManifest":
+        """Load the manifest from ``output_dir``.
+
+        An empty manifest is returned when the file is missing, unreadable or
+        was written for another fingerprint, parser version or source
+        directory.  Entries that cannot be read are dropped.
+        """
+
+        manifest = cls(fingerprint, source)
+        path = output_dir / MANIFEST_NAME
+        try:
+            raw = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return manifest
+
+        if (
+            not isinstance(raw, dict)
+            or raw.get("version") != MANIFEST_VERSION
+            or raw.get("parser") != PARSER_VERSION
+            or raw.get("fingerprint") != fingerprint
+            or raw.get("source") != source
+        ):
+            return manifest
+
+        dropped = False
+        for key, value in raw.get("files", {}).items():
+            try:
+                manifest.entries[key] = ManifestEntry.from_dict(value)
+            except (KeyError, TypeError, ValueError):
+                dropped = True
+        graph = raw.get("graph")
+        if isinstance(graph, dict):
+            manifest._graph = graph
+        manifest.changed = dropped
+        return manifest
+
+    def save(self, output_dir: Path) -> None:
+        """Write the manifest to ``output_dir`` if it :attr:`changed`.  The
+        file is replaced atomically."""
+
+        if not self.changed:
+            return
+        payload = {
+            "version": MANIFEST_VERSION,
+            "parser": PARSER_VERSION,
+            "fingerprint": self.fingerprint,
+            "source": self.source,
+            "files": {key: entry.to_dict() for key, entry in sorted(self.entries.items())},
+            "graph": {key: self._graph[key] for key in sorted(self._graph)},
+        }
+        # replaced atomically, an interrupted save leaves the previous one
+        FileWriter().write(output_dir / MANIFEST_NAME, json.dumps(payload, separators=(",", ":")))
+        self.changed = False
+
+    def get(self, key: str) -> Optional[ManifestEntry]:
+        return self.entries.get(key)
+
+    def is_current(self, key: str, source_hash: str, page: Path) -> bool:
+        """Return ``True`` if ``page`` and its subpages are up to date for
+        ``source_hash``."""
+
+        entry = self.entries.get(key)
+        if entry is None or entry.source_hash != source_hash:
+            return False
+        try:
+            content = page.read_bytes()
+            if entry.pages:
+                content += b"".join(
+                    page.with_name(sub.rsplit("/", 1)[-1]).read_bytes() for sub in entry.pages
+                )
+            return hash_bytes(content) == entry.page_hash
+        except OSError:
+            return False
+
+    def update(
+        self,
+        key: str,
+        source_hash: str,
+        markdown: str,
+        data: ParsedScript,
+        links: str = "",
+        pages: Sequence[str] = (),
+    ) -> None:
+        """Record ``key`` with the content of its page, ``markdown``, which
+        for a split page is the page followed by its ``pages``."""
+
+        self.add(
+            key,
+            ManifestEntry(
+                source_hash=source_hash,
+                page_hash=hash_text(markdown),
+                symbols=ScriptSymbols.from_parsed(key, data),
+                links=links,
+                pages=pages,
+                data=data,
+            ),
+        )
+
+    def add(self, key: str, entry: ManifestEntry) -> None:
+        """Record ``entry`` under ``key``.  The symbols of an entry moved
+        from another key are taken from its data again."""
+
+        if entry.symbols.page != page_for(key):
+            entry.symbols = ScriptSymbols.from_parsed(key, entry.data)
+        self.entries[key] = entry
+        self.changed = True
+
+    def remove(self, key: str) -> Optional[ManifestEntry]:
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.changed = True
+        return entry
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.entries
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self.entries))
+
+    def __len__(self) -> int:
+        return len(self.entries)
@@ -0,0 +1,180 @@
+"""Render pages with plain string building instead of a Jinja2 template.
+
+:class:`NativeRenderer` produces the same page as ``templates/doc.md.j2``
+with the default settings: it appends the pieces of the page to a list
+and joins them once, without interpreting a template.  It needs no
+third-party package and is used when Jinja2 is not installed.  A custom
+template directory has no effect on it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from .parser import ParsedScript
+from .symbols import NO_LINKS, PageLinks
+
+_FINGERPRINT: Optional[str] = None
+
+
+def native_fingerprint() -> str:
+    """Return a digest of this module, which changes with the page format."""
+
+    global _FINGERPRINT
+    if _FINGERPRINT is None:
+        digest = hashlib.sha256(b"native\0")
+        digest.update(Path(__file__).read_bytes())
+        _FINGERPRINT = digest.hexdigest()
+    return _FINGERPRINT
+
+
+def _str(value: Any) -> str:
+    # ``{{ value }}`` in the template; ``None`` renders as "None" there too
+    return value if type(value) is str else str(value)
+
+
+def render_page(data: ParsedScript, links: PageLinks = NO_LINKS) -> str:
+    """Return the Markdown page for ``data``."""
+
+    script = data.script
+    signals, enums, consts = data.signals, data.enums, data.consts
+    variables, functions, todos = data.variables, data.functions, data.todos
+    name = _str(script.name)
+    title = f"{name} – {links.part}" if links.part else name
+    out: List[str] = [
+        '---\ntitle: "', title,
+        '"\ndescription: "', _str(script.short_description),
+        '"\n---\n\n# ', title, "\n\n",
+    ]
+    add = out.append
+    if links.part:
+        add(f"Teil der Dokumentation von [`{name}`]({links.overview}).\n\n")
+    else:
+        out += [
+            _str(script.description),
+            "\n\n## Überblick\n- **Dateipfad:** `", _str(script.path),
+            "`\n- **Klasse:** `", _str(script.class_name or "—"),
+            "`\n- **Erbt von:** ", links.code(script.extends) if script.extends else "`—`",
+            f"\n- **Signale:** {len(signals)}"
+            f"\n- **Enums:** {len(enums)}"
+            f"\n- **Konstanten:** {len(consts)}"
+            f"\n- **Variablen:** {len(variables)}"
+            f"\n- **Funktionen:** {len(functions)}\n\n",
+        ]
+
+    if links.parts:
+        # the main page of a split script only lists its subpages
+        add("## Seiten\n")
+        for part in links.parts:
+            add(f"- [{part.title}]({part.url}) ({part.count})\n")
+        add("\n")
+    else:
+        if signals:
+            add("## Signale\n")
+            for signal in signals:
+                args = ", ".join(_str(arg.name) for arg in signal.args)
+                add(f'- <a id="signal-{signal.name}"></a>`{signal.name}({args})` – {signal.description}\n')
+        add("\n")
+
+        if enums:
+            add("## Enums\n")
+            for enum in enums:
+                add(
+                    f'### <a id="enum-{enum.name}"></a>`{enum.name}`\n'
+                    "| Wert | Integer | Beschreibung |\n|------|---------|--------------|\n"
+                )
+                for item in enum.items:
+                    add(f"| `{item.name}` | {item.value} | {item.description} |\n")
+        add("\n")
+
+        if consts:
+            add("## Konstanten\n| Name | Wert | Beschreibung |\n|------|------|--------------|\n")
+            for const in consts:
+                add(
+                    f'| <a id="const-{const.name}"></a>`{const.name}` | {const.value} '
+                    f"| {const.description} |\n"
+                )
+        add("\n")
+
+        if variables:
+            add(
+                "## Variablen\n| Name | Typ | Standard | Beschreibung |\n"
+                "|------|-----|----------|--------------|\n"
+            )
+            type_link = links.type
+            for var in variables:
+                add(
+                    f'| <a id="var-{var.name}"></a>`{var.name}` '
+                    f'| {type_link(var.type) if var.type else "var"} '
+                    f'| {var.default or "—"} | {var.description} |\n'
+                )
+        add("\n")
+
+        if functions:
+            add("## Funktionen\n")
+            type_link = links.type
+            for func in functions:
+                params = func.params
+                signature = ", ".join(_str(p.name) for p in params)
+                add(f'<a id="func-{func.name}"></a>\n\n### `{func.name}({signature})`\n{func.description}\n\n')
+                if params:
+                    add(
+                        "#### Parameter\n| Name | Typ | Standard | Beschreibung |\n"
+                        "|------|-----|----------|--------------|\n"
+                    )
+                    for p in params:
+                        add(
+                            f'| `{p.name}` | {type_link(p.type) if p.type else "var"} '
+                            f'| {p.default or "—"} | {p.description} |\n'
+                        )
+                add("\n")
+                returns = func.returns
+                if returns:
+                    kind = links.code(returns.type) if returns.type else "`var`"
+                    add(f"**Rückgabe:** {kind} – {returns.description}\n")
+                add("\n")
+                if func.examples:
+                    add(f"##### Beispiel\n```gdscript\n{func.examples}\n```\n")
+                add("\n---\n")
+        add("\n")
+
+    if links.inherited:
+        add("## Geerbte Mitglieder\n")
+        for class_name, url, members in links.inherited:
+            add(f"### Von [`{class_name}`]({url})\n")
+            for kind, member, member_url in members:
+                add(f"- [`{member}`]({member_url}) ({kind})\n")
+    add("\n")
+
+    if links.subclasses:
+        add("## Unterklassen\n")
+        for class_name, url in links.subclasses:
+            add(f"- [`{class_name}`]({url})\n")
+    add("\n")
+
+    if todos:
+        add("## TODO\n")
+        for todo in todos:
+            add(f"- {todo}\n")
+
+    return "".join(out)
+
+
+class NativeRenderer:
+    """Renderer with the interface of :class:`~src.generator.MarkdownRenderer`
+    that builds pages with :func:`render_page`."""
+
+    @property
+    def fingerprint(self) -> str:
+        return native_fingerprint()
+
+    def render(
+        self,
+        data: Union[ParsedScript, Dict[str, Any]],
+        links: Optional[PageLinks] = None,
+    ) -> str:
+        if not isinstance(data, ParsedScript):
+            data = ParsedScript.from_dict(data)
+        return render_page(data, links or NO_LINKS)
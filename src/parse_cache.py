@@ -0,0 +1,121 @@
+"""Content addressed on-disk cache of parse results."""
+
+from __future__ import annotations
+
+import marshal
+import os
+import zlib
+from dataclasses import asdict
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from .parser import PARSER_VERSION, ParsedScript
+
+#: Default upper bound of the cache size in bytes.
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class ParseCache:
+    """Store :class:`~src.parser.ParsedScript` results keyed by source hash.
+
+    Entries live in ``directory/v<PARSER_VERSION>/<hash[:2]>/<hash>``, so a
+    new parser version never sees results of an older one.  Values are
+    ``zlib`` compressed :mod:`marshal` dumps of the plain model, without the
+    script name and path, so identical files share one entry and a cache
+    restored into another checkout still hits.
+
+    Several processes may use the same directory at once: entries are
+    written to a temporary file and renamed into place, readers treat
+    missing or broken entries as misses and eviction ignores files removed
+    by someone else.  Reading an entry refreshes its modification time;
+    :meth:`prune` removes the least recently used entries (of any version)
+    until the cache is at most ``max_bytes`` large.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+    def _path(self, source_hash: str) -> Path:
+        return self.directory / f"v{PARSER_VERSION}" / source_hash[:2] / source_hash
+
+    def get(self, source_hash: str, path: str) -> Optional[ParsedScript]:
+        """Return the cached result for ``source_hash`` as parsed from ``path``."""
+
+        entry = self._path(source_hash)
+        try:
+            raw = entry.read_bytes()
+            data = marshal.loads(zlib.decompress(raw))
+            parsed = ParsedScript.from_dict(data)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, EOFError, TypeError, KeyError, zlib.error):
+            try:
+                entry.unlink()
+            except OSError:
+                pass
+            return None
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+        parsed.script.name = os.path.splitext(os.path.basename(path))[0]
+        parsed.script.path = path
+        return parsed
+
+    def put(self, source_hash: str, parsed: ParsedScript) -> None:
+        """Store ``parsed`` for ``source_hash``.  Errors are ignored."""
+
+        import tempfile
+
+        data = asdict(parsed)
+        data["script"]["name"] = data["script"]["path"] = ""
+        payload = zlib.compress(marshal.dumps(data))
+        entry = self._path(source_hash)
+        try:
+            entry.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=entry.parent, prefix=".tmp-")
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(payload)
+            os.replace(tmp, entry)
+        except OSError:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+
+    def prune(self) -> int:
+        """Evict least recently used entries until the cache fits
+        ``max_bytes``.  Returns the number of removed entries."""
+
+        entries: List[Tuple[int, int, str]] = []
+        total = 0
+        for root, _dirs, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime_ns, st.st_size, path))
+                total += st.st_size
+        if total <= self.max_bytes:
+            return 0
+
+        removed = 0
+        entries.sort()
+        for _mtime, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
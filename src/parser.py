@@ -1,9 +1,36 @@
 import os
 import re
-from dataclasses import dataclass, field
-from typing import List, Optional, Dict, Any
+import time
+from dataclasses import asdict, dataclass, field, fields
+from typing import List, Optional, Dict, Any, Iterator, Tuple
 
+from . import lexer
 
+#: Version of the parsed model.  Bump it whenever a change to the lexer or
+#: parser changes the result for the same input, so cached results of older
+#: versions are not reused.
+PARSER_VERSION = 4
+
+
+def _slots(cls):
+    """Recreate the dataclass ``cls`` with ``__slots__``.
+
+    Equivalent to ``dataclass(slots=True)``, which needs Python 3.10.
+    Instances of slotted classes have no per-instance ``__dict__``, which
+    keeps the parsed model of large projects small.
+    """
+
+    names = tuple(f.name for f in fields(cls))
+    namespace = {
+        key: value
+        for key, value in cls.__dict__.items()
+        if key not in names and key not in ("__dict__", "__weakref__")
+    }
+    namespace["__slots__"] = names
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
+
+
+@_slots
 @dataclass
 class ScriptInfo:
     name: str
@@ -14,6 +41,7 @@ class ScriptInfo:
     extends: Optional[str] = None
 
 
+@_slots
 @dataclass
 class ParamInfo:
     name: str
@@ -22,12 +50,14 @@ class ParamInfo:
     description: str = ""
 
 
+@_slots
 @dataclass
 class ReturnInfo:
     type: Optional[str] = None
     description: str = ""
 
 
+@_slots
 @dataclass
 class FunctionInfo:
     name: str
@@ -37,6 +67,7 @@ class FunctionInfo:
     examples: Optional[str] = None
 
 
+@_slots
 @dataclass
 class ConstInfo:
     name: str
@@ -44,6 +75,7 @@ class ConstInfo:
     description: str = ""
 
 
+@_slots
 @dataclass
 class VariableInfo:
     name: str
@@ -52,6 +84,7 @@ class VariableInfo:
     description: str = ""
 
 
+@_slots
 @dataclass
 class SignalInfo:
     name: str
@@ -59,6 +92,7 @@ class SignalInfo:
     description: str = ""
 
 
+@_slots
 @dataclass
 class EnumItem:
     name: str
@@ -66,6 +100,7 @@ class EnumItem:
     description: str = ""
 
 
+@_slots
 @dataclass
 class EnumInfo:
     name: str
@@ -73,8 +108,303 @@ class EnumInfo:
     description: str = ""
 
 
-def parse_gdscript(path: str) -> Dict[str, Any]:
-    """Parse a single GDScript file and return collected information."""
+@_slots
+@dataclass
+class Reference:
+    """An outgoing reference of a script.
+
+    ``kind`` is ``"extends"`` (a class name or a script path), ``"type"``
+    (a class name used as a type, possibly ``Class.Enum``), ``"preload"``
+    or ``"load"`` (the path passed to ``preload()``/``load()`` in a
+    constant or variable).
+    """
+
+    kind: str
+    target: str
+
+
+_CLASS_NAME_RE = re.compile(r"class_name\s+(\w+)")
+_EXTENDS_RE = re.compile(r"extends\s+([A-Za-z0-9_.]+)")
+_EXTENDS_PATH_RE = re.compile(r"extends\s+(?:\"([^\"]*)\"|'([^']*)')")
+_LOAD_RE = re.compile(r"\b(preload|load)\(\s*(?:\"([^\"]*)\"|'([^']*)')\s*\)")
+_SIGNAL_RE = re.compile(r"signal\s+(\w+)\(")
+_ENUM_RE = re.compile(r"enum\s+(\w+)\s*\{")
+_CONST_RE = re.compile(r"const\s+(\w+)\s*=\s*(.*)")
+_VAR_RE = re.compile(r"var\s+(\w+)(?::\s*([A-Za-z0-9_.]+))?(?:\s*=\s*(.*))?")
+_FUNC_RE = re.compile(r"func\s+(\w+)\(")
+_RETURN_RE = re.compile(r"(?:\s*->\s*([A-Za-z0-9_.]+))?:")
+_PARAM_RE = re.compile(r"(\w+)(?::\s*([A-Za-z0-9_.]+))?(?:\s*=\s*(.*))?")
+
+
+# strings are matched whole, so brackets and commas inside them are ignored
+_ITEM_RE = re.compile(r"\"(?:[^\"\\]|\\.)*\"?|'(?:[^'\\]|\\.)*'?|[()\[\]{},]")
+
+
+def _split_items(text: str, start: int) -> Tuple[List[str], int]:
+    """Split the list in brackets opening at ``text[start]`` at its top level
+    commas, in a single pass.
+
+    Return the stripped, non-empty items and the index of the closing
+    bracket, or -1 if the list is not closed.
+    """
+
+    items: List[str] = []
+    depth = 0
+    item_start = start + 1
+    for m in _ITEM_RE.finditer(text, start):
+        char = text[m.start()]
+        if char == ",":
+            if depth == 1:
+                items.append(text[item_start:m.start()])
+                item_start = m.end()
+        elif char in "([{":
+            depth += 1
+        elif char in ")]}":
+            depth -= 1
+            if depth == 0:
+                items.append(text[item_start:m.start()])
+                return [i for i in map(str.strip, items) if i], m.start()
+    items.append(text[item_start:])
+    return [i for i in map(str.strip, items) if i], -1
+
+
+def _parse_comment(text: str, todos: List[str], comments: List[str]) -> None:
+    if text.lower().startswith("todo"):
+        todos.append(text[4:].strip())
+    else:
+        comments.append(text)
+
+
+@_slots
+@dataclass
+class ParsedScript:
+    """Everything collected from one GDScript file.
+
+    The template renders the attributes directly.  For code written against
+    the older dictionary result, ``result["signals"]`` and :meth:`to_dict`
+    build that representation on demand.
+    """
+
+    script: ScriptInfo
+    signals: List[SignalInfo] = field(default_factory=list)
+    enums: List[EnumInfo] = field(default_factory=list)
+    consts: List[ConstInfo] = field(default_factory=list)
+    variables: List[VariableInfo] = field(default_factory=list)
+    functions: List[FunctionInfo] = field(default_factory=list)
+    todos: List[str] = field(default_factory=list)
+    references: List[Reference] = field(default_factory=list)
+    #: Parts of the file skipped or cut because of :class:`ParseLimits`.
+    warnings: List[str] = field(default_factory=list)
+
+    def context(self) -> Dict[str, Any]:
+        """Template variables: the sections themselves, without copies."""
+
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+    def _section(self, key: str) -> Any:
+        if key == "script":
+            return asdict(self.script)
+        if key == "signals":
+            return [
+                {"name": s.name, "args": list(s.args), "description": s.description}
+                for s in self.signals
+            ]
+        if key == "enums":
+            return [
+                {"name": e.name, "items": [asdict(item) for item in e.items], "description": e.description}
+                for e in self.enums
+            ]
+        if key == "consts":
+            return [asdict(c) for c in self.consts]
+        if key == "variables":
+            return [asdict(v) for v in self.variables]
+        if key == "functions":
+            return [
+                {
+                    "name": f.name,
+                    "description": f.description,
+                    "params": [asdict(p) for p in f.params],
+                    "returns": asdict(f.returns) if f.returns else None,
+                    "examples": f.examples,
+                }
+                for f in self.functions
+            ]
+        if key == "todos":
+            return list(self.todos)
+        if key == "references":
+            return [asdict(r) for r in self.references]
+        if key == "warnings":
+            return list(self.warnings)
+        raise KeyError(key)
+
+    def __getitem__(self, key: str) -> Any:
+        return self._section(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return (f.name for f in fields(self))
+
+    def keys(self) -> List[str]:
+        return list(self)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self._section(key)
+        except KeyError:
+            return default
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the result as plain dictionaries and lists, one key per
+        section, as ``parse_gdscript`` returned it before
+        :class:`ParsedScript` existed.  :meth:`from_dict` accepts it."""
+
+        return {key: self._section(key) for key in self}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ParsedScript":
+        """Rebuild a result from :meth:`to_dict` or ``dataclasses.asdict`` output."""
+
+        def params(items: List[Any]) -> List[ParamInfo]:
+            return [p if isinstance(p, ParamInfo) else ParamInfo(**p) for p in items]
+
+        return cls(
+            script=ScriptInfo(**data["script"]),
+            signals=[
+                SignalInfo(name=s["name"], args=params(s["args"]), description=s["description"])
+                for s in data.get("signals", [])
+            ],
+            enums=[
+                EnumInfo(
+                    name=e["name"],
+                    items=[EnumItem(**i) for i in e["items"]],
+                    description=e["description"],
+                )
+                for e in data.get("enums", [])
+            ],
+            consts=[ConstInfo(**c) for c in data.get("consts", [])],
+            variables=[VariableInfo(**v) for v in data.get("variables", [])],
+            functions=[
+                FunctionInfo(
+                    name=f["name"],
+                    description=f["description"],
+                    params=params(f["params"]),
+                    returns=ReturnInfo(**f["returns"]) if f["returns"] else None,
+                    examples=f["examples"],
+                )
+                for f in data.get("functions", [])
+            ],
+            todos=list(data.get("todos", [])),
+            references=[Reference(**r) for r in data.get("references", [])],
+            warnings=list(data.get("warnings", [])),
+        )
+
+    def to_record(self) -> Tuple[Any, ...]:
+        """Return the result as nested tuples and lists of the field values
+        in declaration order, which :mod:`marshal` can store.  Much faster
+        to build and to read back than :meth:`to_dict`, but only readable
+        by the same :data:`PARSER_VERSION`."""
+
+        s = self.script
+        return (
+            (s.name, s.path, s.short_description, s.description, s.class_name, s.extends),
+            [(x.name, [_param(a) for a in x.args], x.description) for x in self.signals],
+            [
+                (e.name, [(i.name, i.value, i.description) for i in e.items], e.description)
+                for e in self.enums
+            ],
+            [(c.name, c.value, c.description) for c in self.consts],
+            [_param(v) for v in self.variables],
+            [
+                (
+                    f.name,
+                    f.description,
+                    [_param(p) for p in f.params],
+                    (f.returns.type, f.returns.description) if f.returns else None,
+                    f.examples,
+                )
+                for f in self.functions
+            ],
+            list(self.todos),
+            [(r.kind, r.target) for r in self.references],
+            list(self.warnings),
+        )
+
+    @classmethod
+    def from_record(cls, record: Tuple[Any, ...]) -> "ParsedScript":
+        """Rebuild a result from :meth:`to_record` output."""
+
+        script, signals, enums, consts, variables, functions, todos, references, warnings = record
+        return cls(
+            ScriptInfo(*script),
+            [SignalInfo(n, [ParamInfo(*a) for a in args], d) for n, args, d in signals],
+            [EnumInfo(n, [EnumItem(*i) for i in items], d) for n, items, d in enums],
+            [ConstInfo(*c) for c in consts],
+            [VariableInfo(*v) for v in variables],
+            [
+                FunctionInfo(n, d, [ParamInfo(*p) for p in params], ReturnInfo(*r) if r else None, ex)
+                for n, d, params, r, ex in functions
+            ],
+            list(todos),
+            [Reference(*r) for r in references],
+            list(warnings),
+        )
+
+
+def _param(p: Any) -> Tuple[Any, ...]:
+    # ParamInfo and VariableInfo share their fields
+    return (p.name, p.type, p.default, p.description)
+
+
+#: Files at least this large are memory mapped instead of read into memory.
+MMAP_THRESHOLD = 4 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class ParseLimits:
+    """Limits that keep a pathological file from stalling a whole build.
+
+    Files larger than ``max_file_size`` bytes are parsed up to the last
+    line break before the limit, lines and declarations longer than
+    ``max_line_length`` bytes are cut, and parsing stops once it has taken
+    ``time_budget`` seconds.  Every cut adds a message to
+    :attr:`ParsedScript.warnings`.  0 disables a limit.
+    """
+
+    max_file_size: int = 64 * 1024 * 1024
+    max_line_length: int = 1024 * 1024
+    time_budget: float = 10.0
+
+
+DEFAULT_LIMITS = ParseLimits()
+
+# tokens between two looks at the clock
+_CLOCK_INTERVAL = 256
+
+
+def parse_gdscript(
+    path: str, data: Optional[bytes] = None, limits: Optional[ParseLimits] = None
+) -> ParsedScript:
+    """Parse a single GDScript file and return collected information.
+
+    ``data`` is the content of the file if it has already been read.
+    Otherwise files of :data:`MMAP_THRESHOLD` bytes or more are memory
+    mapped, so only the documented parts of large generated scripts are
+    ever copied into memory.  ``limits`` defaults to :data:`DEFAULT_LIMITS`.
+    """
+    if limits is None:
+        limits = DEFAULT_LIMITS
+    if data is not None:
+        return _parse(path, data, limits)
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < MMAP_THRESHOLD:
+            return _parse(path, f.read(), limits)
+        import mmap
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            return _parse(path, buffer, limits)
+
+
+def _parse(path: str, source: "lexer.Buffer", limits: ParseLimits = DEFAULT_LIMITS) -> ParsedScript:
     script = ScriptInfo(name=os.path.splitext(os.path.basename(path))[0], path=path)
     signals: List[SignalInfo] = []
     enums: List[EnumInfo] = []
@@ -82,158 +412,156 @@ def parse_gdscript(path: str) -> Dict[str, Any]:
     variables: List[VariableInfo] = []
     functions: List[FunctionInfo] = []
     todos: List[str] = []
+    references: List[Reference] = []
+    referenced = set()
+
+    def refer(kind: str, target: Optional[str]) -> None:
+        if target and (kind, target) not in referenced:
+            referenced.add((kind, target))
+            references.append(Reference(kind, target))
 
-    with open(path, "r", encoding="utf-8") as f:
-        lines = f.readlines()
+    def refer_loads(value: Optional[str]) -> None:
+        if value and "load" in value:
+            for m in _LOAD_RE.finditer(value):
+                refer(m.group(1), m.group(2) or m.group(3))
 
-    index = 0
+    warnings: List[str] = []
+    size = None
+    if limits.max_file_size and len(source) > limits.max_file_size:
+        size = source.rfind(b"\n", 0, limits.max_file_size) + 1 or limits.max_file_size
+        warnings.append(
+            f"file is larger than {limits.max_file_size} bytes, "
+            f"only the first {size} bytes were parsed"
+        )
+    max_line_length = limits.max_line_length or None
+    deadline = time.perf_counter() + limits.time_budget if limits.time_budget else None
+
+    tokens = lexer.tokenize(source, size, max_line_length)
     pending_comments: List[str] = []
 
     # header comments
-    while index < len(lines) and lines[index].strip().startswith("#"):
-        comment = lines[index].strip().lstrip("#").strip()
-        if comment.lower().startswith("todo"):
-            todos.append(comment[4:].strip())
-        else:
-            pending_comments.append(comment)
-        index += 1
+    for token in tokens:
+        if token.kind != lexer.COMMENT:
+            break
+        _parse_comment(token.value, todos, pending_comments)
+    else:
+        token = None
     if pending_comments:
         script.short_description = pending_comments[0]
         script.description = "\n".join(pending_comments)
     pending_comments = []
 
-    def consume_comments() -> str:
-        nonlocal index
-        comments: List[str] = pending_comments.copy()
-        pending_comments.clear()
-        return "\n".join(comments)
-
-    while index < len(lines):
-        line = lines[index].rstrip("\n")
-        stripped = line.strip()
-
-        if stripped.startswith("#"):
-            text = stripped.lstrip("#").strip()
-            if text.lower().startswith("todo"):
-                todos.append(text[4:].strip())
-            else:
-                pending_comments.append(text)
-            index += 1
-            continue
-
-        description = consume_comments()
-
-        if stripped.startswith("class_name"):
-            m = re.match(r"class_name\s+(\w+)", stripped)
-            if m:
-                script.class_name = m.group(1)
-            index += 1
-            continue
-        if stripped.startswith("extends"):
-            m = re.match(r"extends\s+([A-Za-z0-9_.]+)", stripped)
-            if m:
-                script.extends = m.group(1)
-            index += 1
-            continue
-        if stripped.startswith("signal"):
-            m = re.match(r"signal\s+(\w+)\((.*)\)", stripped)
-            if m:
-                name = m.group(1)
-                params = m.group(2).strip()
-                args: List[ParamInfo] = []
-                if params:
-                    for p in params.split(','):
-                        p = p.strip()
-                        if not p:
-                            continue
-                        args.append(ParamInfo(name=p))
-                signals.append(SignalInfo(name=name, args=args, description=description))
-            index += 1
-            continue
-        if stripped.startswith("enum"):
-            m = re.match(r"enum\s+(\w+)\s*\{(.*)\}", stripped)
-            if m:
-                name = m.group(1)
-                body = m.group(2)
-                items: List[EnumItem] = []
-                for item in body.split(','):
-                    item = item.strip()
-                    if not item:
-                        continue
-                    if '=' in item:
-                        i_name, i_val = map(str.strip, item.split('=', 1))
-                        try:
-                            value = int(i_val)
-                        except ValueError:
-                            value = None
-                        items.append(EnumItem(name=i_name, value=value))
-                    else:
-                        items.append(EnumItem(name=item))
-                enums.append(EnumInfo(name=name, items=items, description=description))
-            index += 1
-            continue
-        if stripped.startswith("const"):
-            m = re.match(r"const\s+(\w+)\s*=\s*(.*)", stripped)
-            if m:
-                name = m.group(1)
-                value = m.group(2).strip()
-                consts.append(ConstInfo(name=name, value=value, description=description))
-            index += 1
-            continue
-        if stripped.startswith("var"):
-            m = re.match(r"var\s+(\w+)(?::\s*([A-Za-z0-9_.]+))?(?:\s*=\s*(.*))?", stripped)
-            if m:
-                name = m.group(1)
-                type_ = m.group(2)
-                default = m.group(3).strip() if m.group(3) else None
-                variables.append(VariableInfo(name=name, type=type_, default=default, description=description))
-            index += 1
-            continue
-        if stripped.startswith("func"):
-            m = re.match(r"func\s+(\w+)\((.*)\)(?:\s*->\s*([A-Za-z0-9_.]+))?:", stripped)
-            if m:
-                name = m.group(1)
-                params_str = m.group(2)
-                return_type = m.group(3)
-                params: List[ParamInfo] = []
-                if params_str:
-                    for p in params_str.split(','):
-                        p = p.strip()
-                        if not p:
-                            continue
-                        pm = re.match(r"(\w+)(?::\s*([A-Za-z0-9_.]+))?(?:\s*=\s*(.*))?", p)
+    count = 0
+    while token is not None:
+        if token.truncated:
+            warnings.append(f"line {token.line} is longer than {max_line_length} bytes and was cut")
+        if token.unclosed:
+            warnings.append(f"line {token.line} has an unclosed bracket")
+        count += 1
+        if deadline is not None and count % _CLOCK_INTERVAL == 0 and time.perf_counter() > deadline:
+            warnings.append(
+                f"parsing took longer than {limits.time_budget:g}s, "
+                f"stopped at line {token.line}"
+            )
+            break
+        if token.kind == lexer.COMMENT:
+            _parse_comment(token.value, todos, pending_comments)
+        elif token.kind == lexer.DECLARATION:
+            description = "\n".join(pending_comments)
+            pending_comments.clear()
+            stripped = token.value
+            keyword = token.keyword
+
+            if keyword == "class_name":
+                m = _CLASS_NAME_RE.match(stripped)
+                if m:
+                    script.class_name = m.group(1)
+            elif keyword == "extends":
+                m = _EXTENDS_RE.match(stripped)
+                if m:
+                    script.extends = m.group(1)
+                    refer("extends", m.group(1))
+                else:
+                    m = _EXTENDS_PATH_RE.match(stripped)
+                    if m:
+                        refer("extends", m.group(1) or m.group(2))
+            elif keyword == "signal":
+                m = _SIGNAL_RE.match(stripped)
+                if m:
+                    items, end = _split_items(stripped, m.end() - 1)
+                    if end != -1 or token.truncated:
+                        args = [ParamInfo(name=p) for p in items]
+                        signals.append(SignalInfo(name=m.group(1), args=args, description=description))
+            elif keyword == "enum":
+                m = _ENUM_RE.match(stripped)
+                body, end = _split_items(stripped, m.end() - 1) if m else ([], -1)
+                if end != -1 or (m and token.truncated):
+                    name = m.group(1)
+                    items: List[EnumItem] = []
+                    for item in body:
+                        if '=' in item:
+                            i_name, i_val = map(str.strip, item.split('=', 1))
+                            try:
+                                value = int(i_val)
+                            except ValueError:
+                                value = None
+                            items.append(EnumItem(name=i_name, value=value))
+                        else:
+                            items.append(EnumItem(name=item))
+                    enums.append(EnumInfo(name=name, items=items, description=description))
+            elif keyword == "const":
+                m = _CONST_RE.match(stripped)
+                if m:
+                    name = m.group(1)
+                    value = m.group(2).strip()
+                    consts.append(ConstInfo(name=name, value=value, description=description))
+                    refer_loads(value)
+            elif keyword == "var":
+                m = _VAR_RE.match(stripped)
+                if m:
+                    name = m.group(1)
+                    type_ = m.group(2)
+                    default = m.group(3).strip() if m.group(3) else None
+                    variables.append(VariableInfo(name=name, type=type_, default=default, description=description))
+                    refer("type", type_)
+                    refer_loads(default)
+            elif keyword == "func":
+                m = _FUNC_RE.match(stripped)
+                parts, end = _split_items(stripped, m.end() - 1) if m else ([], -1)
+                rm = _RETURN_RE.match(stripped, end + 1) if end != -1 else None
+                # the return type and colon of a cut signature are lost
+                if rm or (m and token.truncated):
+                    name = m.group(1)
+                    return_type = rm.group(1) if rm else None
+                    params: List[ParamInfo] = []
+                    for p in parts:
+                        pm = _PARAM_RE.match(p)
                         if pm:
                             pname = pm.group(1)
                             ptype = pm.group(2)
                             pdefault = pm.group(3)
                             params.append(ParamInfo(name=pname, type=ptype, default=pdefault))
+                            refer("type", ptype)
                         else:
                             params.append(ParamInfo(name=p))
-                returns = ReturnInfo(type=return_type) if return_type else None
-                functions.append(FunctionInfo(name=name, description=description, params=params, returns=returns))
-            index += 1
-            continue
-
-        # reset pending comments if line is empty or other
-        index += 1
-        pending_comments.clear()
-
-    result = {
-        "script": script.__dict__,
-        "signals": [s.__dict__ for s in signals],
-        "enums": [{"name": e.name, "items": [item.__dict__ for item in e.items], "description": e.description} for e in enums],
-        "consts": [c.__dict__ for c in consts],
-        "variables": [v.__dict__ for v in variables],
-        "functions": [
-            {
-                "name": f.name,
-                "description": f.description,
-                "params": [p.__dict__ for p in f.params],
-                "returns": f.returns.__dict__ if f.returns else None,
-                "examples": f.examples,
-            }
-            for f in functions
-        ],
-        "todos": todos,
-    }
-    return result
+                    returns = ReturnInfo(type=return_type) if return_type else None
+                    refer("type", return_type)
+                    functions.append(FunctionInfo(name=name, description=description, params=params, returns=returns))
+        elif token.kind == lexer.OTHER:
+            # reset pending comments if line is empty or other
+            pending_comments.clear()
+        # annotations keep the pending comments for the declaration they decorate
+
+        token = next(tokens, None)
+
+    return ParsedScript(
+        script=script,
+        signals=signals,
+        enums=enums,
+        consts=consts,
+        variables=variables,
+        functions=functions,
+        todos=todos,
+        references=references,
+        warnings=warnings,
+    )
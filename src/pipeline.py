@@ -0,0 +1,152 @@
+"""Parse and render steps of a build, run in worker processes or inline."""
+
+from __future__ import annotations
+
+import functools
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+from itertools import islice
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Deque,
+    Generic,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from . import generator, parser
+from .manifest import hash_bytes
+from .parse_cache import ParseCache
+from .symbols import PageLinks
+
+if TYPE_CHECKING:  # imported on demand, loading multiprocessing is slow
+    from concurrent.futures import Future, ProcessPoolExecutor
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# path, content hash, cache, content (``None`` to read or map the file), limits
+ParseJob = Tuple[Path, str, Optional[ParseCache], Optional[bytes], parser.ParseLimits]
+RenderJob = Tuple[parser.ParsedScript, generator.Renderer, PageLinks]
+
+
+def read_script(path: Path) -> Tuple[Optional[bytes], str]:
+    """Return the content of ``path`` and its hash.
+
+    Files of :data:`~src.parser.MMAP_THRESHOLD` bytes or more are hashed
+    through a memory map and their content is returned as ``None``: the
+    parser maps them again instead of holding a copy.
+    """
+
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < parser.MMAP_THRESHOLD:
+            data = f.read()
+            return data, hash_bytes(data)
+        import mmap
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            return None, hash_bytes(buffer)
+
+
+def parse_script(job: ParseJob) -> parser.ParsedScript:
+    """Parse ``job[0]`` whose content hashes to ``job[1]``.
+
+    The result is looked up in and stored to the cache ``job[2]`` if given;
+    results cut by the limits ``job[4]`` are not stored, so the file is
+    parsed again once the limits are raised.  ``job[3]`` is the already read
+    content of the file, if any.  Defined at module level so it can run in a
+    worker.
+    """
+
+    path, source_hash, cache, content, limits = job
+    if cache is None:
+        return parser.parse_gdscript(str(path), content, limits)
+    data = cache.get(source_hash, str(path))
+    if data is None:
+        data = parser.parse_gdscript(str(path), content, limits)
+        if not data.warnings:
+            cache.put(source_hash, data)
+    return data
+
+
+def render_script(job: RenderJob) -> List[Tuple[str, str]]:
+    """Return the Markdown pages for ``job``, see
+    :func:`~src.generator.render_pages`.  Defined at module level so it can
+    run in a worker."""
+
+    data, renderer, links = job
+    return generator.render_pages(renderer, data, links)
+
+
+class Timed(Generic[T, R]):
+    """Wrap ``func`` to also return its start time, duration and process id.
+
+    Used with ``--profile`` to measure work done in worker processes.
+    Instances pickle by reference to ``func``.
+    """
+
+    def __init__(self, func: Callable[[T], R]) -> None:
+        self.func = func
+
+    def __call__(self, job: T) -> Tuple[R, float, float, int]:
+        start = time.perf_counter()
+        result = self.func(job)
+        return result, start, time.perf_counter() - start, os.getpid()
+
+
+@contextmanager
+def worker_pool(workers: int) -> Iterator[Optional[ProcessPoolExecutor]]:
+    """Yield a process pool for ``workers`` > 1, otherwise ``None``."""
+
+    if workers <= 1:
+        yield None
+        return
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield pool
+
+
+#: Items sent to a worker process at once.
+CHUNK_SIZE = 4
+
+
+def _map_chunk(func: Callable[[T], R], chunk: List[T]) -> List[R]:
+    return [func(item) for item in chunk]
+
+
+def ordered_map(
+    pool: Optional[ProcessPoolExecutor],
+    func: Callable[[T], R],
+    items: Iterable[T],
+    depth: int = 2,
+) -> Iterator[R]:
+    """Yield ``func(item)`` for ``items`` in order, using ``pool`` if given.
+
+    Results come back in submission order, so the output does not depend on
+    scheduling.  Items are sent in chunks of :data:`CHUNK_SIZE`; at most
+    ``depth`` chunks run ahead of the consumer (like
+    :meth:`~src.fileio.IOPool.map`), so ``items`` is consumed lazily and a
+    generator reading files is only read that far ahead.
+    """
+
+    if pool is None:
+        yield from map(func, items)
+        return
+    task = functools.partial(_map_chunk, func)
+    source = iter(items)
+    pending: Deque[Future[List[R]]] = deque()
+    for chunk in iter(lambda: list(islice(source, CHUNK_SIZE)), []):
+        pending.append(pool.submit(task, chunk))
+        if len(pending) >= depth:
+            yield from pending.popleft().result()
+    while pending:
+        yield from pending.popleft().result()
@@ -0,0 +1,158 @@
+"""Stage timers and counters for ``--profile``."""
+
+from __future__ import annotations
+
+import heapq
+import json
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# name, start, duration (seconds, perf_counter clock), process id, arguments
+Event = Tuple[str, float, float, int, Dict[str, Any]]
+
+
+class Profiler:
+    """Collect the time spent per build stage, counters and per-file times.
+
+    Code being profiled receives an optional profiler and only calls it when
+    one is given, so a build without ``--profile`` pays a single ``None``
+    check per call site.  Times measured in worker processes are passed in
+    with :meth:`add`; :func:`time.perf_counter` uses a system wide monotonic
+    clock, so their start times line up with the main process in a trace.
+    """
+
+    def __init__(self, slowest: int = 10) -> None:
+        self.slowest = slowest
+        self.origin = time.perf_counter()
+        self.stages: Dict[str, List[float]] = {}
+        self.counters: Dict[str, int] = {}
+        self.files: Dict[str, float] = {}
+        self.events: List[Event] = []
+
+    def add(
+        self,
+        name: str,
+        start: float,
+        duration: float,
+        pid: Optional[int] = None,
+        file: Optional[str] = None,
+    ) -> None:
+        """Record ``duration`` seconds of stage ``name`` starting at ``start``.
+
+        ``file`` attributes the time to a script for the slowest files list.
+        """
+
+        stage = self.stages.get(name)
+        if stage is None:
+            stage = self.stages[name] = [0, 0.0]
+        stage[0] += 1
+        stage[1] += duration
+        args = {"file": file} if file else {}
+        self.events.append((name, start, duration, pid or os.getpid(), args))
+        if file:
+            self.files[file] = self.files.get(file, 0.0) + duration
+
+    @contextmanager
+    def stage(self, name: str, file: Optional[str] = None) -> Iterator[None]:
+        """Time the body of the ``with`` block as stage ``name``."""
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, start, time.perf_counter() - start, file=file)
+
+    def iterate(self, name: str, items: Iterable[T]) -> Iterator[T]:
+        """Yield from ``items``, timing each step of the iteration as ``name``.
+
+        Used for lazy producers such as the directory walk.
+        """
+
+        iterator = iter(items)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add(name, start, time.perf_counter() - start)
+                return
+            self.add(name, start, time.perf_counter() - start)
+            yield item
+
+    def count(self, name: str, value: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def slowest_files(self) -> List[Tuple[str, float]]:
+        return heapq.nlargest(self.slowest, self.files.items(), key=lambda item: item[1])
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summary of the run as JSON compatible data."""
+
+        return {
+            "total_seconds": time.perf_counter() - self.origin,
+            "stages": {
+                name: {"calls": int(calls), "seconds": seconds}
+                for name, (calls, seconds) in self.stages.items()
+            },
+            "counters": dict(sorted(self.counters.items())),
+            "slowest_files": [
+                {"file": file, "seconds": seconds} for file, seconds in self.slowest_files()
+            ],
+        }
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """The events in the Chrome trace format (``chrome://tracing``,
+        Perfetto)."""
+
+        events = [
+            {
+                "name": name,
+                "ph": "X",
+                "ts": round((start - self.origin) * 1e6, 3),
+                "dur": round(duration * 1e6, 3),
+                "pid": os.getpid(),
+                "tid": pid,
+                "args": args,
+            }
+            for name, start, duration, pid, args in self.events
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self, path: str, fmt: str = "json") -> None:
+        """Write :meth:`to_dict` (``fmt="json"``) or :meth:`chrome_trace`
+        (``fmt="chrome"``) to ``path``."""
+
+        with open(path, "w", encoding="utf-8") as handle:
+            if fmt == "chrome":
+                json.dump(self.chrome_trace(), handle, separators=(",", ":"))
+            else:
+                json.dump(self.to_dict(), handle, indent=2)
+
+    def table(self) -> str:
+        """Human readable summary."""
+
+        summary = self.to_dict()
+        total = summary["total_seconds"]
+        lines = [f"{'stage':<12} {'calls':>8} {'seconds':>10} {'share':>7}"]
+        for name, stage in sorted(
+            summary["stages"].items(), key=lambda item: -item[1]["seconds"]
+        ):
+            share = stage["seconds"] / total * 100 if total else 0.0
+            lines.append(
+                f"{name:<12} {stage['calls']:>8} {stage['seconds']:>10.4f} {share:>6.1f}%"
+            )
+        lines.append(f"{'total':<12} {'':>8} {total:>10.4f}")
+        if summary["counters"]:
+            lines.append("")
+            lines.extend(f"{name:<20} {value:>12}" for name, value in summary["counters"].items())
+        if summary["slowest_files"]:
+            lines.append("")
+            lines.append("slowest files (parse + render seconds):")
+            lines.extend(
+                f"  {entry['seconds']:>9.4f}  {entry['file']}" for entry in summary["slowest_files"]
+            )
+        return "\n".join(lines)
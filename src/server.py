@@ -0,0 +1,300 @@
+"""Resident build server for ``gd2doc serve``.
+
+The server keeps everything a build needs in memory: the compiled
+template, the manifest with the parsed model of every script and the
+imported modules.  Clients (see :mod:`src.client`) connect to a Unix
+socket and send one request per connection, a JSON object on a single
+line, and receive one JSON object back:
+
+``{"paths": [...]}``
+    Update the documentation of the given ``.gd`` files (absolute paths).
+    Without paths, or if a path is a directory, the whole source tree is
+    checked.  The reply lists the ``generated`` and ``removed`` pages and
+    the ``summary`` of the writes.
+``{"command": "status"}``
+    Reply with the source, the output directory and the number of builds.
+``{"command": "stop"}``
+    Save the manifest and shut the server down.
+
+Replies carry ``"ok": true`` or ``"ok": false`` with an ``error``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional, Set
+
+from .api import BuildOptions, build
+from .changes import Changes
+from .discovery import is_discoverable
+from .fileio import IOPool
+from .manifest import BuildManifest
+from .sinks import DirectorySink
+from .writer import FileWriter
+
+
+def _ignore(message: str) -> None:
+    pass
+
+
+class _Batch:
+    """Requests answered by the same build."""
+
+    def __init__(self) -> None:
+        self.paths: Optional[Set[str]] = set()  # ``None``: check everything
+        self.done = threading.Event()
+        self.reply: Dict[str, Any] = {}
+
+    def add(self, paths: Optional[Iterable[str]]) -> None:
+        if paths is None or self.paths is None:
+            self.paths = None
+        else:
+            self.paths.update(paths)
+
+    def wait(self) -> Dict[str, Any]:
+        self.done.wait()
+        return self.reply
+
+
+class BuildServer:
+    """Keep the build state of ``source`` in memory and run builds on request.
+
+    Builds run one at a time on a builder thread, so every build sees the
+    pages and the manifest left by the previous one.  Requests arriving
+    while a build runs are collected and answered together by the next
+    build; since every build hashes the files it is asked about, files
+    changed between requests are always picked up.
+    """
+
+    def __init__(
+        self,
+        source: Path,
+        output_dir: Path,
+        options: Optional[BuildOptions] = None,
+        echo: Callable[[str], None] = _ignore,
+    ) -> None:
+        self.source = Path(source).resolve()
+        self.base = self.source if self.source.is_dir() else self.source.parent
+        self.output_dir = Path(output_dir)
+        self.options = options or BuildOptions()
+        self.echo = echo
+        self.builds = 0
+        self.pool = IOPool(self.options.io_workers)
+        self.manifest = BuildManifest.load(
+            self.output_dir,
+            fingerprint=self.options.fingerprint(),
+            source=str(self.base),
+        )
+        self._lock = threading.Condition()
+        self._open: Optional[_Batch] = None
+        self._stopping = False
+        self._builder = threading.Thread(target=self._run, name="gd2doc-build", daemon=True)
+        self._builder.start()
+
+    def request(self, paths: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Update the documentation of ``paths`` (all files if ``None``) and
+        return the reply for the client.  Safe to call from many threads."""
+
+        with self._lock:
+            if self._stopping:
+                return {"ok": False, "error": "server is shutting down"}
+            if self._open is None:
+                self._open = _Batch()
+                self._lock.notify()
+            batch = self._open
+            batch.add(paths)
+        return batch.wait()
+
+    def close(self) -> None:
+        """Finish pending builds, then save the manifest."""
+
+        with self._lock:
+            self._stopping = True
+            self._lock.notify()
+        self._builder.join()
+        self.pool.close()
+        self.manifest.save(self.output_dir)
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                while self._open is None and not self._stopping:
+                    self._lock.wait()
+                batch, self._open = self._open, None
+            if batch is None:
+                return
+            try:
+                batch.reply = self._build(batch.paths)
+            except Exception as exc:  # reported to the client, the server goes on
+                batch.reply = {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+            batch.done.set()
+
+    def _changes(self, paths: Set[str]) -> Optional[Changes]:
+        """Classify ``paths`` against the manifest; ``None`` if the whole
+        tree has to be checked."""
+
+        options = self.options
+        changes = Changes()
+        for path in sorted(paths):
+            target = Path(path)
+            if target.is_dir():
+                return None
+            # the base is resolved, so symlinked directories are resolved
+            # here too; the file itself may be gone or a link
+            target = target.parent.resolve() / target.name
+            try:
+                key = target.relative_to(self.base).as_posix()
+            except ValueError:
+                continue  # not part of this project
+            if key in self.manifest:
+                (changes.modified if target.is_file() else changes.deleted).append(key)
+            elif target.is_file() and is_discoverable(
+                self.base,
+                key,
+                options.recursive,
+                options.exclude,
+                use_gitignore=options.use_gitignore,
+            ):
+                changes.created.append(key)
+        return changes
+
+    def _build(self, paths: Optional[Set[str]]) -> Dict[str, Any]:
+        start = time.perf_counter()
+        changes = None if paths is None else self._changes(paths)
+        # a sink per build so the summary counts this build only
+        sink = DirectorySink(
+            self.output_dir,
+            self.options.project_root,
+            FileWriter(self.pool),
+            io_workers=self.options.io_workers,
+        )
+        result = build(
+            self.source,
+            self.options,
+            sink,
+            echo=self.echo,
+            changes=changes,
+            manifest=self.manifest,
+        )
+        self.builds += 1
+        seconds = time.perf_counter() - start
+        self.echo(f"Build {self.builds}: {result.summary} ({seconds:.3f}s)")
+        return {
+            "ok": True,
+            "generated": result.generated,
+            "removed": result.removed,
+            "summary": result.summary,
+            "seconds": seconds,
+        }
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "ok": True,
+            "source": str(self.source),
+            "output_dir": str(self.output_dir),
+            "scripts": len(self.manifest),
+            "builds": self.builds,
+        }
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: "_SocketServer"
+
+    def handle(self) -> None:
+        try:
+            message = json.loads(self.rfile.readline())
+        except ValueError as exc:
+            reply: Dict[str, Any] = {"ok": False, "error": f"invalid request: {exc}"}
+        else:
+            reply = self.server.dispatch(message)
+        self.wfile.write(json.dumps(reply).encode("utf-8") + b"\n")
+
+
+class _SocketServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    # editor hooks may fire for many files at once; with the default backlog
+    # of 5, connecting clients beyond it fail with EAGAIN
+    request_queue_size = 128
+
+    def __init__(self, path: str, builds: BuildServer) -> None:
+        self.builds = builds
+        super().__init__(path, _Handler)
+
+    def dispatch(self, message: Any) -> Dict[str, Any]:
+        if not isinstance(message, dict):
+            return {"ok": False, "error": "invalid request: expected an object"}
+        command = message.get("command", "build")
+        if command == "build":
+            paths = message.get("paths")
+            if paths is not None and (
+                not isinstance(paths, list) or not all(isinstance(p, str) for p in paths)
+            ):
+                return {"ok": False, "error": "invalid request: paths must be a list of strings"}
+            return self.builds.request(paths or None)
+        if command == "status":
+            return self.builds.status()
+        if command == "stop":
+            # shutdown() waits for serve_forever(), which runs this handler's
+            # caller, so it has to be called from another thread
+            threading.Thread(target=self.shutdown).start()
+            return {"ok": True}
+        return {"ok": False, "error": f"unknown command: {command}"}
+
+
+def _claim(path: str) -> None:
+    """Remove a socket left behind by a server that is no longer running."""
+
+    if not os.path.exists(path):
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except OSError:
+        os.unlink(path)
+    else:
+        raise RuntimeError(f"A gd2doc server is already listening on {path}")
+    finally:
+        probe.close()
+
+
+def serve(
+    socket_path: str,
+    builds: BuildServer,
+    ready: Optional[Callable[[], None]] = None,
+) -> None:
+    """Answer requests on ``socket_path`` until a client sends ``stop``.
+
+    The first build runs before the socket is opened.  ``ready`` is called
+    once clients can connect.  The manifest is saved and the socket removed
+    on the way out.
+    """
+
+    try:
+        _claim(socket_path)
+        builds.request()
+        server = _SocketServer(socket_path, builds)
+    except BaseException:
+        builds.close()
+        raise
+    try:
+        os.chmod(socket_path, 0o600)
+        if ready is not None:
+            ready()
+        server.serve_forever()
+    finally:
+        server.server_close()
+        try:
+            builds.close()
+        finally:
+            # removed last: once the socket is gone the manifest is saved
+            try:
+                os.unlink(socket_path)
+            except FileNotFoundError:
+                pass
+
@@ -0,0 +1,252 @@
+"""Destinations for the files produced by a build."""
+
+from __future__ import annotations
+
+import io
+import os
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from .fileio import IOPool
+from .generator import prune_directories, remove_page
+from .writer import FileWriter
+
+#: Path under which sinks receive the MkDocs configuration.  All other paths
+#: are relative to the documentation directory, and since generated pages
+#: always end in ``.md`` the name cannot clash with them.
+MKDOCS_YML = "mkdocs.yml"
+
+# fixed timestamp so archives of the same output are byte identical
+_ZIP_DATE = (1980, 1, 1, 0, 0, 0)
+
+
+class Sink:
+    """Base class of output sinks.
+
+    A build calls :meth:`write` for every file it produces, with a POSIX
+    style path relative to the documentation directory (or
+    :data:`MKDOCS_YML`), and :meth:`remove` for pages of deleted scripts.
+    Sinks count what happened in ``written``, ``skipped`` and ``deleted``
+    like :class:`~src.writer.FileWriter`.  Sinks may delay writes until
+    :meth:`flush`, which a build calls when it is done.  Sinks holding
+    resources are context managers; :meth:`close` finishes them.
+    """
+
+    def __init__(self) -> None:
+        self.written = 0
+        self.skipped = 0
+        self.deleted = 0
+
+    def write(self, path: str, content: str) -> Optional[bool]:
+        """Store ``content`` at ``path`` and return ``True`` if it changed,
+        or ``None`` if the write was queued."""
+
+        raise NotImplementedError
+
+    def remove(self, path: str) -> bool:
+        """Remove the page at ``path``.  Sinks without history ignore it."""
+
+        return False
+
+    def move(self, source: str, path: str) -> bool:
+        """Move the page at ``source`` to ``path`` and return ``True`` if it
+        was moved.  Sinks without history return ``False``."""
+
+        return False
+
+    def skip(self, count: int = 1) -> None:
+        """Record ``count`` files that were up to date without being rendered."""
+
+        self.skipped += count
+
+    def flush(self) -> None:
+        """Carry out delayed writes."""
+
+    def summary(self) -> str:
+        return f"{self.written} written, {self.skipped} unchanged, {self.deleted} deleted"
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self) -> "Sink":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class DirectorySink(Sink):
+    """Write pages below ``output_dir`` and ``mkdocs.yml`` to ``project_root``.
+
+    Writes go through a :class:`~src.writer.FileWriter`, so unchanged files
+    are left untouched.  With ``io_workers`` > 1 writes are queued and
+    carried out in batches on that many threads; removals and moves wait
+    for the queued writes first.  Builds into a directory sink are
+    incremental: they keep a manifest in ``output_dir``.
+    """
+
+    def __init__(
+        self,
+        output_dir: Path,
+        project_root: Optional[Path] = None,
+        writer: Optional[FileWriter] = None,
+        io_workers: int = 1,
+    ) -> None:
+        self.output_dir = Path(output_dir)
+        self.project_root = Path(project_root) if project_root else Path.cwd()
+        self.writer = writer or FileWriter()
+        self.batched = io_workers > 1
+        if self.batched and self.writer.pool is None:
+            self.writer.pool = IOPool(io_workers)
+
+    # the counters live in the writer, which watch mode keeps using
+    written = property(lambda self: self.writer.written)
+    skipped = property(lambda self: self.writer.skipped)
+    deleted = property(lambda self: self.writer.deleted)
+
+    def target(self, path: str) -> Path:
+        """Return the file ``path`` is written to."""
+
+        if path == MKDOCS_YML:
+            return self.project_root / MKDOCS_YML
+        return self.output_dir / path
+
+    def write(self, path: str, content: str) -> Optional[bool]:
+        if self.batched:
+            self.writer.submit(self.target(path), content)
+            return None
+        return self.writer.write(self.target(path), content)
+
+    def remove(self, path: str) -> bool:
+        self.writer.flush()
+        deleted = self.writer.deleted
+        remove_page(self.output_dir, Path(path), writer=self.writer)
+        return self.writer.deleted > deleted
+
+    def move(self, source: str, path: str) -> bool:
+        self.writer.flush()
+        old, new = self.target(source), self.target(path)
+        if not old.is_file():
+            return False
+        new.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(old, new)
+        prune_directories(self.output_dir, old.parent, writer=self.writer)
+        return True
+
+    def skip(self, count: int = 1) -> None:
+        self.writer.skip(count)
+
+    def flush(self) -> None:
+        self.writer.flush()
+
+    def summary(self) -> str:
+        return self.writer.summary()
+
+    def close(self) -> None:
+        self.flush()
+        if self.writer.pool is not None:
+            self.writer.pool.close()
+
+
+class DictSink(Sink):
+    """Keep all files in the ``files`` dictionary."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.files: Dict[str, str] = {}
+
+    def write(self, path: str, content: str) -> bool:
+        if self.files.get(path) == content:
+            self.skipped += 1
+            return False
+        self.files[path] = content
+        self.written += 1
+        return True
+
+    def remove(self, path: str) -> bool:
+        if self.files.pop(path, None) is None:
+            return False
+        self.deleted += 1
+        return True
+
+    def move(self, source: str, path: str) -> bool:
+        if source not in self.files:
+            return False
+        self.files[path] = self.files.pop(source)
+        return True
+
+
+class CallbackSink(Sink):
+    """Pass every file to ``callback(path, content)`` as soon as it is ready."""
+
+    def __init__(self, callback: Callable[[str, str], None]) -> None:
+        super().__init__()
+        self.callback = callback
+
+    def write(self, path: str, content: str) -> bool:
+        self.callback(path, content)
+        self.written += 1
+        return True
+
+
+class ArchiveSink(Sink):
+    """Write all files into a zip or tar archive at ``path``.
+
+    The format follows the file name: ``.zip``, ``.tar``, ``.tar.gz``/``.tgz``,
+    ``.tar.bz2`` or ``.tar.xz``.  Pages are stored below ``docs_dir`` and
+    ``mkdocs.yml`` at the top, matching the layout of a project.  Entries
+    carry fixed timestamps, so the same output gives the same archive.
+    """
+
+    _TAR_MODES = (
+        ((".tar.gz", ".tgz"), "w:gz"),
+        ((".tar.bz2",), "w:bz2"),
+        ((".tar.xz",), "w:xz"),
+        ((".tar",), "w"),
+    )
+
+    def __init__(self, path: Path, docs_dir: str = "docs") -> None:
+        # imported here, loading the archive modules slows down startup
+        import tarfile
+        import zipfile
+
+        super().__init__()
+        self.path = Path(path)
+        self.docs_dir = docs_dir.strip("/")
+        name = self.path.name.lower()
+        self._add: Callable[[str, bytes], None]
+        self._close: Callable[[], None]
+        if name.endswith(".zip"):
+            archive = zipfile.ZipFile(self.path, "w", zipfile.ZIP_DEFLATED)
+
+            def add_zip(entry: str, data: bytes) -> None:
+                info = zipfile.ZipInfo(entry, date_time=_ZIP_DATE)
+                info.compress_type = zipfile.ZIP_DEFLATED
+                info.external_attr = 0o644 << 16
+                archive.writestr(info, data)
+
+            self._add, self._close = add_zip, archive.close
+            return
+        for suffixes, mode in self._TAR_MODES:
+            if name.endswith(suffixes):
+                break
+        else:
+            raise ValueError(f"Unsupported archive type: {self.path.name}")
+        tar = tarfile.open(self.path, mode)
+
+        def add_tar(entry: str, data: bytes) -> None:
+            info = tarfile.TarInfo(entry)
+            info.size = len(data)
+            info.mode = 0o644
+            tar.addfile(info, io.BytesIO(data))
+
+        self._add, self._close = add_tar, tar.close
+
+    def write(self, path: str, content: str) -> bool:
+        name = path if path == MKDOCS_YML or not self.docs_dir else f"{self.docs_dir}/{path}"
+        self._add(name, content.encode("utf-8"))
+        self.written += 1
+        return True
+
+    def close(self) -> None:
+        self._close()
@@ -0,0 +1,439 @@
+"""Project wide symbol index used to link scripts with each other."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import posixpath
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from typing import Any, Container, Dict, Iterator, List, Mapping, Optional, Sequence, Set, Tuple
+
+from .parser import ParsedScript
+
+#: Member kinds in the order they appear on a page.
+KINDS = ("signal", "enum", "const", "var", "func")
+
+#: Subpages of a split page: file name part, title and the member kinds on it.
+SECTIONS = (
+    ("signals", "Signale", ("signal",)),
+    ("constants", "Enums und Konstanten", ("enum", "const")),
+    ("variables", "Variablen", ("var",)),
+    ("functions", "Funktionen", ("func",)),
+)
+
+#: Pages of scripts with more members than this are split, see :func:`split_page`.
+DEFAULT_SPLIT_THRESHOLD = 250
+
+
+def anchor(kind: str, name: str) -> str:
+    """Return the HTML id of member ``name`` of ``kind`` on a script page."""
+
+    return f"{kind}-{name}"
+
+
+def page_for(key: str) -> str:
+    """Return the page (relative to the docs root) documenting script ``key``."""
+
+    return posixpath.splitext(key)[0] + ".md"
+
+
+def split_owner(page: str) -> str:
+    """Return the page whose subpages may be named like ``page``, e.g.
+    ``big.md`` for ``big.functions.md``, or ``""`` if there is none."""
+
+    stem, dot, _ = page[:-3].rpartition(".")
+    if not dot or not posixpath.basename(stem):
+        return ""
+    return stem + ".md"
+
+
+@dataclass
+class ScriptSymbols:
+    """Symbols a single script contributes to the index.
+
+    ``references`` are the ``[kind, target]`` pairs of its
+    :class:`~src.parser.Reference` list, from which
+    :class:`~src.deps.DependencyGraph` is built without the parsed script.
+    """
+
+    page: str
+    class_name: Optional[str] = None
+    extends: Optional[str] = None
+    members: Dict[str, List[str]] = field(default_factory=dict)
+    references: List[List[str]] = field(default_factory=list)
+
+    @classmethod
+    def from_parsed(cls, key: str, parsed: ParsedScript) -> "ScriptSymbols":
+        return cls(
+            page=page_for(key),
+            class_name=parsed.script.class_name,
+            extends=parsed.script.extends,
+            members={
+                "signal": [s.name for s in parsed.signals],
+                "enum": [e.name for e in parsed.enums],
+                "const": [c.name for c in parsed.consts],
+                "var": [v.name for v in parsed.variables],
+                "func": [f.name for f in parsed.functions],
+            },
+            references=[[r.kind, r.target] for r in parsed.references],
+        )
+
+
+def _initial(name: str) -> str:
+    return name.lstrip("_")[:1].lower() or "_"
+
+
+@dataclass(frozen=True)
+class PagePart:
+    """A subpage of a split script page.
+
+    It holds the ``count`` members of ``kinds`` whose names, without leading
+    underscores, start with a character from ``first`` to ``last``, or all
+    of them if ``first`` is empty.  ``url`` is the file name of the
+    subpage, which lies next to the main page.
+    """
+
+    title: str
+    url: str
+    kinds: Tuple[str, ...]
+    count: int
+    first: str = ""
+    last: str = ""
+
+    def holds(self, kind: str, name: str) -> bool:
+        if kind not in self.kinds:
+            return False
+        return not self.first or self.first <= _initial(name) <= self.last
+
+
+def split_page(
+    page: str,
+    members: Mapping[str, Sequence[str]],
+    threshold: int,
+    taken: Container[str] = (),
+) -> List[PagePart]:
+    """Return the subpages of ``page`` if its script has more than
+    ``threshold`` members (0 never splits), otherwise an empty list.
+
+    Members go to one subpage per entry of :data:`SECTIONS`.  A section
+    with more than ``threshold`` members is split further into alphabetical
+    ranges of at most ``threshold`` members each; members sharing their
+    first character always stay together.
+
+    A subpage whose name is one of the ``taken`` pages, such as
+    ``big.functions.md`` of a script ``big.functions.gd`` next to
+    ``big.gd``, is numbered instead: ``big.functions-2.md``.
+    """
+
+    if not threshold or sum(len(names) for names in members.values()) <= threshold:
+        return []
+    directory, stem = posixpath.split(page[:-3])
+
+    def name(section: str) -> str:
+        url = f"{stem}.{section}.md"
+        number = 1
+        while posixpath.join(directory, url) in taken:
+            number += 1
+            url = f"{stem}.{section}-{number}.md"
+        return url
+
+    parts: List[PagePart] = []
+    for section, title, kinds in SECTIONS:
+        counts = Counter(_initial(name) for kind in kinds for name in members.get(kind, ()))
+        total = sum(counts.values())
+        if not total:
+            continue
+        if total <= threshold:
+            parts.append(PagePart(title, name(section), kinds, total))
+            continue
+        chunks: List[List[str]] = [[]]
+        size = 0
+        for initial in sorted(counts):
+            if chunks[-1] and size + counts[initial] > threshold:
+                chunks.append([])
+                size = 0
+            chunks[-1].append(initial)
+            size += counts[initial]
+        for chunk in chunks:
+            first, last = chunk[0], chunk[-1]
+            label, suffix = first.upper(), first
+            if first != last:
+                label, suffix = f"{first.upper()}–{last.upper()}", f"{first}-{last}"
+            parts.append(
+                PagePart(
+                    f"{title} ({label})",
+                    name(f"{section}-{suffix}"),
+                    kinds,
+                    sum(counts[initial] for initial in chunk),
+                    first,
+                    last,
+                )
+            )
+    return parts
+
+
+InheritedMember = Tuple[str, str, str]
+
+
+@dataclass
+class PageLinks:
+    """Cross references resolved for one page.
+
+    ``types`` maps type names used on the page to relative URLs,
+    ``inherited`` lists ``(class name, url, members)`` for every resolvable
+    ancestor, nearest first, where ``members`` are ``(kind, name, url)``
+    tuples not overridden on the page, and ``subclasses`` lists
+    ``(class name, url)`` of scripts extending this one.
+
+    The main page of a split script lists its subpages in ``parts`` and
+    its own file name in ``overview``.  The links of a subpage (see
+    :meth:`for_part`) carry the title of the subpage in ``part``.
+    """
+
+    types: Dict[str, str] = field(default_factory=dict)
+    inherited: List[Tuple[str, str, List[InheritedMember]]] = field(default_factory=list)
+    subclasses: List[Tuple[str, str]] = field(default_factory=list)
+    parts: List[PagePart] = field(default_factory=list)
+    overview: str = ""
+    part: str = ""
+
+    def code(self, name: str) -> str:
+        """``name`` as inline code, linked if it refers to a known script."""
+
+        url = self.types.get(name)
+        return f"[`{name}`]({url})" if url else f"`{name}`"
+
+    def type(self, name: str) -> str:
+        """``name`` as plain text, linked if it refers to a known script."""
+
+        url = self.types.get(name)
+        return f"[{name}]({url})" if url else name
+
+    def for_part(self, part: PagePart) -> "PageLinks":
+        """Return the links of the subpage ``part`` of this page."""
+
+        return PageLinks(types=self.types, overview=self.overview, part=part.title)
+
+    def signature(self) -> str:
+        """Digest of the links; a page must be re-rendered when it changes."""
+
+        payload = json.dumps(asdict(self), sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+#: Links used when rendering without a symbol index.
+NO_LINKS = PageLinks()
+
+
+def _referenced_types(parsed: ParsedScript) -> Iterator[str]:
+    if parsed.script.extends:
+        yield parsed.script.extends
+    for var in parsed.variables:
+        if var.type:
+            yield var.type
+    for func in parsed.functions:
+        for param in func.params:
+            if param.type:
+                yield param.type
+        if func.returns and func.returns.type:
+            yield func.returns.type
+
+
+def _discard(mapping: Dict[str, Set[str]], name: str, key: str) -> None:
+    keys = mapping.get(name)
+    if keys is not None:
+        keys.discard(key)
+        if not keys:
+            del mapping[name]
+
+
+class SymbolIndex:
+    """Map ``class_name`` declarations and members to pages and anchors.
+
+    Scripts are added and removed one at a time; every update only touches
+    the symbols of that script, so keeping the index current costs
+    O(symbols changed) and building it from scratch O(total symbols).  The
+    index serialises to plain JSON compatible data with :meth:`to_dict`.
+
+    Pages of scripts with more than ``split_threshold`` members are split
+    (see :func:`split_page`); ``parts`` holds the subpages of those scripts
+    and links to their members point to the subpage holding the member.
+    ``pages`` maps the page of every script to its key, so subpages are
+    not named like one of them.
+    """
+
+    def __init__(self, split_threshold: int = 0) -> None:
+        self.split_threshold = split_threshold
+        self.scripts: Dict[str, ScriptSymbols] = {}
+        self.parts: Dict[str, List[PagePart]] = {}
+        self.pages: Dict[str, str] = {}
+        # class name -> keys declaring it (more than one is an error in Godot)
+        self.classes: Dict[str, Set[str]] = {}
+        # class name -> keys of the scripts extending it
+        self.children: Dict[str, Set[str]] = {}
+
+    def add(self, key: str, parsed: ParsedScript) -> None:
+        """Add or replace the symbols of script ``key``."""
+
+        self.insert(key, ScriptSymbols.from_parsed(key, parsed))
+
+    def insert(self, key: str, symbols: ScriptSymbols) -> None:
+        """Add or replace script ``key`` with already extracted ``symbols``."""
+
+        self.remove(key)
+        self.scripts[key] = symbols
+        self.pages[symbols.page] = key
+        self._split(key)
+        self._split_owner(symbols.page)
+        if symbols.class_name:
+            self.classes.setdefault(symbols.class_name, set()).add(key)
+        if symbols.extends:
+            self.children.setdefault(symbols.extends, set()).add(key)
+
+    def remove(self, key: str) -> None:
+        """Remove the symbols of script ``key`` if present."""
+
+        symbols = self.scripts.pop(key, None)
+        if symbols is None:
+            return
+        self.parts.pop(key, None)
+        self.pages.pop(symbols.page, None)
+        self._split_owner(symbols.page)
+        if symbols.class_name:
+            _discard(self.classes, symbols.class_name, key)
+        if symbols.extends:
+            _discard(self.children, symbols.extends, key)
+
+    def _split(self, key: str) -> None:
+        symbols = self.scripts[key]
+        parts = split_page(symbols.page, symbols.members, self.split_threshold, self.pages)
+        if parts:
+            self.parts[key] = parts
+        else:
+            self.parts.pop(key, None)
+
+    def _split_owner(self, page: str) -> None:
+        # a page that appeared or vanished may be the name of a subpage
+        owner = self.pages.get(split_owner(page))
+        if owner in self.parts:
+            self._split(owner)
+
+    def class_key(self, name: str) -> Optional[str]:
+        """Return the key of the script declaring ``class_name name``."""
+
+        keys = self.classes.get(name)
+        return min(keys) if keys else None
+
+    def member_page(self, key: str, kind: str, name: str) -> str:
+        """Return the page showing member ``name`` of ``kind`` of script ``key``."""
+
+        page = self.scripts[key].page
+        for part in self.parts.get(key, ()):
+            if part.holds(kind, name):
+                return posixpath.join(posixpath.dirname(page), part.url)
+        return page
+
+    def subpages(self, key: str) -> List[str]:
+        """Return the subpages of the page of ``key`` (relative to the docs root)."""
+
+        start = posixpath.dirname(self.scripts[key].page)
+        return [posixpath.join(start, part.url) for part in self.parts.get(key, ())]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.scripts
+
+    def __len__(self) -> int:
+        return len(self.scripts)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "split_threshold": self.split_threshold,
+            "scripts": {key: asdict(sym) for key, sym in sorted(self.scripts.items())},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SymbolIndex":
+        index = cls(data.get("split_threshold", 0))
+        for key, sym in data.get("scripts", {}).items():
+            index.insert(key, ScriptSymbols(**sym))
+        return index
+
+    def resolve(self, name: str) -> Optional[Tuple[str, Optional[str]]]:
+        """Return ``(page, anchor)`` for a type name such as ``Player`` or
+        ``Player.State``, or ``None`` if it is not a known script."""
+
+        head, _, member = name.partition(".")
+        key = self.class_key(head)
+        if key is None:
+            return None
+        symbols = self.scripts[key]
+        if not member:
+            return symbols.page, None
+        for kind in ("enum", "const"):
+            if member in symbols.members.get(kind, ()):
+                return self.member_page(key, kind, member), anchor(kind, member)
+        return symbols.page, None
+
+    def ancestors(self, key: str) -> List[str]:
+        """Keys of the scripts ``key`` inherits from, nearest first."""
+
+        result: List[str] = []
+        visited = {key}
+        current = self.scripts.get(key)
+        while current is not None and current.extends:
+            parent = self.class_key(current.extends)
+            if parent is None or parent in visited:
+                break
+            visited.add(parent)
+            result.append(parent)
+            current = self.scripts[parent]
+        return result
+
+    def page_links(self, key: str, parsed: ParsedScript) -> PageLinks:
+        """Resolve all cross references for the page of script ``key``."""
+
+        page = page_for(key)
+        start = posixpath.dirname(page) or "."
+
+        def url(target: str, fragment: Optional[str] = None) -> str:
+            rel = posixpath.relpath(target, start)
+            return f"{rel}#{fragment}" if fragment else rel
+
+        links = PageLinks()
+        for name in _referenced_types(parsed):
+            if name not in links.types:
+                resolved = self.resolve(name)
+                if resolved is not None:
+                    links.types[name] = url(*resolved)
+
+        symbols = self.scripts.get(key) or ScriptSymbols.from_parsed(key, parsed)
+        defined = {
+            (kind, name) for kind, names in symbols.members.items() for name in names
+        }
+        for parent in self.ancestors(key):
+            base = self.scripts[parent]
+            members: List[InheritedMember] = []
+            for kind in KINDS:
+                for name in base.members.get(kind, ()):
+                    if (kind, name) in defined:
+                        continue
+                    defined.add((kind, name))
+                    target = self.member_page(parent, kind, name)
+                    members.append((kind, name, url(target, anchor(kind, name))))
+            links.inherited.append((base.class_name or "", url(base.page), members))
+
+        if symbols.class_name and self.class_key(symbols.class_name) == key:
+            children = [self.scripts[child] for child in self.children.get(symbols.class_name, ())]
+            links.subclasses = sorted(
+                (child.class_name or posixpath.basename(child.page)[:-3], url(child.page))
+                for child in children
+            )
+
+        parts = self.parts.get(key)
+        if parts is None and key not in self.scripts:
+            parts = split_page(page, symbols.members, self.split_threshold, self.pages)
+        if parts:
+            links.parts = list(parts)
+            links.overview = posixpath.basename(page)
+        return links
@@ -0,0 +1,129 @@
+"""Polling watch mode that regenerates only the pages affected by a change."""
+
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+from .api import BuildOptions, BuildResult, build
+from .changes import Changes
+from .discovery import discover
+from .manifest import BuildManifest
+from .sinks import DirectorySink
+
+Stat = Tuple[int, int]
+
+
+class Watcher:
+    """Keep the documentation of ``source`` up to date while files change.
+
+    Changes are detected by polling file modification times and sizes, so
+    no extra dependency is needed.  Every batch of changes is handed to
+    :func:`~src.api.build` together with the manifest, which stays in
+    memory between builds as in ``gd2doc serve`` (see :mod:`src.server`):
+    only the affected pages are rendered, and index pages and
+    ``mkdocs.yml`` are written only when their content changes.  With
+    ``why`` the reason is printed for every page.
+
+    ``source`` may also be a single script; then only that file is watched.
+    """
+
+    def __init__(
+        self,
+        source: Path,
+        output_dir: Path,
+        options: Optional[BuildOptions] = None,
+        echo: Callable[[str], None] = print,
+        why: bool = False,
+    ) -> None:
+        self.source = Path(source)
+        self.base = self.source if self.source.is_dir() else self.source.parent
+        self.output_dir = Path(output_dir)
+        self.options = options or BuildOptions()
+        self.echo = echo
+        self.why = why
+        self.manifest = BuildManifest.load(
+            self.output_dir,
+            fingerprint=self.options.fingerprint(),
+            source=str(self.base.resolve()),
+        )
+        self.stats = self._scan()
+
+    def _scan(self) -> Dict[str, Stat]:
+        stats: Dict[str, Stat] = {}
+        options = self.options
+        files = discover(
+            self.source,
+            options.recursive,
+            exclude=options.exclude,
+            use_gitignore=options.use_gitignore,
+        )
+        for path in files:
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            stats[path.relative_to(self.base).as_posix()] = (st.st_mtime_ns, st.st_size)
+        return stats
+
+    def poll(self) -> Changes:
+        """Return the changes since the previous poll."""
+
+        current = self._scan()
+        changes = Changes(
+            created=sorted(k for k in current if k not in self.stats),
+            modified=sorted(
+                k for k, st in current.items() if k in self.stats and self.stats[k] != st
+            ),
+            deleted=sorted(k for k in self.stats if k not in current),
+        )
+        self.stats = current
+        return changes
+
+    def apply(self, changes: Changes) -> BuildResult:
+        """Regenerate the output for ``changes`` and save the manifest."""
+
+        options = self.options
+        with DirectorySink(
+            self.output_dir, options.project_root, io_workers=options.io_workers
+        ) as sink:
+            result = build(
+                self.source,
+                options,
+                sink,
+                echo=self.echo,
+                changes=changes,
+                manifest=self.manifest,
+                why=self.why,
+            )
+        self.manifest.save(self.output_dir)
+        return result
+
+    def run(
+        self,
+        interval: float = 1.0,
+        debounce: float = 0.3,
+        max_cycles: Optional[int] = None,
+    ) -> None:
+        """Poll every ``interval`` seconds until interrupted.
+
+        Once a change is seen, polling continues every ``debounce`` seconds
+        until a poll finds nothing new, so a burst of events (e.g. an editor
+        saving several files) is handled as one update.
+        """
+
+        cycles = 0
+        while max_cycles is None or cycles < max_cycles:
+            cycles += 1
+            changes = self.poll()
+            if not changes:
+                time.sleep(interval)
+                continue
+            while True:
+                time.sleep(debounce)
+                more = self.poll()
+                if not more:
+                    break
+                changes.merge(more)
+            self.apply(changes)
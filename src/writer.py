@@ -0,0 +1,142 @@
+"""Output layer that skips unchanged files and replaces files atomically."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from .fileio import IOPool
+
+
+def _read_umask() -> int:
+    # the umask can only be read by setting it; done once at import, before
+    # any I/O thread exists that could create a file while it is 0
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+#: Mode a regular ``open()`` gives a new file.
+_FILE_MODE = 0o666 & ~_read_umask()
+
+
+class FileWriter:
+    """Write generated files and count what happened to them.
+
+    :meth:`write` leaves a file untouched when its content is already what
+    would be written (sizes are compared first, the bytes only if the sizes
+    match), so modification times only change for files that really
+    changed.  Files that are written are replaced atomically through a
+    temporary file in the same directory.
+
+    :meth:`submit` queues a write instead; queued writes are carried out by
+    ``pool`` (see :class:`~src.fileio.IOPool`) whenever ``batch_size`` of
+    them are waiting and on :meth:`flush`.  Directories are created once per
+    writer, before a batch starts.
+    """
+
+    def __init__(self, pool: Optional[IOPool] = None, batch_size: int = 64) -> None:
+        self.written = 0
+        self.skipped = 0
+        self.deleted = 0
+        self.pool = pool
+        self.batch_size = batch_size
+        self._directories: set = set()
+        self._batch: List[Tuple[Path, bytes]] = []
+
+    def write(self, path: Path, content: str) -> bool:
+        """Write ``content`` to ``path`` and return ``True`` if it changed."""
+
+        data = content.encode("utf-8")
+        self._mkdir(path.parent)
+        changed = self._store((path, data))
+        self.record(changed)
+        return changed
+
+    def submit(self, path: Path, content: str) -> None:
+        """Queue writing ``content`` to ``path``; counted when flushed."""
+
+        self._batch.append((path, content.encode("utf-8")))
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Carry out the queued writes."""
+
+        batch, self._batch = self._batch, []
+        for path, _ in batch:
+            self._mkdir(path.parent)
+        if self.pool is None:
+            results = map(self._store, batch)
+        else:
+            results = self.pool.map(self._store, batch, depth=len(batch))
+        for changed in results:
+            self.record(changed)
+
+    def _mkdir(self, parent: Path) -> None:
+        if parent not in self._directories:
+            parent.mkdir(parents=True, exist_ok=True)
+            self._directories.add(parent)
+
+    @staticmethod
+    def _store(item: Tuple[Path, bytes]) -> bool:
+        """Write ``item[1]`` to ``item[0]`` unless it is already there.
+        Does not count, so it can run on a pool thread."""
+
+        path, data = item
+        try:
+            if path.stat().st_size == len(data) and path.read_bytes() == data:
+                return False
+        except OSError:
+            pass
+
+        import tempfile  # only needed once something changed
+
+        parent = path.parent
+
+        prefix = f".{path.name}."
+        try:
+            fd, tmp = tempfile.mkstemp(dir=parent, prefix=prefix, suffix=".tmp")
+        except FileNotFoundError:
+            # the directory was removed since it was first created
+            parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=parent, prefix=prefix, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.chmod(tmp, _FILE_MODE)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+        return True
+
+    def record(self, changed: bool) -> None:
+        """Count a write done by another writer, e.g. in a worker process."""
+
+        if changed:
+            self.written += 1
+        else:
+            self.skipped += 1
+
+    def skip(self, count: int = 1) -> None:
+        """Record ``count`` files that were up to date without being rendered."""
+
+        self.skipped += count
+
+    def remove(self, path: Path) -> bool:
+        """Delete ``path`` if it exists and return ``True`` if it did."""
+
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            return False
+        self.deleted += 1
+        return True
+
+    def summary(self) -> str:
+        return f"{self.written} written, {self.skipped} unchanged, {self.deleted} deleted"
@@ -0,0 +1,8 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _cache_dir(monkeypatch):
+    # a cache configured by the user would let runs see entries left by
+    # earlier ones; tests that cache pass --cache-dir themselves
+    monkeypatch.delenv("GD2DOC_CACHE_DIR", raising=False)
@@ -0,0 +1,23 @@
+# Script with declarations spanning several lines.
+extends Node
+
+# Long signature
+func configure(
+    speed: float,
+    label: String = "a#b",  # trailing comment
+) -> void:
+    var local = 1
+    pass
+
+# Multi-line enum
+enum Direction {
+    UP,
+    DOWN = 4,
+}
+
+# Exported speed
+@export var speed: float = 1.0
+
+# Helper
+static func helper(value) -> int:
+    return value
@@ -0,0 +1,138 @@
+from pathlib import Path
+import sys
+import tarfile
+import zipfile
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from click.testing import CliRunner
+
+from src.api import BuildOptions, build, iter_build
+from src.changes import Changes
+from src.cli import main
+from src.sinks import ArchiveSink, CallbackSink, DirectorySink
+
+DATA = Path(__file__).parent / "data"
+
+
+def _source(tmp_path):
+    source = tmp_path / "src"
+    (source / "sub").mkdir(parents=True)
+    (source / "basic.gd").write_bytes((DATA / "basic.gd").read_bytes())
+    (source / "sub" / "multiline.gd").write_bytes((DATA / "multiline.gd").read_bytes())
+    return source
+
+
+def test_build_in_memory_matches_cli(tmp_path):
+    source = _source(tmp_path)
+    output = tmp_path / "docs"
+    args = [str(source), "-o", str(output), "-r", "--project-root", str(tmp_path)]
+    assert CliRunner().invoke(main, args).exit_code == 0
+
+    options = BuildOptions(recursive=True, output_dir=Path("docs"), project_root=tmp_path)
+    result = build(source, options)
+    assert sorted(result.pages) == ["basic.md", "sub/multiline.md"]
+    assert sorted(result.indexes) == ["index.md", "sub/index.md"]
+    assert result.mkdocs_yml == (tmp_path / "mkdocs.yml").read_text(encoding="utf-8")
+    for path, content in result.files.items():
+        if path != "mkdocs.yml":
+            assert (output / path).read_text(encoding="utf-8") == content
+
+
+def test_streaming_and_archive_sinks(tmp_path):
+    source = _source(tmp_path)
+    options = BuildOptions(recursive=True)
+    expected = build(source, options).files
+
+    streamed = dict(iter_build(source, options))
+    assert streamed == expected
+
+    received = []
+    build(source, options, CallbackSink(lambda path, content: received.append(path)))
+    assert sorted(received) == sorted(expected)
+
+    with ArchiveSink(tmp_path / "site.zip") as sink:
+        build(source, options, sink)
+    with zipfile.ZipFile(tmp_path / "site.zip") as archive:
+        assert archive.read("docs/basic.md").decode("utf-8") == expected["basic.md"]
+        assert "mkdocs.yml" in archive.namelist()
+
+    with ArchiveSink(tmp_path / "site.tar.gz") as sink:
+        build(source, options, sink)
+    with tarfile.open(tmp_path / "site.tar.gz") as archive:
+        member = archive.extractfile("docs/sub/index.md")
+        assert member.read().decode("utf-8") == expected["sub/index.md"]
+
+
+def test_directory_sink_is_incremental(tmp_path):
+    source = _source(tmp_path)
+    sink = DirectorySink(tmp_path / "docs", tmp_path)
+    options = BuildOptions(recursive=True, project_root=tmp_path)
+    first = build(source, options, sink)
+    assert first.generated == ["basic.md", "sub/multiline.md"]
+    assert first.files == {}
+
+    (source / "sub" / "multiline.gd").unlink()
+    second = build(source, options, DirectorySink(tmp_path / "docs", tmp_path))
+    assert second.generated == []
+    assert second.removed == ["sub/multiline.md"]
+    assert not (tmp_path / "docs" / "sub").exists()
+
+
+def test_split_pages_follow_the_script(tmp_path):
+    source = tmp_path / "src"
+    source.mkdir()
+    gd = source / "big.gd"
+    gd.write_text("var a = 1\nvar b = 2\nfunc f():\n    pass\n", encoding="utf-8")
+    docs = tmp_path / "docs"
+    options = BuildOptions(split_threshold=2, project_root=tmp_path)
+
+    first = build(source, options, DirectorySink(docs, tmp_path))
+    assert first.generated == ["big.md", "big.variables.md", "big.functions.md"]
+    assert "(big.functions.md)" in (docs / "index.md").read_text(encoding="utf-8")
+
+    # an untouched split page is up to date, an edited subpage is restored
+    assert build(source, options, DirectorySink(docs, tmp_path)).generated == []
+    (docs / "big.variables.md").write_text("edited", encoding="utf-8")
+    assert build(source, options, DirectorySink(docs, tmp_path)).generated[1] == "big.variables.md"
+
+    # below the threshold the subpages go away, with their entries in the
+    # index and nav, also when only the changed file is looked at
+    gd.write_text("var a = 1\n", encoding="utf-8")
+    changes = Changes(modified=["big.gd"])
+    second = build(source, options, DirectorySink(docs, tmp_path), changes=changes)
+    assert second.generated == ["big.md"]
+    assert second.removed == ["big.functions.md", "big.variables.md"]
+    assert sorted(p.name for p in docs.glob("*.md")) == ["big.md", "index.md"]
+    assert "variables" not in (docs / "index.md").read_text(encoding="utf-8")
+    assert "variables" not in (tmp_path / "mkdocs.yml").read_text(encoding="utf-8")
+
+
+def test_split_pages_make_way_for_scripts(tmp_path):
+    source = tmp_path / "src"
+    source.mkdir()
+    (source / "big.gd").write_text("var a = 1\nvar b = 2\nfunc f():\n    pass\n", encoding="utf-8")
+    docs = tmp_path / "docs"
+    options = BuildOptions(split_threshold=2, project_root=tmp_path)
+    build(source, options, DirectorySink(docs, tmp_path))
+
+    # a new script whose page is named like a subpage gets that name, the
+    # subpage is numbered
+    clash = source / "big.functions.gd"
+    clash.write_text("# Not a subpage\n", encoding="utf-8")
+    changes = Changes(created=["big.functions.gd"])
+    result = build(source, options, DirectorySink(docs, tmp_path), changes=changes)
+    assert sorted(result.generated) == [
+        "big.functions-2.md", "big.functions.md", "big.md", "big.variables.md"
+    ]
+    assert result.removed == []
+    assert "Not a subpage" in (docs / "big.functions.md").read_text(encoding="utf-8")
+    assert "(big.functions-2.md)" in (docs / "big.md").read_text(encoding="utf-8")
+    assert build(source, options, DirectorySink(docs, tmp_path)).generated == []
+
+    clash.unlink()
+    result = build(source, options, DirectorySink(docs, tmp_path))
+    assert "big.functions-2.md" in result.removed
+    assert "big.functions.md" in result.generated
+    assert "## Funktionen" in (docs / "big.functions.md").read_text(encoding="utf-8")
+    assert not (docs / "big.functions-2.md").exists()
@@ -120,3 +120,157 @@ def test_cli_creates_mkdocs(tmp_path):
         assert mkdocs_file.exists()
         content = mkdocs_file.read_text(encoding="utf-8")
         assert "Codebase" in content
+
+
+def test_cli_incremental_build(tmp_path):
+    source = tmp_path / "src"
+    output = tmp_path / "docs"
+    sub = source / "sub"
+    sub.mkdir(parents=True)
+
+    data_file = Path(__file__).parent / "data" / "basic.gd"
+    nested_file = Path(__file__).parent / "data" / "sub" / "nested.gd"
+    (source / "basic.gd").write_text(data_file.read_text(), encoding="utf-8")
+    (sub / "nested.gd").write_text(nested_file.read_text(), encoding="utf-8")
+
+    runner = CliRunner()
+    args = [str(source), "-o", str(output), "-r", "--project-root", str(tmp_path)]
+    result = runner.invoke(main, args)
+    assert result.exit_code == 0
+    assert "Generated basic.md" in result.output
+
+    # nothing changed: both pages are skipped and the manifest is not rewritten
+    manifest = output / ".gd2doc-manifest.json"
+    saved = manifest.stat().st_mtime_ns
+    result = runner.invoke(main, args)
+    assert result.exit_code == 0
+    assert "Generated" not in result.output
+    assert "0 written, 5 unchanged, 0 deleted" in result.output
+    assert manifest.stat().st_mtime_ns == saved
+
+    # a modified script is regenerated, a removed one loses its page
+    (source / "basic.gd").write_text(
+        data_file.read_text() + "\nfunc extra():\n    pass\n", encoding="utf-8"
+    )
+    (sub / "nested.gd").unlink()
+    result = runner.invoke(main, args)
+    assert result.exit_code == 0
+    assert "Generated basic.md" in result.output
+    # page, root index and mkdocs.yml change; nested page and sub index go away
+    assert "3 written, 0 unchanged, 2 deleted" in result.output
+    assert "extra" in (output / "basic.md").read_text(encoding="utf-8")
+    assert not (output / "sub" / "nested.md").exists()
+    assert not (output / "sub").exists()
+    assert "sub/index.md" not in (output / "index.md").read_text(encoding="utf-8")
+
+
+def test_cli_single_file_keeps_other_pages(tmp_path):
+    source = tmp_path / "src"
+    source.mkdir()
+    output = tmp_path / "docs"
+    data = Path(__file__).parent / "data"
+    for name in ("basic.gd", "advanced.gd"):
+        (source / name).write_text((data / name).read_text(), encoding="utf-8")
+    root = ["--project-root", str(tmp_path)]
+    assert CliRunner().invoke(main, [str(source), "-o", str(output), *root]).exit_code == 0
+
+    (source / "basic.gd").write_text(
+        (data / "basic.gd").read_text() + "\nfunc extra():\n    pass\n", encoding="utf-8"
+    )
+    result = CliRunner().invoke(main, [str(source / "basic.gd"), "-o", str(output), *root])
+    assert result.exit_code == 0
+    assert "Generated basic.md" in result.output
+    assert "Removed" not in result.output
+    assert (output / "advanced.md").exists()
+    assert "advanced.md" in (output / "index.md").read_text(encoding="utf-8")
+    assert "advanced.md" in (tmp_path / "mkdocs.yml").read_text(encoding="utf-8")
+
+    # the directory build afterwards has nothing left to do
+    result = CliRunner().invoke(main, [str(source), "-o", str(output), *root])
+    assert "Generated" not in result.output
+    assert "Removed" not in result.output
+
+
+def test_cli_jobs_output_matches_serial(tmp_path):
+    source = tmp_path / "src"
+    sub = source / "sub"
+    sub.mkdir(parents=True)
+
+    data_dir = Path(__file__).parent / "data"
+    for name in ("basic.gd", "advanced.gd", "double_hash.gd"):
+        (source / name).write_text((data_dir / name).read_text(), encoding="utf-8")
+    (sub / "nested.gd").write_text(
+        (data_dir / "sub" / "nested.gd").read_text(), encoding="utf-8"
+    )
+
+    runner = CliRunner()
+    outputs = {}
+    for jobs in ("1", "3"):
+        out = tmp_path / f"out{jobs}"
+        root = tmp_path / f"root{jobs}"
+        root.mkdir()
+        result = runner.invoke(
+            main, [str(source), "-o", str(out), "-r", "-j", jobs, "--project-root", str(root)]
+        )
+        assert result.exit_code == 0
+        outputs[jobs] = {
+            p.relative_to(out): p.read_bytes() for p in out.rglob("*.md")
+        }
+
+    assert outputs["1"] == outputs["3"]
+    assert len(outputs["1"]) == 6
+
+
+def test_cli_parse_limits(tmp_path):
+    source = tmp_path / "src"
+    source.mkdir()
+    params = ", ".join(f"p{i}" for i in range(200))
+    (source / "wide.gd").write_text(f"extends Node\nfunc f({params}):\n\tpass\n", encoding="utf-8")
+    output = tmp_path / "docs"
+
+    runner = CliRunner()
+    args = [str(source), "-o", str(output), "--project-root", str(tmp_path)]
+    result = runner.invoke(main, args + ["--max-line-length", "64", "--cache-dir", str(tmp_path / "c")])
+    assert result.exit_code == 0
+    assert "Warning: wide.gd: line 2 is longer than 64 bytes and was cut" in result.output
+    assert "### `f(p0, p1," in (output / "wide.md").read_text(encoding="utf-8")
+    # cut results are not cached
+    assert not [p for p in (tmp_path / "c" / "parse").rglob("*") if p.is_file()]
+
+
+def test_cli_without_scripts_writes_nothing(tmp_path):
+    source = tmp_path / "src"
+    source.mkdir()
+    output = tmp_path / "docs"
+    args = [str(source), "-o", str(output), "--project-root", str(tmp_path)]
+    result = CliRunner().invoke(main, args)
+    assert result.exit_code == 0
+    assert "No .gd files found." in result.output
+    assert not output.exists()
+    assert not (tmp_path / "mkdocs.yml").exists()
+
+    # once the last script is gone its page is still removed
+    (source / "a.gd").write_text("# A\n", encoding="utf-8")
+    assert CliRunner().invoke(main, args).exit_code == 0
+    (source / "a.gd").unlink()
+    result = CliRunner().invoke(main, args)
+    assert "Removed a.md" in result.output
+    assert "1 deleted" in result.output
+    assert not (output / "a.md").exists()
+
+
+def test_cli_caches_only_when_asked(tmp_path, monkeypatch):
+    source = tmp_path / "src"
+    source.mkdir()
+    (source / "a.gd").write_text("# A\n", encoding="utf-8")
+    home = tmp_path / "home"
+    monkeypatch.setenv("HOME", str(home))
+    monkeypatch.setenv("XDG_CACHE_HOME", str(home / ".cache"))
+    args = [str(source), "-o", str(tmp_path / "docs"), "--project-root", str(tmp_path)]
+    assert CliRunner().invoke(main, args).exit_code == 0
+    assert not home.exists()
+
+    cache = tmp_path / "cache"
+    monkeypatch.setenv("GD2DOC_CACHE_DIR", str(cache))
+    assert CliRunner().invoke(main, args + ["--clean"]).exit_code == 0
+    assert list((cache / "parse").iterdir())
@@ -0,0 +1,21 @@
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.corpus import CorpusShape, generate_script, write_corpus
+from src import parser
+
+
+def test_corpus_is_deterministic_and_parseable(tmp_path):
+    shape = CorpusShape(files=6, functions=4, nesting_depth=2, files_per_dir=2)
+    assert generate_script(3, shape) == generate_script(3, shape)
+
+    paths = write_corpus(tmp_path, shape)
+    assert len(paths) == 6
+    assert all(len(p.relative_to(tmp_path).parts) == 3 for p in paths)
+
+    result = parser.parse_gdscript(str(paths[0]))
+    assert result["script"]["class_name"] == "Synthetic0"
+    assert len(result["functions"]) == 4
+    assert len(result["enums"]) == 1
@@ -0,0 +1,106 @@
+from pathlib import Path
+import json
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from click.testing import CliRunner
+
+from src.cli import main
+from src.deps import DependencyGraph, explain, res_prefix, resolve_path
+from src.manifest import MANIFEST_NAME
+from src.parser import Reference, parse_gdscript
+from src.symbols import SymbolIndex
+
+SCRIPTS = {
+    "a.gd": "class_name A\nextends Node\nenum State { IDLE }\nvar hp: int = 1\n",
+    "sub/b.gd": "class_name B\nextends A\n",
+    "c.gd": "class_name C\nextends B\n",
+    "e.gd": 'extends "res://game/sub/b.gd"\n',
+    "d.gd": "extends C\nclass_name D\nvar a: A\n",
+    "x.gd": "var s: A.State\n",
+    "y.gd": 'const Scene = preload("sub/b.gd")\nvar other = load("res://game/z.gd")\n',
+    "z.gd": "var q: int\n",
+}
+
+
+def _write(root):
+    (root / "project.godot").write_text("")
+    base = root / "game"
+    for key, text in SCRIPTS.items():
+        path = base / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+    return base
+
+
+def test_references_and_graph(tmp_path):
+    base = _write(tmp_path)
+    parsed = {key: parse_gdscript(str(base / key)) for key in SCRIPTS}
+    assert parsed["y.gd"].references == [
+        Reference("preload", "sub/b.gd"),
+        Reference("load", "res://game/z.gd"),
+    ]
+    assert parsed["e.gd"].references == [Reference("extends", "res://game/sub/b.gd")]
+    assert Reference("type", "A.State") in parsed["x.gd"].references
+
+    prefix = res_prefix(base)
+    assert prefix == "game"
+    assert resolve_path("res://game/z.gd", "y.gd", prefix) == "z.gd"
+    assert resolve_path("res://other/z.gd", "y.gd", prefix) is None
+    assert resolve_path("../a.gd", "sub/b.gd") == "a.gd"
+
+    symbols = SymbolIndex()
+    for key, data in parsed.items():
+        symbols.add(key, data)
+    graph = DependencyGraph.build(symbols, prefix)
+    assert graph.edges["sub/b.gd"] == {"a.gd": "extends", "c.gd": "subclass"}
+    assert graph.edges["a.gd"] == {"sub/b.gd": "subclass"}
+    assert graph.edges["d.gd"] == {"c.gd": "extends", "a.gd": "type"}
+    assert graph.edges["e.gd"] == {"sub/b.gd": "extends"}
+    assert graph.edges["y.gd"] == {"sub/b.gd": "preload", "z.gd": "load"}
+
+    # d.gd refers to A and also inherits from it through c.gd
+    reasons = graph.affected(["a.gd"])
+    assert set(reasons) == {"sub/b.gd", "c.gd", "d.gd", "e.gd", "x.gd"}
+    assert reasons["d.gd"] == ("extends", "c.gd")
+    roots = {"a.gd": "changed"}
+    assert explain("c.gd", reasons, roots) == "extends sub/b.gd, which extends a.gd, which changed"
+    assert explain("x.gd", reasons, roots) == "refers to a.gd, which changed"
+    assert explain("a.gd", reasons, roots) == "a.gd changed"
+
+    # the base lists b.gd as a subclass, the pages below it inherit from it
+    assert set(graph.affected(["sub/b.gd"])) == {"a.gd", "c.gd", "d.gd", "e.gd", "y.gd"}
+    assert set(graph.affected(["z.gd"])) == {"y.gd"}
+
+
+def test_cli_rebuilds_dependents_and_explains(tmp_path):
+    base = _write(tmp_path)
+    docs = tmp_path / "docs"
+    args = [str(base), "-r", "-o", str(docs), "--project-root", str(tmp_path), "--why"]
+    result = CliRunner().invoke(main, args)
+    assert "Generated a.md: a.gd is new" in result.output
+    manifest = json.loads((docs / MANIFEST_NAME).read_text(encoding="utf-8"))
+    assert manifest["graph"]["c.gd"] == {"sub/b.gd": "extends", "d.gd": "subclass"}
+
+    # a new member is listed on every page inheriting from a.gd; pages that
+    # only link to it (x.md) keep their content and are not rendered
+    with open(base / "a.gd", "a", encoding="utf-8") as f:
+        f.write("var mana: int = 2\n")
+    result = CliRunner().invoke(main, args)
+    assert result.output.splitlines() == [
+        "Generated a.md: a.gd changed",
+        "Generated c.md: extends sub/b.gd, which extends a.gd, which changed",
+        "Generated d.md: extends c.gd, which extends sub/b.gd, which extends a.gd, which changed",
+        "Generated sub/b.md: extends a.gd, which changed",
+        "Files: 4 written, 7 unchanged, 0 deleted",
+    ]
+    assert "[`mana`](a.md#var-mana)" in (docs / "d.md").read_text(encoding="utf-8")
+
+    # pages listing or linking a deleted script lose the link
+    (base / "c.gd").unlink()
+    result = CliRunner().invoke(main, args)
+    assert "Removed c.md" in result.output
+    assert "Generated d.md: extends c.gd, which was deleted" in result.output
+    assert "Generated sub/b.md: lists subclass c.gd, which was deleted" in result.output
+    assert "z.md" not in result.output
@@ -0,0 +1,79 @@
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.discovery import discover, is_discoverable, parse_rule
+
+
+def _touch(path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("", encoding="utf-8")
+
+
+def _rel(root, paths):
+    return [p.relative_to(root).as_posix() for p in paths]
+
+
+def test_discover_prunes_ignored_directories(tmp_path):
+    for rel in (
+        "main.gd",
+        "b/enemy.gd",
+        "a/player.gd",
+        "a/notes.txt",
+        ".godot/cache.gd",
+        ".import/x.gd",
+        "vendored/lib.gd",
+        "addons/plugin/tool.gd",
+        "generated/out.gd",
+        "generated/keep.gd",
+        "build/tmp.gd",
+    ):
+        _touch(tmp_path / rel)
+    _touch(tmp_path / "vendored" / ".gdignore")
+    (tmp_path / ".gitignore").write_text(
+        "# comment\nbuild/\ngenerated/*.gd\n!generated/keep.gd\n", encoding="utf-8"
+    )
+
+    found = _rel(tmp_path, discover(tmp_path, exclude=["addons"]))
+    assert found == ["main.gd", "a/player.gd", "b/enemy.gd", "generated/keep.gd"]
+    listed = ["main.gd", "a/player.gd", "vendored/lib.gd", "addons/plugin/tool.gd",
+              "generated/out.gd", "generated/keep.gd", "build/tmp.gd"]
+    assert [
+        rel for rel in listed
+        if is_discoverable(tmp_path, rel, exclude=["addons"], use_gitignore=True)
+    ] == ["main.gd", "a/player.gd", "generated/keep.gd"]
+    assert is_discoverable(tmp_path, "build/tmp.gd")
+
+    assert _rel(tmp_path, discover(tmp_path, recursive=False)) == ["main.gd"]
+    assert "build/tmp.gd" in _rel(tmp_path, discover(tmp_path, use_gitignore=False))
+
+
+def test_discover_is_lazy(tmp_path):
+    _touch(tmp_path / "a.gd")
+    files = discover(tmp_path)
+    _touch(tmp_path / "sub" / "b.gd")
+    # the walk has not started yet, so the new file is still found
+    assert _rel(tmp_path, files) == ["a.gd", "sub/b.gd"]
+
+
+def test_discover_follows_symlinks_once(tmp_path):
+    _touch(tmp_path / "src" / "a" / "x.gd")
+    _touch(tmp_path / "shared" / "lib.gd")
+    (tmp_path / "src" / "a" / "loop").symlink_to("..", target_is_directory=True)
+    (tmp_path / "src" / "shared").symlink_to(tmp_path / "shared", target_is_directory=True)
+    assert _rel(tmp_path / "src", discover(tmp_path / "src")) == ["a/x.gd", "shared/lib.gd"]
+
+
+def test_parse_rule_globs():
+    rule = parse_rule("docs/**/*.gd")
+    assert rule.anchored
+    assert rule.matches("docs/a/b/c.gd", "c.gd", False)
+    assert rule.matches("docs/c.gd", "c.gd", False)
+    assert not rule.matches("src/docs/c.gd", "c.gd", False)
+
+    rule = parse_rule("*_test.gd")
+    assert not rule.anchored
+    assert rule.matches("any/where/x_test.gd", "x_test.gd", False)
+    assert parse_rule("# comment") is None
+    assert parse_rule("tmp/").dir_only
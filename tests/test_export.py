@@ -0,0 +1,57 @@
+from pathlib import Path
+import json
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from click.testing import CliRunner
+
+from src.cli import main
+from src.export import SCHEMA_VERSION
+from src.parser import ParsedScript, parse_gdscript
+
+DATA = Path(__file__).parent / "data"
+
+
+def _source(tmp_path):
+    source = tmp_path / "src"
+    (source / "sub").mkdir(parents=True)
+    (source / "basic.gd").write_bytes((DATA / "basic.gd").read_bytes())
+    (source / "sub" / "multiline.gd").write_bytes((DATA / "multiline.gd").read_bytes())
+    return source
+
+
+def test_export_jsonl_and_index(tmp_path):
+    source = _source(tmp_path)
+    records, index = tmp_path / "model.jsonl", tmp_path / "index.json"
+    args = [str(source), "-r", "--export", str(records), "--export-index", str(index)]
+
+    result = CliRunner().invoke(main, args)
+    assert result.exit_code == 0, result.output
+    assert not (tmp_path / "docs").exists()
+
+    lines = [json.loads(line) for line in records.read_text(encoding="utf-8").splitlines()]
+    assert [r["path"] for r in lines] == ["basic.gd", "sub/multiline.gd"]
+    assert all(r["schema_version"] == SCHEMA_VERSION for r in lines)
+    record = dict(lines[0])
+    del record["schema_version"], record["path"]
+    assert ParsedScript.from_dict(record) == parse_gdscript(str(source / "basic.gd"))
+
+    summary = json.loads(index.read_text(encoding="utf-8"))
+    assert summary["schema_version"] == SCHEMA_VERSION
+    assert [s["path"] for s in summary["scripts"]] == ["basic.gd", "sub/multiline.gd"]
+    assert "func" in summary["scripts"][0]["members"]
+
+
+def test_export_to_stdout(tmp_path):
+    source = _source(tmp_path)
+    result = CliRunner().invoke(main, [str(source), "--export", "-"])
+    assert result.exit_code == 0
+    (line,) = result.stdout.splitlines()
+    assert json.loads(line)["path"] == "basic.gd"
+
+
+def test_output_dir_required_without_export(tmp_path):
+    result = CliRunner().invoke(main, [str(_source(tmp_path))])
+    assert result.exit_code != 0
+    assert "--output-dir" in result.output
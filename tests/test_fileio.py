@@ -0,0 +1,90 @@
+from pathlib import Path
+import sys
+import threading
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pytest
+from click.testing import CliRunner
+
+from src.cli import main
+from src.fileio import IOPool
+from src.writer import FileWriter
+
+DATA = Path(__file__).parent / "data"
+
+
+def test_map_keeps_order_and_bounds_read_ahead():
+    running = []
+    consumed = []
+
+    def slow(item):
+        running.append(item)
+        time.sleep(0.002 * (5 - item % 5))
+        return item * 2
+
+    with IOPool(4) as pool:
+        for result in pool.map(slow, range(20), depth=3):
+            consumed.append(result)
+            # never more than ``depth`` items ahead of the consumer
+            assert len(running) <= len(consumed) + 3
+    assert consumed == [i * 2 for i in range(20)]
+
+
+def test_map_raises_in_order():
+    def check(item):
+        if item == 2:
+            raise OSError("unreadable")
+        return item
+
+    results = []
+    with IOPool(3) as pool, pytest.raises(OSError):
+        for item in pool.map(check, range(5)):
+            results.append(item)
+    assert results == [0, 1]
+
+
+def test_single_worker_runs_inline():
+    with IOPool(1) as pool:
+        assert pool.submit(threading.get_ident).result() == threading.get_ident()
+
+
+def test_batched_writes(tmp_path):
+    writer = FileWriter(IOPool(4), batch_size=8)
+    paths = [tmp_path / f"d{i % 3}" / f"{i}.md" for i in range(20)]
+    for path in paths:
+        writer.submit(path, path.name)
+    assert writer.written == 16  # two full batches
+    writer.flush()
+    assert writer.written == 20
+    assert all(path.read_text() == path.name for path in paths)
+
+    for path in paths:
+        writer.submit(path, "new" if path.name == "3.md" else path.name)
+    writer.flush()
+    assert (writer.written, writer.skipped) == (21, 19)
+    writer.pool.close()
+
+
+def test_io_workers_do_not_change_output(tmp_path):
+    source = tmp_path / "src"
+    for i in range(12):
+        (source / f"d{i % 4}").mkdir(parents=True, exist_ok=True)
+        (source / f"d{i % 4}" / f"s{i}.gd").write_bytes((DATA / "basic.gd").read_bytes())
+    outputs = []
+    for workers in (1, 8):
+        root = tmp_path / f"run{workers}" / "site"
+        args = [str(source), "-r", "-o", str(root / "docs"), "--project-root", str(root)]
+        result = CliRunner().invoke(main, args + ["--io-workers", str(workers)])
+        assert result.exit_code == 0, result.output
+        outputs.append(result.output)
+        files = {
+            p.relative_to(root).as_posix(): p.read_bytes()
+            for p in root.rglob("*")
+            if p.is_file() and p.name != ".gd2doc-manifest.json"
+        }
+        if workers == 1:
+            expected = files
+    assert files == expected
+    assert outputs[0] == outputs[1]
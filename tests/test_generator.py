@@ -4,6 +4,11 @@ import sys
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
 from src import generator, parser
+from src.api import BuildOptions, build
+from src.native import NativeRenderer
+from src.symbols import PageLinks
+
+DATA = Path(__file__).parent / "data"
 
 
 def test_generate_markdown(tmp_path):
@@ -17,3 +22,138 @@ def test_generate_markdown(tmp_path):
     content = output.read_text(encoding="utf-8")
     assert "# basic" in content
 
+
+
+def test_renderer_is_shared_and_picklable(tmp_path):
+    import pickle
+
+    cache = tmp_path / "cache"
+    renderer = generator.get_renderer(bytecode_cache_dir=str(cache))
+    assert generator.get_renderer(bytecode_cache_dir=str(cache)) is renderer
+    assert pickle.loads(pickle.dumps(renderer)) is renderer
+
+    gd_path = Path(__file__).parent / "data" / "advanced.gd"
+    parsed = parser.parse_gdscript(str(gd_path))
+    content = renderer.render(parsed)
+    assert content == generator.generate_markdown(parsed, str(tmp_path / "a.md"))
+    assert "`JUMP` | 3" in content
+
+    # the compiled template was stored in the bytecode cache
+    assert list(cache.iterdir())
+
+
+def test_build_tree_and_indexes(tmp_path):
+    base = Path("/project")
+    files = [base / "top.gd", base / "a" / "b" / "deep.gd", base / "a" / "x.gd"]
+    tree = generator.build_tree(p.relative_to(base) for p in files)
+
+    assert tree.scripts == ["top.md"]
+    assert list(tree.children) == ["a"]
+    a = tree.children["a"]
+    assert a.scripts == ["x.md"]
+    assert a.children["b"].path == Path("a/b")
+    assert [n.path for n in tree.walk()] == [Path("."), Path("a"), Path("a/b")]
+
+    assert generator.generate_indexes(files, base, tmp_path, tree=tree) is tree
+    assert (tmp_path / "index.md").read_text(encoding="utf-8") == (
+        "# Index\n## Ordner\n- [a](a/index.md)\n## Skripte\n- [top](top.md)\n"
+    )
+    assert (tmp_path / "a" / "index.md").read_text(encoding="utf-8") == (
+        "# a\n## Ordner\n- [b](b/index.md)\n## Skripte\n- [x](x.md)\n"
+    )
+
+
+def test_mkdocs_nav_from_tree_matches_walk(tmp_path):
+    base = Path("/project")
+    files = [base / "top.gd", base / "a" / "b" / "deep.gd", base / "a" / "x.gd"]
+    docs = tmp_path / "docs"
+    tree = generator.generate_indexes(files, base, docs)
+    for rel in ("top.md", "a/b/deep.md", "a/x.md"):
+        (docs / rel).write_text("page", encoding="utf-8")
+
+    generator.generate_mkdocs_yml(tmp_path, docs)
+    walked = (tmp_path / "mkdocs.yml").read_text(encoding="utf-8")
+
+    # stale pages on disk are not part of the nav built from the tree
+    (docs / "stale.md").write_text("old", encoding="utf-8")
+    generator.generate_mkdocs_yml(tmp_path, docs, tree=tree)
+    assert (tmp_path / "mkdocs.yml").read_text(encoding="utf-8") == walked
+    assert "- Overview: a/b/index.md" in walked
+    assert "stale" not in walked
+
+
+def test_native_renderer_matches_template(tmp_path):
+    source = tmp_path / "src"
+    for path in DATA.rglob("*.gd"):
+        target = source / path.relative_to(DATA)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(path.read_bytes())
+    (source / "child.gd").write_text(
+        "# Child.\nextends Example\nclass_name Child\n\n## Other.\nvar other: Example\n\n"
+        "## Run.\nfunc run(x: Child, y = 3) -> Example:\n    pass\n"
+    )
+
+    jinja = build(source, BuildOptions(recursive=True)).files
+    native = build(source, BuildOptions(recursive=True, renderer_name="native")).files
+    assert native == jinja
+    assert "## Geerbte Mitglieder" in native["child.md"]
+
+    # split pages
+    jinja = build(source, BuildOptions(recursive=True, split_threshold=3)).files
+    native = build(
+        source, BuildOptions(recursive=True, split_threshold=3, renderer_name="native")
+    ).files
+    assert native == jinja
+    assert "advanced.functions.md" in native
+
+    # parts the parser does not produce, and the dictionary input
+    parsed = parser.parse_gdscript(str(DATA / "advanced.gd"))
+    parsed.functions[0].examples = "var x = 1\nprint(x)"
+    parsed.script.class_name = None
+    links = PageLinks(types={"Node": "node.md"}, subclasses=[("Sub", "sub.md")])
+    template = generator.get_renderer()
+    for data in (parsed, parsed.to_dict()):
+        assert NativeRenderer().render(data, links) == template.render(data, links)
+    assert "##### Beispiel" in template.render(parsed, links)
+
+
+def test_split_pages_in_indexes_and_nav(tmp_path):
+    source = tmp_path / "src"
+    (source / "sub").mkdir(parents=True)
+    functions = "".join(f"## Does {c}.\nfunc {c}_run():\n    pass\n" for c in "abcxyz")
+    (source / "sub" / "big.gd").write_text(
+        f"# Big.\nextends Node\nclass_name Big\n\nvar speed = 1\n{functions}", encoding="utf-8"
+    )
+    (source / "user.gd").write_text("extends Big\nvar b: Big\n", encoding="utf-8")
+
+    options = BuildOptions(recursive=True, split_threshold=2, project_root=tmp_path)
+    files = build(source, options).files
+    assert sorted(files) == [
+        "index.md", "mkdocs.yml", "sub/big.functions-a-b.md", "sub/big.functions-c-x.md",
+        "sub/big.functions-y-z.md", "sub/big.md", "sub/big.variables.md", "sub/index.md",
+        "user.md",
+    ]
+    overview = files["sub/big.md"]
+    assert "- **Funktionen:** 6" in overview
+    assert "- [Funktionen (A–B)](big.functions-a-b.md) (2)" in overview
+    assert "func-a_run" not in overview
+    part = files["sub/big.functions-c-x.md"]
+    assert part.startswith('---\ntitle: "big – Funktionen (C–X)"')
+    assert "Teil der Dokumentation von [`big`](big.md)." in part
+    assert '<a id="func-x_run"></a>' in part and "y_run" not in part
+    assert "(sub/big.functions-y-z.md#func-z_run) (func)" in files["user.md"]
+
+    assert files["sub/index.md"] == (
+        "# sub\n## Skripte\n- [big](big.md)\n"
+        "    - [Variablen](big.variables.md)\n"
+        "    - [Funktionen (A–B)](big.functions-a-b.md)\n"
+        "    - [Funktionen (C–X)](big.functions-c-x.md)\n"
+        "    - [Funktionen (Y–Z)](big.functions-y-z.md)\n"
+    )
+    assert (
+        "    - sub:\n"
+        "      - Overview: sub/index.md\n"
+        "      - big:\n"
+        "        - Overview: sub/big.md\n"
+        "        - Variablen: sub/big.variables.md\n"
+    ) in files["mkdocs.yml"]
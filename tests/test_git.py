@@ -0,0 +1,118 @@
+from pathlib import Path
+import os
+import subprocess
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from click.testing import CliRunner
+
+from src.cli import main
+from src.git import changed_files
+
+DATA = Path(__file__).parent / "data"
+
+
+def _git(repo, *args):
+    env = dict(
+        os.environ,
+        GIT_AUTHOR_NAME="t", GIT_AUTHOR_EMAIL="t@t", GIT_COMMITTER_NAME="t",
+        GIT_COMMITTER_EMAIL="t@t",
+    )
+    subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True, env=env)
+
+
+def _repo(tmp_path):
+    repo = tmp_path / "game"
+    (repo / "scripts" / "ui").mkdir(parents=True)
+    (repo / "scripts" / "basic.gd").write_bytes((DATA / "basic.gd").read_bytes())
+    (repo / "scripts" / "ui" / "menu.gd").write_text("# Menu\nfunc open():\n    pass\n", encoding="utf-8")
+    (repo / "scripts" / "old.gd").write_text("# Old\nfunc f():\n    pass\n", encoding="utf-8")
+    _git(repo, "init", "-q")
+    _git(repo, "add", ".")
+    _git(repo, "commit", "-q", "-m", "init")
+    return repo
+
+
+def test_changed_files(tmp_path):
+    repo = _repo(tmp_path)
+    scripts = repo / "scripts"
+    _git(repo, "mv", "scripts/old.gd", "scripts/ui/renamed.gd")
+    (scripts / "basic.gd").write_text("# Changed\n", encoding="utf-8")
+    (scripts / "new.gd").write_text("# New\n", encoding="utf-8")
+    (scripts / "ui" / "menu.gd").unlink()
+
+    changes = changed_files(scripts)
+    assert changes.renamed == [("old.gd", "ui/renamed.gd")]
+    assert changes.modified == ["basic.gd"]
+    assert changes.deleted == ["ui/menu.gd"]
+    assert changes.created == ["new.gd"]
+
+    staged = changed_files(scripts, staged=True)
+    assert staged.renamed == [("old.gd", "ui/renamed.gd")]
+    assert not staged.modified and not staged.created and not staged.deleted
+
+
+def test_cli_changed_since_updates_only_changes(tmp_path):
+    repo = _repo(tmp_path)
+    scripts, docs = repo / "scripts", tmp_path / "docs"
+    args = [str(scripts), "-r", "-o", str(docs), "--project-root", str(tmp_path)]
+    assert CliRunner().invoke(main, args).exit_code == 0
+    _git(repo, "tag", "docs")
+    mkdocs = (tmp_path / "mkdocs.yml").stat().st_mtime_ns
+
+    (scripts / "basic.gd").write_text(
+        (scripts / "basic.gd").read_text() + "\nfunc added():\n    pass\n", encoding="utf-8"
+    )
+    result = CliRunner().invoke(main, args + ["--changed-since", "docs"])
+    assert result.exit_code == 0, result.output
+    assert "Generated basic.md" in result.output
+    assert "menu" not in result.output
+    # nothing was added or removed, so the nav is left alone
+    assert (tmp_path / "mkdocs.yml").stat().st_mtime_ns == mkdocs
+
+    _git(repo, "mv", "scripts/old.gd", "scripts/ui/renamed.gd")
+    result = CliRunner().invoke(main, args + ["--staged"])
+    assert result.exit_code == 0, result.output
+    assert "Moved old.md -> ui/renamed.md" in result.output
+    assert not (docs / "old.md").exists()
+    assert "# renamed" in (docs / "ui" / "renamed.md").read_text(encoding="utf-8")
+    assert "renamed.md" in (docs / "ui" / "index.md").read_text(encoding="utf-8")
+    assert "old" not in (docs / "index.md").read_text(encoding="utf-8")
+    assert "renamed: ui/renamed.md" in (tmp_path / "mkdocs.yml").read_text(encoding="utf-8")
+
+    # a full build afterwards finds nothing left to do
+    result = CliRunner().invoke(main, args)
+    assert "Generated" not in result.output
+
+
+def test_cli_staged_rename_into_excluded_directory(tmp_path):
+    repo = _repo(tmp_path)
+    scripts, docs = repo / "scripts", tmp_path / "docs"
+    args = [str(scripts), "-r", "-o", str(docs), "--project-root", str(tmp_path), "-x", "addons"]
+    assert CliRunner().invoke(main, args).exit_code == 0
+    assert (docs / "old.md").exists()
+
+    (scripts / "addons").mkdir()
+    _git(repo, "mv", "scripts/old.gd", "scripts/addons/old.gd")
+    result = CliRunner().invoke(main, args + ["--staged"])
+    assert result.exit_code == 0, result.output
+    assert "Removed old.md" in result.output
+    assert not (docs / "old.md").exists()
+    assert not (docs / "addons").exists()
+    assert "old" not in (docs / "index.md").read_text(encoding="utf-8")
+    assert "old" not in (tmp_path / "mkdocs.yml").read_text(encoding="utf-8")
+
+    # a full build afterwards finds nothing left to do
+    result = CliRunner().invoke(main, args)
+    assert "Generated" not in result.output and "Removed" not in result.output
+
+
+def test_cli_changed_since_outside_git(tmp_path):
+    source = tmp_path / "src"
+    source.mkdir()
+    (source / "a.gd").write_text("# A\n", encoding="utf-8")
+    args = [str(source), "-o", str(tmp_path / "docs"), "--changed-since", "HEAD"]
+    result = CliRunner().invoke(main, args)
+    assert result.exit_code != 0
+    assert "Error" in result.output
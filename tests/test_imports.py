@@ -0,0 +1,46 @@
+from pathlib import Path
+import subprocess
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.bench_startup import ROOT, import_times
+
+# loaded on demand only: when a page is rendered, with --jobs, when an
+# archive is written, once a file actually changes, for the git modes
+# (subprocess) and for serve and client (socket)
+HEAVY = (
+    "jinja2", "multiprocessing", "concurrent.futures", "tarfile", "zipfile", "tempfile",
+    "subprocess", "socket",
+)
+
+
+def test_cli_import_is_minimal():
+    times = import_times("src.cli")
+    loaded = [name for name in times if name.split(".")[0] in HEAVY or name in HEAVY]
+    assert loaded == []
+    # the feature modules are not imported just to share Changes
+    assert not {"src.watch", "src.git", "src.server"} & set(times)
+
+
+def test_noop_build_does_not_load_renderer(tmp_path):
+    source = tmp_path / "src"
+    source.mkdir()
+    data = Path(__file__).parent / "data" / "basic.gd"
+    (source / "basic.gd").write_bytes(data.read_bytes())
+    args = [str(source), "-o", str(tmp_path / "docs"), "--project-root", str(tmp_path)]
+    code = (
+        "import sys\n"
+        "from src.cli import main\n"
+        f"main({args!r}, standalone_mode=False)\n"
+        f"print(sorted(m for m in {HEAVY!r} if m in sys.modules))\n"
+    )
+
+    def run() -> str:
+        result = subprocess.run(
+            [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True
+        )
+        return result.stdout.splitlines()[-1]
+
+    assert "jinja2" in run()  # the first build renders the page
+    assert run() == "[]"
@@ -0,0 +1,126 @@
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src import lexer
+
+
+def test_tokenize_kinds():
+    source = "## Doc\nextends Node\n\n@export var a = 1\n    var local = 2\n"
+    tokens = list(lexer.tokenize(source))
+    assert [(t.kind, t.line) for t in tokens] == [
+        (lexer.COMMENT, 1),
+        (lexer.DECLARATION, 2),
+        (lexer.OTHER, 3),
+        (lexer.ANNOTATION, 4),
+        (lexer.DECLARATION, 4),
+        (lexer.OTHER, 5),
+    ]
+    assert tokens[0].value == "Doc"
+    assert tokens[3].keyword == "export"
+    assert tokens[4].keyword == "var"
+    assert tokens[4].value == "var a = 1"
+
+
+def test_tokenize_joins_bracketed_spans():
+    source = 'func f(\n    a: int,\n    b = "(",  # note\n) -> void:\n    pass\n'
+    tokens = list(lexer.tokenize(source))
+    assert tokens[0].kind == lexer.DECLARATION
+    assert tokens[0].value == 'func f(a: int, b = "(",) -> void:'
+    assert tokens[0].line == 1
+    assert [t.line for t in tokens[1:]] == [5]
+
+
+def test_tokenize_line_continuation_and_static():
+    tokens = list(lexer.tokenize("const A = 1 + \\\n    2\nstatic func g():\n"))
+    assert tokens[0].value == "const A = 1 + 2"
+    assert tokens[1].keyword == "func"
+    assert tokens[1].value == "func g():"
+
+
+def test_tokenize_bytes_and_mmap(tmp_path):
+    import mmap
+
+    source = '## Doc ü\r\nconst A = {"a": [1, 2]}\r\nfunc f():\r\n    pass\r\n'
+    expected = list(lexer.tokenize(source))
+    assert list(lexer.tokenize(source.encode("utf-8"))) == expected
+    path = tmp_path / "a.gd"
+    path.write_bytes(source.encode("utf-8"))
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+        assert list(lexer.tokenize(m)) == expected
+    assert expected[0].value == "Doc ü"
+    assert expected[1].value == 'const A = {"a": [1, 2]}'
+
+
+def test_long_literals_are_cut_and_skipped(monkeypatch):
+    rows = []
+    for i in range(3000):
+        rows.append(f'\t"k{i}": ["(", {i}, {{"x": \'[\'}}],  # ]] {i}\n')
+        if i % 7 == 0:
+            rows.append('\t"esc\\"}": ")",\n')
+    source = (
+        "const BIG = {\n" + "".join(rows) + "}\n"
+        "## After.\n"
+        "var small = [1,\n  2]\n"
+        + "func f():\n" + "    \xff\n".join("" for _ in range(3))
+    ).encode("latin-1")  # a body that is not valid UTF-8 is never decoded
+    monkeypatch.setattr(lexer, "_SKIP_CHUNK", 500)
+    tokens = list(lexer.tokenize(source))
+    big = tokens[0]
+    assert big.value.startswith('const BIG = {"k0": ["(", 0, {"x": \'[\'}], ')
+    assert big.value.endswith(lexer.ELLIPSIS)
+    assert len(big.value.encode("utf-8")) <= lexer.MAX_VALUE_BYTES + 20
+
+    # skipping in chunks ends the literal on the same line as scanning it
+    monkeypatch.setattr(lexer, "MAX_VALUE_BYTES", 10**9)
+    full = list(lexer.tokenize(source))
+    assert [(t.kind, t.value, t.line) for t in tokens[1:]] == [
+        (t.kind, t.value, t.line) for t in full[1:]
+    ]
+    assert [t.value for t in tokens if t.kind == lexer.DECLARATION][1:] == [
+        "var small = [1, 2]",
+        "func f():",
+    ]
+
+
+def test_skipping_plain_string_tables(monkeypatch):
+    rows = "".join(f'\t"{i}": "){"[" * (i % 3)}",\n' for i in range(2000))
+    source = f"const T = {{\n{rows}}}\nconst U = 1\n"
+    monkeypatch.setattr(lexer, "_SKIP_CHUNK", 300)
+    tokens = list(lexer.tokenize(source))
+    assert (tokens[1].value, tokens[1].line) == ("const U = 1", 2003)
+
+
+def test_unclosed_brackets_end_at_the_next_declaration(monkeypatch):
+    # typical while editing: the rest of the script is not swallowed
+    source = "func broken(a,\n    pass\n\n@export var kept = 1\nfunc after():\n    pass\n"
+    tokens = [t for t in lexer.tokenize(source) if t.kind != lexer.OTHER]
+    assert [(t.kind, t.line, t.unclosed) for t in tokens] == [
+        (lexer.DECLARATION, 1, True),
+        (lexer.ANNOTATION, 4, False),
+        (lexer.DECLARATION, 4, False),
+        (lexer.DECLARATION, 5, False),
+    ]
+    assert tokens[0].value == "func broken(a, pass"
+
+    # also when the open value is skipped in chunks
+    rows = "".join(f"\t{i},\n" for i in range(2000))
+    monkeypatch.setattr(lexer, "_SKIP_CHUNK", 300)
+    tokens = list(lexer.tokenize(f"const T = [\n{rows}const U = 1\n"))
+    assert tokens[0].unclosed
+    assert (tokens[1].value, tokens[1].line) == ("const U = 1", 2002)
+
+
+def test_max_line_length():
+    source = "# " + "x" * 50 + "\nvar a = 1\nfunc f(\n" + "a,\n" * 50 + "):\nvar b = 2\n"
+    tokens = list(lexer.tokenize(source, max_line_length=20))
+    comment, var_a, func, var_b = [t for t in tokens if t.kind != lexer.OTHER]
+    assert (comment.value, comment.truncated) == ("x" * 18, True)
+    assert not var_a.truncated
+    assert func.truncated and func.value.startswith("func f(a, a,")
+    assert len(func.value) <= 30
+    assert (var_b.value, var_b.line, var_b.truncated) == ("var b = 2", 55, False)
+
+    # only the first ``size`` bytes are read
+    assert [t.value for t in lexer.tokenize("var a = 1\nvar b = 2\n", size=10)] == ["var a = 1"]
@@ -0,0 +1,91 @@
+from pathlib import Path
+import os
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pytest
+
+from src import parser
+from src.manifest import BuildManifest, MANIFEST_NAME, hash_bytes, hash_text
+
+
+def _script(name):
+    return parser.ParsedScript(
+        script=parser.ScriptInfo(name=name, path=f"{name}.gd", class_name=name.title()),
+        functions=[parser.FunctionInfo("run", params=[parser.ParamInfo("x", "int")])],
+        references=[parser.Reference("extends", "Node")],
+    )
+
+
+def test_manifest_roundtrip(tmp_path):
+    manifest = BuildManifest(fingerprint="abc", source="/src")
+    manifest.update("a/b.gd", hash_bytes(b"source"), "# b\n", _script("b"))
+    manifest.save(tmp_path)
+
+    assert (tmp_path / MANIFEST_NAME).exists()
+    loaded = BuildManifest.load(tmp_path, fingerprint="abc", source="/src")
+    assert list(loaded) == ["a/b.gd"]
+    entry = loaded.get("a/b.gd")
+    assert entry.page_hash == hash_text("# b\n")
+    assert entry.symbols.class_name == "B"
+    assert entry.symbols.references == [["extends", "Node"]]
+    assert entry.data == _script("b")
+
+    page = tmp_path / "a" / "b.md"
+    page.parent.mkdir()
+    page.write_text("# b\n", encoding="utf-8")
+    assert loaded.is_current("a/b.gd", hash_bytes(b"source"), page)
+    assert not loaded.is_current("a/b.gd", hash_bytes(b"changed"), page)
+
+    page.write_text("edited by hand\n", encoding="utf-8")
+    assert not loaded.is_current("a/b.gd", hash_bytes(b"source"), page)
+
+
+def test_manifest_discarded_on_fingerprint_change(tmp_path):
+    manifest = BuildManifest(fingerprint="old", source="/src")
+    manifest.update("a.gd", "x", "", _script("a"))
+    manifest.save(tmp_path)
+
+    assert len(BuildManifest.load(tmp_path, fingerprint="new", source="/src")) == 0
+    assert len(BuildManifest.load(tmp_path, fingerprint="old", source="/other")) == 0
+    (tmp_path / MANIFEST_NAME).write_text("{broken", encoding="utf-8")
+    assert len(BuildManifest.load(tmp_path, fingerprint="old", source="/src")) == 0
+
+
+def test_manifest_saved_only_when_changed(tmp_path):
+    manifest = BuildManifest(fingerprint="abc", source="/src")
+    manifest.update("a.gd", "x", "", _script("a"))
+    manifest.graph = {"a.gd": {}}
+    manifest.save(tmp_path)
+    path = tmp_path / MANIFEST_NAME
+    path.write_text(path.read_text(encoding="utf-8") + " ", encoding="utf-8")
+
+    loaded = BuildManifest.load(tmp_path, fingerprint="abc", source="/src")
+    assert not loaded.changed
+    loaded.graph = {"a.gd": {}}
+    loaded.get("a.gd")
+    loaded.save(tmp_path)
+    assert path.read_text(encoding="utf-8").endswith(" ")
+
+    loaded.remove("a.gd")
+    loaded.save(tmp_path)
+    assert len(BuildManifest.load(tmp_path, fingerprint="abc", source="/src")) == 0
+
+
+def test_interrupted_save_keeps_the_previous_manifest(tmp_path, monkeypatch):
+    manifest = BuildManifest(fingerprint="abc", source="/src")
+    manifest.update("a.gd", "x", "", _script("a"))
+    manifest.save(tmp_path)
+
+    def interrupted(src, dst):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(os, "replace", interrupted)
+    manifest.update("b.gd", "y", "", _script("b"))
+    with pytest.raises(KeyboardInterrupt):
+        manifest.save(tmp_path)
+    monkeypatch.undo()
+
+    assert list(BuildManifest.load(tmp_path, fingerprint="abc", source="/src")) == ["a.gd"]
+    assert [p.name for p in tmp_path.iterdir()] == [MANIFEST_NAME]
@@ -0,0 +1,69 @@
+from pathlib import Path
+import os
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from click.testing import CliRunner
+
+from src.cli import main
+from src.manifest import hash_bytes
+from src.parse_cache import ParseCache
+from src.parser import parse_gdscript
+
+DATA = Path(__file__).parent / "data" / "basic.gd"
+
+
+def test_cache_roundtrip_ignores_location(tmp_path):
+    cache = ParseCache(tmp_path / "cache")
+    source_hash = hash_bytes(DATA.read_bytes())
+    assert cache.get(source_hash, str(DATA)) is None
+
+    parsed = parse_gdscript(str(DATA))
+    cache.put(source_hash, parsed)
+    copy = tmp_path / "elsewhere" / "renamed.gd"
+    copy.parent.mkdir()
+    copy.write_bytes(DATA.read_bytes())
+
+    cached = cache.get(source_hash, str(copy))
+    assert cached == parse_gdscript(str(copy))
+
+    # broken entries are treated as misses and removed
+    entry = next(p for p in (tmp_path / "cache").rglob("*") if p.is_file())
+    entry.write_bytes(b"garbage")
+    assert cache.get(source_hash, str(DATA)) is None
+    assert not entry.exists()
+
+
+def test_prune_evicts_least_recently_used(tmp_path):
+    parsed = parse_gdscript(str(DATA))
+    cache = ParseCache(tmp_path)
+    for i, name in enumerate(["aa", "bb", "cc"]):
+        cache.put(name * 32, parsed)
+        entry = next((tmp_path).rglob(name * 32))
+        os.utime(entry, ns=(i, i))
+    cache.get("aa" * 32, str(DATA))  # refreshes the oldest entry
+
+    size = next(tmp_path.rglob("aa" * 32)).stat().st_size
+    cache.max_bytes = 2 * size
+    assert cache.prune() == 1
+    assert sorted(p.name[:2] for p in tmp_path.rglob("*") if p.is_file()) == ["aa", "cc"]
+
+
+def test_cli_reuses_cache_across_output_dirs(tmp_path):
+    source = tmp_path / "src"
+    source.mkdir()
+    (source / "basic.gd").write_bytes(DATA.read_bytes())
+    cache_dir = tmp_path / "cache"
+
+    pages = []
+    for out in ("docs1", "docs2"):
+        args = [
+            str(source), "-o", str(tmp_path / out),
+            "--project-root", str(tmp_path), "--cache-dir", str(cache_dir),
+        ]
+        assert CliRunner().invoke(main, args).exit_code == 0
+        pages.append((tmp_path / out / "basic.md").read_text(encoding="utf-8"))
+
+    assert pages[0] == pages[1]
+    assert len([p for p in (cache_dir / "parse").rglob("*") if p.is_file()]) == 1
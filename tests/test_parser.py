@@ -113,3 +113,123 @@ def test_parse_double_hash_comments():
     assert func["description"] == "Function description"
 
     assert result["todos"] == [": header", ": bottom"]
+
+def test_parse_multiline_declarations():
+    gd_path = Path(__file__).parent / "data" / "multiline.gd"
+    result = parser.parse_gdscript(str(gd_path))
+
+    assert [f["name"] for f in result["functions"]] == ["configure", "helper"]
+    configure = result["functions"][0]
+    assert configure["description"] == "Long signature"
+    assert [p["name"] for p in configure["params"]] == ["speed", "label"]
+    assert configure["params"][1]["default"] == '"a#b"'
+    assert configure["returns"]["type"] == "void"
+
+    # locals inside function bodies are not script variables
+    assert [v["name"] for v in result["variables"]] == ["speed"]
+    assert result["variables"][0]["description"] == "Exported speed"
+
+    enum = result["enums"][0]
+    assert enum["name"] == "Direction"
+    assert [(i["name"], i["value"]) for i in enum["items"]] == [("UP", None), ("DOWN", 4)]
+
+def test_parsed_script_model():
+    import dataclasses
+    import pickle
+
+    gd_path = Path(__file__).parent / "data" / "advanced.gd"
+    result = parser.parse_gdscript(str(gd_path))
+
+    assert isinstance(result, parser.ParsedScript)
+    assert result.script.class_name == "FullExample"
+    assert result.functions[1].params[0].default == "1"
+    # slotted: no per-instance __dict__
+    assert not hasattr(result, "__dict__")
+    assert not hasattr(result.functions[0], "__dict__")
+
+    as_dict = result.to_dict()
+    assert as_dict["functions"][1]["params"][0]["default"] == "1"
+    assert as_dict["enums"][0]["items"][1] == {"name": "JUMP", "value": 3, "description": ""}
+
+    assert parser.ParsedScript.from_dict(as_dict) == result
+    assert parser.ParsedScript.from_dict(dataclasses.asdict(result)) == result
+    assert pickle.loads(pickle.dumps(result)) == result
+
+
+def test_parse_memory_mapped(tmp_path, monkeypatch):
+    data = Path(__file__).parent / "data" / "multiline.gd"
+    expected = parser.parse_gdscript(str(data))
+    monkeypatch.setattr(parser, "MMAP_THRESHOLD", 0)
+    assert parser.parse_gdscript(str(data)) == expected
+    assert parser.parse_gdscript(str(data), data.read_bytes()) == expected
+
+    table = tmp_path / "table.gd"
+    rows = "".join(f'\t"{i}": {i},\n' for i in range(5000))
+    table.write_text(f"extends Node\n## Lookup.\nconst TABLE = {{\n{rows}}}\n", encoding="utf-8")
+    (const,) = parser.parse_gdscript(str(table)).consts
+    assert const.value.startswith('{"0": 0, "1": 1, ')
+    assert const.value.endswith(" …")
+    assert const.description == "Lookup."
+
+
+def test_parse_splits_parameters_by_bracket_depth():
+    source = (
+        'signal hit(pos = Vector2(1, 2), name = "a,b")\n'
+        "enum Flags {A = 1 << 0, B = (1 << 1), C}\n"
+        'func f(a: Array = [1, [2, 3]], b := {"k": (1, 2)}, c = ")") -> int:\n'
+        "\treturn (a)\n"
+        "func g(a, b): return h(a, b)\n"
+    ).encode("utf-8")
+    result = parser._parse("p.gd", source)
+
+    assert [a.name for a in result.signals[0].args] == ['pos = Vector2(1, 2)', 'name = "a,b"']
+    assert [(i.name, i.value) for i in result.enums[0].items] == [
+        ("A", None), ("B", None), ("C", None)
+    ]
+    f, g = result.functions
+    assert [(p.name, p.default) for p in f.params] == [
+        ("a", "[1, [2, 3]]"), ("b", None), ("c", '")"')
+    ]
+    assert f.returns.type == "int"
+    assert [p.name for p in g.params] == ["a", "b"]
+    assert g.returns is None
+    assert result.warnings == []
+
+
+def test_parse_limits(monkeypatch):
+    params = ", ".join(f"p{i}" for i in range(1000))
+    source = f"extends Node\n## Doc\nfunc f({params}) -> int:\n\tpass\nvar after = 1\n".encode("utf-8")
+
+    limits = parser.ParseLimits(max_line_length=100)
+    result = parser._parse("l.gd", source, limits)
+    (func,) = result.functions
+    assert func.description == "Doc"
+    assert 10 < len(func.params) < 30
+    assert [v.name for v in result.variables] == ["after"]
+    assert result.warnings == ["line 3 is longer than 100 bytes and was cut"]
+
+    # a signature spread over many lines is cut as well
+    multiline = f"func f(\n{params.replace(', ', ',' + chr(10))}\n) -> int:\n\tpass\nvar after = 1\n"
+    result = parser._parse("l.gd", multiline.encode("utf-8"), limits)
+    assert 10 < len(result.functions[0].params) < 30
+    assert [v.name for v in result.variables] == ["after"]
+    assert len(result.warnings) == 1
+
+    result = parser._parse("l.gd", source, parser.ParseLimits(max_file_size=len(source) - 5))
+    assert result.variables == []
+    assert len(result.functions[0].params) == 1000
+    assert result.warnings[0].startswith("file is larger than")
+
+    monkeypatch.setattr(parser, "_CLOCK_INTERVAL", 1)
+    result = parser._parse("l.gd", source, parser.ParseLimits(time_budget=1e-9))
+    assert result.functions == []
+    assert result.warnings[0].startswith("parsing took longer than")
+
+
+def test_unclosed_bracket_keeps_later_declarations():
+    source = b"func broken(a,\n\tpass\n\n## Kept.\nvar kept = 1\nfunc after():\n\tpass\n"
+    result = parser._parse("u.gd", source, parser.DEFAULT_LIMITS)
+    assert [v.name for v in result.variables] == ["kept"]
+    assert result.variables[0].description == "Kept."
+    assert [f.name for f in result.functions] == ["after"]
+    assert result.warnings == ["line 1 has an unclosed bracket"]
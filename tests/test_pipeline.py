@@ -0,0 +1,26 @@
+from pathlib import Path
+import operator
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.pipeline import CHUNK_SIZE, ordered_map, worker_pool
+
+
+def test_ordered_map_bounds_read_ahead():
+    taken = []
+
+    def items():
+        for item in range(40):
+            taken.append(item)
+            yield item
+
+    with worker_pool(2) as pool:
+        results = []
+        for result in ordered_map(pool, operator.neg, items(), depth=3):
+            results.append(result)
+            # never more than ``depth`` chunks ahead of the consumer
+            assert len(taken) <= len(results) + 3 * CHUNK_SIZE
+    assert results == [-item for item in range(40)]
+
+    assert list(ordered_map(None, operator.neg, range(3))) == [0, -1, -2]
@@ -0,0 +1,55 @@
+from pathlib import Path
+import json
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from click.testing import CliRunner
+
+from src.cli import main
+from src.profiling import Profiler
+
+DATA = Path(__file__).parent / "data"
+
+
+def test_profiler_collects_stages_and_slowest_files():
+    profiler = Profiler(slowest=1)
+    profiler.add("parse", 0.0, 0.5, file="a.gd")
+    profiler.add("render", 0.5, 0.25, file="b.gd")
+    profiler.add("render", 0.75, 0.5, file="a.gd")
+    with profiler.stage("indexes"):
+        pass
+    assert list(profiler.iterate("discover", [1, 2])) == [1, 2]
+    profiler.count("files_parsed", 2)
+
+    summary = profiler.to_dict()
+    assert summary["stages"]["render"] == {"calls": 2, "seconds": 0.75}
+    assert summary["stages"]["discover"]["calls"] == 3
+    assert summary["counters"] == {"files_parsed": 2}
+    assert summary["slowest_files"] == [{"file": "a.gd", "seconds": 1.0}]
+    assert "render" in profiler.table()
+
+    events = profiler.chrome_trace()["traceEvents"]
+    assert {e["name"] for e in events} == {"parse", "render", "indexes", "discover"}
+    assert all(e["ph"] == "X" for e in events)
+
+
+def test_cli_profile_output(tmp_path):
+    source = tmp_path / "src"
+    source.mkdir()
+    (source / "basic.gd").write_bytes((DATA / "basic.gd").read_bytes())
+    base = [str(source), "-o", str(tmp_path / "docs"), "--project-root", str(tmp_path)]
+
+    report = tmp_path / "profile.json"
+    result = CliRunner().invoke(main, base + ["--profile-output", str(report)])
+    assert result.exit_code == 0, result.output
+    summary = json.loads(report.read_text(encoding="utf-8"))
+    for stage in ("discover", "read", "parse", "render", "indexes", "nav", "write"):
+        assert stage in summary["stages"]
+    assert summary["counters"]["files_parsed"] == 1
+    assert summary["slowest_files"][0]["file"] == "basic.gd"
+
+    trace = tmp_path / "trace.json"
+    args = base + ["--profile-output", str(trace), "--profile-format", "chrome"]
+    assert CliRunner().invoke(main, args).exit_code == 0
+    assert json.loads(trace.read_text(encoding="utf-8"))["traceEvents"]
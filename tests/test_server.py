@@ -0,0 +1,142 @@
+from pathlib import Path
+import sys
+import threading
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pytest
+from click.testing import CliRunner
+
+from src.api import BuildOptions
+from src.cli import main
+from src.client import ClientError, request
+from src.server import BuildServer, serve
+
+DATA = Path(__file__).parent / "data"
+
+
+@pytest.fixture
+def running(tmp_path):
+    source = tmp_path / "src"
+    (source / "sub").mkdir(parents=True)
+    (source / "basic.gd").write_bytes((DATA / "basic.gd").read_bytes())
+    (source / "sub" / "multiline.gd").write_bytes((DATA / "multiline.gd").read_bytes())
+    docs = tmp_path / "docs"
+    options = BuildOptions(recursive=True, output_dir=docs, project_root=tmp_path)
+    builds = BuildServer(source, docs, options)
+    sock = str(tmp_path / "s.sock")
+    ready = threading.Event()
+    thread = threading.Thread(target=serve, args=(sock, builds, ready.set))
+    thread.start()
+    assert ready.wait(10)
+    yield source, docs, sock
+    if thread.is_alive():
+        request(sock, {"command": "stop"})
+    thread.join(10)
+    assert not thread.is_alive()
+
+
+def test_requests_update_pages(running):
+    source, docs, sock = running
+    assert (docs / "sub" / "multiline.md").exists()  # built before listening
+
+    basic = source / "basic.gd"
+    basic.write_text(basic.read_text() + "\n## New.\nfunc added():\n    pass\n")
+    reply = request(sock, {"paths": [str(basic)]})
+    assert reply["generated"] == ["basic.md"]
+    assert "added" in (docs / "basic.md").read_text(encoding="utf-8")
+
+    new = source / "sub" / "new.gd"
+    new.write_text("# New script.\nextends Node\n")
+    (source / "sub" / "multiline.gd").unlink()
+    reply = request(sock, {"paths": [str(new), str(source / "sub" / "multiline.gd")]})
+    assert reply["generated"] == ["sub/new.md"]
+    assert reply["removed"] == ["sub/multiline.md"]
+    assert "new.md" in (docs / "sub" / "index.md").read_text(encoding="utf-8")
+
+    assert request(sock, {"command": "status"})["scripts"] == 2
+    with pytest.raises(ClientError, match="unknown command"):
+        request(sock, {"command": "nope"})
+
+
+def test_concurrent_clients_see_consistent_results(running):
+    source, docs, sock = running
+    scripts = []
+    for i in range(8):
+        path = source / f"s{i}.gd"
+        path.write_text(f"# Script {i}.\nextends Node\n")
+        scripts.append(str(path))
+
+    replies = [None] * len(scripts)
+
+    def client(i):
+        replies[i] = request(sock, {"paths": [scripts[i]]}, timeout=30)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(len(scripts))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # requests answered by one build share its reply; together they cover all
+    generated = set()
+    for i, reply in enumerate(replies):
+        assert f"s{i}.md" in reply["generated"]
+        generated.update(reply["generated"])
+    assert generated == {f"s{i}.md" for i in range(8)}
+    index = (docs / "index.md").read_text(encoding="utf-8")
+    assert all(f"s{i}.md" in index for i in range(8))
+
+
+def test_stop_saves_manifest_and_cli_client(running, tmp_path):
+    source, docs, sock = running
+    result = CliRunner().invoke(main, ["client", "--socket", sock, "--status"])
+    assert result.exit_code == 0
+    assert "builds: 1" in result.output
+
+    result = CliRunner().invoke(main, ["client", "--socket", sock, "--stop"])
+    assert result.exit_code == 0
+    for _ in range(100):
+        if not Path(sock).exists():
+            break
+        threading.Event().wait(0.05)
+    assert not Path(sock).exists()
+    assert (docs / ".gd2doc-manifest.json").exists()
+
+    result = CliRunner().invoke(main, ["client", "--socket", sock])
+    assert result.exit_code == 1
+    assert "No gd2doc server" in result.output
+
+    # a later one-shot build finds everything up to date
+    args = [str(source), "-r", "-o", str(docs), "--project-root", str(tmp_path)]
+    result = CliRunner().invoke(main, args)
+    assert "Generated" not in result.output
+
+
+def test_paths_are_matched_like_a_full_build(tmp_path):
+    real = tmp_path / "real"
+    real.mkdir()
+    (real / "a.gd").write_text("# A.\nextends Node\n", encoding="utf-8")
+    (real / ".gitignore").write_text("ignored.gd\n", encoding="utf-8")
+    link = tmp_path / "link"
+    link.symlink_to(real, target_is_directory=True)
+    docs = tmp_path / "docs"
+    builds = BuildServer(link, docs, BuildOptions(project_root=tmp_path))
+    try:
+        assert builds.request()["generated"] == ["a.md"]
+
+        # a path through the symlink, as the client sends it
+        (real / "b.gd").write_text("# B.\nextends Node\n", encoding="utf-8")
+        (real / "ignored.gd").write_text("# I.\n", encoding="utf-8")
+        reply = builds.request([str(link / "b.gd"), str(link / "ignored.gd")])
+        assert reply["generated"] == ["b.md"]
+        assert not (docs / "ignored.md").exists()
+    finally:
+        builds.close()
+
+
+def test_invalid_paths_are_rejected(running):
+    _, _, sock = running
+    for paths in ("basic.gd", [1, 2], {"a": 1}):
+        with pytest.raises(ClientError, match="paths must be a list of strings"):
+            request(sock, {"paths": paths})
@@ -0,0 +1,168 @@
+from pathlib import Path
+import json
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from click.testing import CliRunner
+
+from src.cli import main
+from src.parser import parse_gdscript
+from src.symbols import SymbolIndex, split_page
+
+BASE = """class_name Actor
+extends Node
+## Base for everything that moves.
+
+signal died()
+enum State { IDLE, RUN }
+var speed: float = 1.0
+
+func move(delta: float) -> void:
+    pass
+"""
+
+PLAYER = """class_name Player
+extends Actor
+
+var state: Actor.State
+
+func move(delta: float) -> void:
+    pass
+
+func follow(target: Actor) -> Actor:
+    return target
+"""
+
+
+def _index(tmp_path):
+    (tmp_path / "units").mkdir()
+    (tmp_path / "actor.gd").write_text(BASE, encoding="utf-8")
+    (tmp_path / "units" / "player.gd").write_text(PLAYER, encoding="utf-8")
+    index = SymbolIndex()
+    parsed = {}
+    for key in ("actor.gd", "units/player.gd"):
+        parsed[key] = parse_gdscript(str(tmp_path / key))
+        index.add(key, parsed[key])
+    return index, parsed
+
+
+def test_resolve_and_inheritance(tmp_path):
+    index, parsed = _index(tmp_path)
+
+    assert index.resolve("Player") == ("units/player.md", None)
+    assert index.resolve("Actor.State") == ("actor.md", "enum-State")
+    assert index.resolve("Node") is None
+    assert index.ancestors("units/player.gd") == ["actor.gd"]
+
+    links = index.page_links("units/player.gd", parsed["units/player.gd"])
+    assert links.types["Actor"] == "../actor.md"
+    assert links.types["Actor.State"] == "../actor.md#enum-State"
+    ((class_name, url, members),) = links.inherited
+    assert (class_name, url) == ("Actor", "../actor.md")
+    # move() is overridden, so it is not listed as inherited
+    assert [name for _, name, _ in members] == ["died", "State", "speed"]
+
+    base_links = index.page_links("actor.gd", parsed["actor.gd"])
+    assert base_links.subclasses == [("Player", "units/player.md")]
+
+
+def test_incremental_updates_and_serialisation(tmp_path):
+    index, parsed = _index(tmp_path)
+    copy = SymbolIndex.from_dict(json.loads(json.dumps(index.to_dict())))
+    assert copy.to_dict() == index.to_dict()
+    assert copy.page_links("actor.gd", parsed["actor.gd"]) == index.page_links(
+        "actor.gd", parsed["actor.gd"]
+    )
+
+    before = index.page_links("actor.gd", parsed["actor.gd"]).signature()
+    index.remove("units/player.gd")
+    assert "units/player.gd" not in index
+    links = index.page_links("actor.gd", parsed["actor.gd"])
+    assert links.subclasses == []
+    assert links.signature() != before
+
+
+def test_cli_renders_links_and_rerenders_dependents(tmp_path):
+    source = tmp_path / "src"
+    output = tmp_path / "docs"
+    source.mkdir()
+    (source / "actor.gd").write_text(BASE, encoding="utf-8")
+    (source / "player.gd").write_text(PLAYER, encoding="utf-8")
+    args = [str(source), "-o", str(output), "--project-root", str(tmp_path)]
+
+    assert CliRunner().invoke(main, args).exit_code == 0
+    player = (output / "player.md").read_text(encoding="utf-8")
+    actor = (output / "actor.md").read_text(encoding="utf-8")
+    assert "**Erbt von:** [`Actor`](actor.md)" in player
+    assert "[`speed`](actor.md#var-speed)" in player
+    assert '<a id="var-speed"></a>' in actor
+    assert "## Unterklassen\n- [`Player`](player.md)" in actor
+
+    # only the subclass changes, but the base page lists it and is rebuilt
+    (source / "player.gd").write_text(PLAYER.replace("Player", "Hero"), encoding="utf-8")
+    result = CliRunner().invoke(main, args)
+    assert "Generated actor.md" in result.output
+    assert "- [`Hero`](player.md)" in (output / "actor.md").read_text(encoding="utf-8")
+
+
+def test_split_pages_and_member_links(tmp_path):
+    members = {
+        "signal": ["s"], "enum": ["E"], "const": ["C"], "var": ["v"],
+        "func": ["alpha", "_beta", "avocado", "gamma", "zeta"],
+    }
+    assert split_page("a/big.md", members, 0) == []
+    assert split_page("a/big.md", members, 9) == []
+    parts = split_page("a/big.md", members, 2)
+    assert [(p.title, p.url, p.count) for p in parts] == [
+        ("Signale", "big.signals.md", 1),
+        ("Enums und Konstanten", "big.constants.md", 2),
+        ("Variablen", "big.variables.md", 1),
+        ("Funktionen (A)", "big.functions-a.md", 2),
+        ("Funktionen (B–G)", "big.functions-b-g.md", 2),
+        ("Funktionen (Z)", "big.functions-z.md", 1),
+    ]
+    # subpages are not named like the page of another script
+    taken = {"a/big.signals.md", "a/big.functions-z.md", "a/big.functions-z-2.md"}
+    urls = [p.url for p in split_page("a/big.md", members, 2, taken)]
+    assert urls[0] == "big.signals-2.md"
+    assert urls[-1] == "big.functions-z-3.md"
+
+    (tmp_path / "units").mkdir()
+    (tmp_path / "actor.gd").write_text(BASE, encoding="utf-8")
+    (tmp_path / "units" / "player.gd").write_text(PLAYER, encoding="utf-8")
+    index = SymbolIndex(split_threshold=3)
+    parsed = {}
+    for key in ("actor.gd", "units/player.gd"):
+        parsed[key] = parse_gdscript(str(tmp_path / key))
+        index.add(key, parsed[key])
+
+    assert list(index.parts) == ["actor.gd"]
+    assert index.subpages("actor.gd") == [
+        "actor.signals.md", "actor.constants.md", "actor.variables.md", "actor.functions.md"
+    ]
+    assert index.resolve("Actor") == ("actor.md", None)
+    assert index.resolve("Actor.State") == ("actor.constants.md", "enum-State")
+    assert index.member_page("actor.gd", "func", "move") == "actor.functions.md"
+
+    links = index.page_links("units/player.gd", parsed["units/player.gd"])
+    assert links.parts == []
+    assert links.types["Actor.State"] == "../actor.constants.md#enum-State"
+    ((_, url, members),) = links.inherited
+    assert url == "../actor.md"
+    assert members[0] == ("signal", "died", "../actor.signals.md#signal-died")
+
+    base_links = index.page_links("actor.gd", parsed["actor.gd"])
+    assert base_links.overview == "actor.md"
+    assert [p.url for p in base_links.parts] == index.subpages("actor.gd")
+    assert base_links.for_part(base_links.parts[0]).part == "Signale"
+
+    copy = SymbolIndex.from_dict(json.loads(json.dumps(index.to_dict())))
+    assert copy.parts == index.parts
+
+    # a script named like a subpage renumbers it while it exists
+    index.add("actor.functions.gd", parsed["units/player.gd"])
+    assert index.subpages("actor.gd")[-1] == "actor.functions-2.md"
+    assert index.member_page("actor.gd", "func", "move") == "actor.functions-2.md"
+    index.remove("actor.functions.gd")
+    assert index.subpages("actor.gd")[-1] == "actor.functions.md"
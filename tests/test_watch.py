@@ -0,0 +1,89 @@
+from pathlib import Path
+import os
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from click.testing import CliRunner
+
+from src.api import BuildOptions
+from src.changes import Changes
+from src.cli import main
+from src.watch import Watcher
+
+
+def _watcher(tmp_path):
+    source = tmp_path / "src"
+    output = tmp_path / "docs"
+    data_file = Path(__file__).parent / "data" / "basic.gd"
+    source.mkdir()
+    (source / "basic.gd").write_text(data_file.read_text(), encoding="utf-8")
+
+    args = [str(source), "-o", str(output), "-r", "--project-root", str(tmp_path)]
+    assert CliRunner().invoke(main, args).exit_code == 0
+
+    options = BuildOptions(recursive=True, project_root=tmp_path)
+    return source, output, Watcher(source, output, options, echo=lambda m: None)
+
+
+def test_watch_modify_only_rewrites_page(tmp_path):
+    source, output, watcher = _watcher(tmp_path)
+    assert not watcher.poll()
+
+    gd = source / "basic.gd"
+    gd.write_text(gd.read_text() + "\nfunc added():\n    pass\n", encoding="utf-8")
+    os.utime(gd, ns=(0, 1))
+    changes = watcher.poll()
+    assert changes.modified == ["basic.gd"]
+
+    index = (output / "index.md").stat().st_mtime_ns
+    result = watcher.apply(changes)
+    assert result.generated == ["basic.md"]
+    assert result.summary.startswith("1 written")
+    assert (output / "index.md").stat().st_mtime_ns == index
+    assert "added" in (output / "basic.md").read_text(encoding="utf-8")
+
+
+def test_watch_create_and_delete_update_indexes_and_nav(tmp_path):
+    source, output, watcher = _watcher(tmp_path)
+
+    sub = source / "sub"
+    sub.mkdir()
+    (sub / "new.gd").write_text("# New\nfunc f():\n    pass\n", encoding="utf-8")
+    result = watcher.apply(watcher.poll())
+    assert result.generated == ["sub/new.md"]
+    assert (output / "sub" / "index.md").exists()
+    assert "sub/index.md" in (output / "index.md").read_text(encoding="utf-8")
+    assert "sub/new.md" in (tmp_path / "mkdocs.yml").read_text(encoding="utf-8")
+
+    (sub / "new.gd").unlink()
+    changes = watcher.poll()
+    assert changes.deleted == ["sub/new.gd"]
+    assert watcher.apply(changes).removed == ["sub/new.md"]
+    assert not (output / "sub").exists()
+    assert "sub" not in (tmp_path / "mkdocs.yml").read_text(encoding="utf-8")
+
+
+def test_changes_merge_collapses_bursts():
+    changes = Changes(created=["a.gd"], deleted=["b.gd"])
+    changes.merge(Changes(created=["b.gd"], modified=["a.gd"], deleted=["a.gd"]))
+    assert changes.created == []
+    assert changes.modified == ["b.gd"]
+    assert changes.deleted == []
+
+
+def test_watch_single_file(tmp_path):
+    source, output, _ = _watcher(tmp_path)
+    (source / "other.gd").write_text("# Other\n", encoding="utf-8")
+    gd = source / "basic.gd"
+    options = BuildOptions(recursive=True, project_root=tmp_path)
+    watcher = Watcher(gd, output, options, echo=lambda m: None)
+
+    # only the watched script is looked at
+    assert not watcher.poll()
+    gd.write_text(gd.read_text() + "\nfunc added():\n    pass\n", encoding="utf-8")
+    os.utime(gd, ns=(0, 1))
+    result = watcher.apply(watcher.poll())
+    assert result.generated == ["basic.md"]
+    assert result.removed == []
+    assert not (output / "other.md").exists()
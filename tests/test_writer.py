@@ -0,0 +1,55 @@
+from pathlib import Path
+import os
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.fileio import IOPool
+from src.writer import FileWriter
+
+
+def test_writer_skips_unchanged_content(tmp_path):
+    writer = FileWriter()
+    target = tmp_path / "a" / "page.md"
+
+    assert writer.write(target, "content\n")
+    assert target.read_text(encoding="utf-8") == "content\n"
+    os.utime(target, ns=(0, 0))
+
+    assert not writer.write(target, "content\n")
+    assert target.stat().st_mtime_ns == 0
+
+    # same size, different bytes
+    assert writer.write(target, "CONTENT\n")
+    assert target.read_text(encoding="utf-8") == "CONTENT\n"
+    assert not [p for p in target.parent.iterdir() if p.name.endswith(".tmp")]
+
+    assert writer.remove(target)
+    assert not writer.remove(target)
+    assert (writer.written, writer.skipped, writer.deleted) == (2, 1, 1)
+    assert writer.summary() == "2 written, 1 unchanged, 1 deleted"
+
+
+def test_writer_recreates_removed_directory(tmp_path):
+    writer = FileWriter()
+    target = tmp_path / "sub" / "index.md"
+    writer.write(target, "a")
+    target.unlink()
+    target.parent.rmdir()
+
+    assert writer.write(target, "b")
+    assert target.read_text(encoding="utf-8") == "b"
+
+
+def test_pooled_writes_use_the_umask(tmp_path):
+    umask = os.umask(0)
+    os.umask(umask)
+    with IOPool(4) as pool:
+        writer = FileWriter(pool, batch_size=8)
+        for i in range(32):
+            writer.submit(tmp_path / f"{i}.md", str(i))
+        writer.flush()
+    # the process umask was left alone
+    assert os.umask(umask) == umask
+    modes = {(tmp_path / f"{i}.md").stat().st_mode & 0o777 for i in range(32)}
+    assert modes == {0o666 & ~umask}